@@ -0,0 +1,194 @@
+"""Accuracy versus speed of OCR configurations over a ground-truth corpus
+
+Usage:
+    python benchmarks/bench_accuracy.py [--corpus standard | --data DIR] [--grid sweep|full]
+                                        [--output accuracy.json]
+
+Every configuration (PSM mode, OEM, whether the PSM fallback cascade runs,
+text size normalization, deskew and preprocessing strength) recognises
+every page, and its character and word error rates (CER/WER, from the
+edit distance to the ground truth) are reported next to its latency per
+page. Configurations on the Pareto front, where no other configuration is
+both faster and at least as accurate, are marked with '*'; those are the
+candidates for production defaults.
+
+The corpus is the synthetic one from corpus.py, or --data: a directory of
+images (or multi-page TIFF/PDF) each with a ``<stem>.gt.txt`` ground truth
+file next to it, pages separated by form feeds.
+
+--grid sweep (the default) varies one setting at a time around the GUI's
+defaults; --grid full tries every combination.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_pipeline import clear_memo_caches
+from corpus import CORPORA, Sample, build_corpus
+from ocr_core.documents import iter_pages
+from ocr_core.engines import get_engine
+from ocr_core.metrics import error_counts, error_rates, sum_counts
+from ocr_core.pipeline import preprocess_image
+from ocr_core.strategy import FALLBACK_PSM_MODES, recognize_candidate, select_best_psm
+from ocr_core.tesseract import configure_tesseract
+
+# fallbacks: PSM modes also tried when the selected one scores low (empty: no cascade);
+# strength: multiplier of the contrast and sharpness sliders
+Config = namedtuple('Config', ['psm', 'oem', 'fallbacks', 'normalize', 'deskew', 'strength'])
+
+# What the GUI does with its controls untouched
+DEFAULT_CONFIG = Config(psm=3, oem=3, fallbacks=FALLBACK_PSM_MODES, normalize=True, deskew=True, strength=1.0)
+
+# Values tried for each setting
+CHOICES = {
+    'psm': (3, 4, 6, 11),
+    'oem': (1, 3),
+    'fallbacks': (FALLBACK_PSM_MODES, ()),
+    'normalize': (True, False),
+    'deskew': (True, False),
+    'strength': (0.75, 1.0, 1.5),
+}
+
+
+def config_name(config):
+    """Return a compact label for a configuration"""
+    parts = [f"psm{config.psm}", f"oem{config.oem}"]
+    parts.append("cascade" if config.fallbacks else "single")
+    if not config.normalize:
+        parts.append("no-norm")
+    if not config.deskew:
+        parts.append("no-deskew")
+    if config.strength != 1.0:
+        parts.append(f"x{config.strength:g}")
+    return ' '.join(parts)
+
+
+def make_grid(kind):
+    """Return the configurations to evaluate, the default first"""
+    if kind == 'full':
+        configs = [Config(*values) for values in itertools.product(*(CHOICES[field] for field in Config._fields))]
+    else:
+        # One setting at a time, the others at their defaults
+        configs = [DEFAULT_CONFIG]
+        for field, values in CHOICES.items():
+            configs += [DEFAULT_CONFIG._replace(**{field: value}) for value in values]
+    unique = list(dict.fromkeys(configs))
+    unique.remove(DEFAULT_CONFIG)
+    return [DEFAULT_CONFIG] + unique
+
+
+def load_data_dir(directory):
+    """Return Samples for every file in ``directory`` that has a .gt.txt ground truth"""
+    samples = []
+    for filename in sorted(os.listdir(directory)):
+        stem = os.path.splitext(filename)[0]
+        truth_path = os.path.join(directory, f"{stem}.gt.txt")
+        if filename.endswith('.gt.txt') or not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding='utf-8') as f:
+            pages = f.read().split('\f')
+        samples.append(Sample(stem, os.path.join(directory, filename), pages, None))
+    return samples
+
+
+def recognise(engine, image, config):
+    """Run the pipeline with one configuration and return (text, seconds)"""
+    start = time.perf_counter()
+    strength = config.strength
+    preprocessed, _ = preprocess_image(image, contrast=strength, sharpness=strength,
+                                       deskew=config.deskew, normalize=config.normalize)
+    if config.fallbacks:
+        result = select_best_psm(engine, preprocessed, config.psm, oem=config.oem, fallbacks=config.fallbacks)
+    else:
+        result = recognize_candidate(engine, preprocessed, config.psm, config.oem)
+    return result.text, time.perf_counter() - start
+
+
+def evaluate(engine, pages, config):
+    """Recognise every (image, truth) page with a configuration and return its measurements"""
+    clear_memo_caches()
+    counts = []
+    seconds = 0.0
+    for image, truth in pages:
+        text, elapsed = recognise(engine, image, config)
+        seconds += elapsed
+        counts.append(error_counts(truth, text))
+    total = sum_counts(counts)
+    cer, wer = error_rates(total)
+    return {
+        'config': config._asdict(),
+        'name': config_name(config),
+        'cer': cer,
+        'wer': wer,
+        'seconds_per_page': seconds / len(pages),
+        'pages': len(pages),
+        'page_cer': [error_rates(page)[0] for page in counts],
+    }
+
+
+def pareto_front(rows):
+    """Mark each row 'pareto' if no other row is at least as fast and as accurate, and better in one"""
+    for row in rows:
+        row['pareto'] = not any(
+            other['seconds_per_page'] <= row['seconds_per_page'] and other['cer'] <= row['cer']
+            and (other['seconds_per_page'] < row['seconds_per_page'] or other['cer'] < row['cer'])
+            for other in rows
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', choices=sorted(CORPORA), default='standard', help="synthetic corpus to use")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'ocr_to_txt_corpus'),
+                        help="where the synthetic corpus is rendered (reused across runs)")
+    parser.add_argument('--data', default=None, help="directory of images with .gt.txt ground truth instead")
+    parser.add_argument('--grid', choices=('sweep', 'full'), default='sweep', help="which configurations to try")
+    parser.add_argument('--engine', default=None, help="OCR backend (default: auto)")
+    parser.add_argument('--output', default='bench_accuracy.json', help="JSON file the results are written to")
+    parser.add_argument('--tesseract-cmd', default=None, help="path to the tesseract executable")
+    args = parser.parse_args()
+    
+    configure_tesseract(args.tesseract_cmd)
+    engine = get_engine(args.engine)
+    samples = load_data_dir(args.data) if args.data else build_corpus(args.corpus_dir, args.corpus)
+    if not samples:
+        parser.error(f"no images with .gt.txt ground truth in {args.data}")
+    
+    # Decoded once, so only the pipeline itself is timed
+    pages = []
+    for sample in samples:
+        for image, truth in zip(iter_pages(sample.path), sample.pages):
+            pages.append((image, truth))
+    configs = make_grid(args.grid)
+    print(f"{len(pages)} pages from {len(samples)} files, {len(configs)} configurations")
+    
+    # One untimed call loads the engine
+    recognise(engine, pages[0][0], DEFAULT_CONFIG)
+    
+    rows = []
+    for config in configs:
+        rows.append(evaluate(engine, pages, config))
+        print(f"  {rows[-1]['name']:<36} CER {rows[-1]['cer']:.2%}", flush=True)
+    pareto_front(rows)
+    
+    print()
+    print(f"{'configuration':<36} {'CER':>7} {'WER':>7} {'ms/page':>9} {'pages/s':>8}  front")
+    for row in sorted(rows, key=lambda row: row['seconds_per_page']):
+        print(f"{row['name']:<36} {row['cer']:>7.2%} {row['wer']:>7.2%} {row['seconds_per_page'] * 1000:>9.0f} "
+              f"{1 / row['seconds_per_page']:>8.2f}  {'*' if row['pareto'] else ''}")
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'engine': engine.name, 'pages': len(pages), 'results': rows}, f, indent=1)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
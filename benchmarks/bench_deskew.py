@@ -0,0 +1,66 @@
+"""Benchmark of skew estimation accuracy and cost
+
+Usage:
+    python benchmarks/bench_deskew.py [--runs 5] [--angles -7,-3,-1,0,1,3,7]
+
+A synthetic text page is rendered locally and tilted by each angle. The
+table shows the estimated angle, the skew left after correcting with it
+(the estimate run again on the corrected page) and the time spent on the
+downscaled estimate versus the full-resolution rotation.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+from ocr_core import deskew
+
+SAMPLE_WORDS = ("The quick brown fox jumps over the lazy dog. Pack my box with five dozen "
+                "liquor jugs 0123456789. Sphinx of black quartz, judge my vow!").split()
+
+
+def render_page(width=1700, height=2200, line_height=44):
+    """Render a page of black text lines on a white background"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    for y in range(120, height - 120, line_height):
+        words = rng.choice(SAMPLE_WORDS, size=12)
+        cv2.putText(page, ' '.join(words), (100, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2, cv2.LINE_AA)
+    return page
+
+
+def timed(function, *args, runs):
+    """Return (last result, median seconds) over ``runs`` calls"""
+    timings = []
+    for _ in range(runs):
+        deskew._angle_cache.clear()
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="timed runs per angle")
+    parser.add_argument('--angles', default='-7,-3,-1,0,1,3,7', help="comma-separated tilts in degrees")
+    args = parser.parse_args()
+    
+    page = render_page()
+    print(f"page {page.shape[1]}x{page.shape[0]}")
+    print(f"{'tilt':>6} {'estimate':>9} {'residual':>9} {'estimate (ms)':>14} {'rotate (ms)':>12}")
+    for tilt in (float(angle) for angle in args.angles.split(',')):
+        tilted = deskew.rotate_image(page, tilt)
+        angle, estimate_time = timed(deskew.estimate_skew, tilted, runs=args.runs)
+        corrected, rotate_time = timed(deskew.rotate_image, tilted, angle, runs=args.runs)
+        residual = deskew.estimate_skew(corrected)
+        print(f"{tilt:>6.2f} {angle:>9.2f} {residual:>9.2f} {estimate_time * 1000:>14.1f} {rotate_time * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
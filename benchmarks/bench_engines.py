@@ -0,0 +1,80 @@
+"""Micro-benchmark comparing per-image latency of the OCR engine backends
+
+Usage:
+    python benchmarks/bench_engines.py [--runs 20] [--engines pytesseract,tesserocr,capi]
+
+A synthetic text image is rendered locally so no sample files are needed.
+The first call per backend is reported separately because in-process
+backends pay the traineddata load once there.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PIL import Image, ImageDraw, ImageFont
+from ocr_core.engines import ENGINES, create_engine
+from ocr_core.tesseract import configure_tesseract
+
+SAMPLE_LINES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Pack my box with five dozen liquor jugs 0123456789.",
+    "Sphinx of black quartz, judge my vow!",
+]
+
+
+def render_sample(width=1200, line_height=48):
+    """Render a few lines of black text on a white background"""
+    image = Image.new('L', (width, line_height * (len(SAMPLE_LINES) + 1)), 255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=32)
+    except TypeError:
+        font = ImageFont.load_default()
+    for i, line in enumerate(SAMPLE_LINES):
+        draw.text((20, 20 + i * line_height), line, fill=0, font=font)
+    return image
+
+
+def bench(engine, image, runs, psm=6, oem=3):
+    """Return (first call latency, list of steady-state latencies) in seconds"""
+    start = time.perf_counter()
+    engine.image_to_string(image, psm=psm, oem=oem)
+    first = time.perf_counter() - start
+    
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.image_to_string(image, psm=psm, oem=oem)
+        timings.append(time.perf_counter() - start)
+    return first, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help="timed runs per backend")
+    parser.add_argument('--engines', default=','.join(ENGINES), help="comma-separated backend names")
+    parser.add_argument('--tesseract-cmd', default=None, help="path to the tesseract executable")
+    args = parser.parse_args()
+    
+    tesseract_cmd = configure_tesseract(args.tesseract_cmd)
+    image = render_sample()
+    
+    print(f"{'engine':<12} {'first (ms)':>11} {'median (ms)':>12} {'mean (ms)':>10} {'min (ms)':>9}")
+    for name in args.engines.split(','):
+        kwargs = {'tesseract_cmd': tesseract_cmd} if name == 'capi' else {}
+        try:
+            engine = create_engine(name, **kwargs)
+            first, timings = bench(engine, image, args.runs)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        print(f"{name:<12} {first * 1000:>11.1f} {statistics.median(timings) * 1000:>12.1f} "
+              f"{statistics.mean(timings) * 1000:>10.1f} {min(timings) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""End-to-end benchmark of the OCR pipeline on a synthetic corpus, with baseline comparison
+
+Usage:
+    python benchmarks/bench_pipeline.py [--corpus standard] [--runs 3] [--output results.json]
+                                        [--baseline baseline.json] [--threshold 0.10]
+
+A corpus of rendered pages (see corpus.py: print sizes, skews, noise,
+resolutions and a multi-page TIFF) is generated once into --corpus-dir.
+Every page is then loaded from its file, preprocessed, recognised and drawn
+as a preview, and each of those stages is timed separately; the median of
+--runs runs is kept. Peak RSS and pages per second are recorded too.
+
+Results are written as JSON. To check a change for regressions, save the
+results of the unchanged tree and pass them as --baseline: any stage that
+got slower (or pages/s that dropped, or peak RSS that grew) by more than
+its threshold is reported, and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+from corpus import CORPORA, build_corpus, corpus_id
+from ocr_core import deskew, resolution
+from ocr_core.documents import iter_pages
+from ocr_core.engines import get_engine
+from ocr_core.pipeline import ocr_image
+from ocr_core.tesseract import configure_tesseract
+
+STAGES = ('load', 'preprocess', 'ocr', 'display')
+
+# Preview box the display stage draws into, roughly the GUI's image pane
+DISPLAY_SIZE = (960, 720)
+
+# metric -> (direction, threshold option); 'lower' means lower is better
+METRICS = {
+    'load_s': ('lower', 'threshold'),
+    'preprocess_s': ('lower', 'threshold'),
+    'ocr_s': ('lower', 'threshold'),
+    'display_s': ('lower', 'threshold'),
+    'total_s': ('lower', 'threshold'),
+    'pages_per_second': ('higher', 'threshold'),
+    'peak_rss_mb': ('lower', 'rss_threshold'),
+}
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process, or None if it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def make_display():
+    """Return a function drawing a preview the way the GUI does, or None without Qt"""
+    try:
+        # Draw without a screen when there is none
+        if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        from preview import PreviewPyramid
+    except ImportError:
+        return None
+    
+    app = QApplication.instance() or QApplication([])
+    
+    def display(image):
+        # A new pyramid per page, as when an image is first shown
+        return PreviewPyramid(image).render(*DISPLAY_SIZE)
+    
+    display.app = app
+    return display
+
+
+def clear_memo_caches():
+    """Forget estimates memoized by image content, so every run does the full work"""
+    deskew._angle_cache.clear()
+    resolution._height_cache.clear()
+
+
+def bench_sample(sample, engine, display, psm):
+    """Time every stage for each page of a sample and return one dict per page"""
+    pages = []
+    page_iter = iter_pages(sample.path)
+    while True:
+        start = time.perf_counter()
+        image = next(page_iter, None)
+        load = time.perf_counter() - start
+        if image is None:
+            break
+        
+        result = ocr_image(image, psm_mode=psm, engine=engine)
+        stages = {name: seconds for name, seconds in result.timings.items() if name != 'ocr'}
+        
+        display_time = None
+        if display is not None:
+            start = time.perf_counter()
+            display(image)
+            display_time = time.perf_counter() - start
+        
+        pages.append({
+            'load': load,
+            'preprocess': sum(stages.values()),
+            'ocr': result.timings['ocr'],
+            'display': display_time,
+            'preprocess_stages': stages,
+            'psm': result.psm,
+            'score': result.score,
+            'pixels': int(image.shape[0] * image.shape[1]),
+        })
+    return pages
+
+
+def median_pages(runs):
+    """Combine the per-page results of several runs into per-page medians"""
+    merged = []
+    for page_runs in zip(*runs):
+        page = dict(page_runs[-1])
+        for stage in STAGES:
+            values = [run[stage] for run in page_runs if run[stage] is not None]
+            page[stage] = statistics.median(values) if values else None
+        page['preprocess_stages'] = {
+            name: statistics.median(run['preprocess_stages'].get(name, 0.0) for run in page_runs)
+            for name in page_runs[-1]['preprocess_stages']
+        }
+        merged.append(page)
+    return merged
+
+
+def summarise(samples):
+    """Return the corpus-wide metrics compared against a baseline"""
+    pages = [page for sample in samples for page in sample['pages']]
+    summary = {}
+    for stage in STAGES:
+        values = [page[stage] for page in pages if page[stage] is not None]
+        summary[f'{stage}_s'] = sum(values) if values else None
+    summary['total_s'] = sum(value for key, value in summary.items() if value is not None)
+    summary['pages'] = len(pages)
+    summary['pages_per_second'] = len(pages) / summary['total_s'] if summary['total_s'] else None
+    peak = peak_rss_bytes()
+    summary['peak_rss_mb'] = peak / (1024 * 1024) if peak is not None else None
+    return summary
+
+
+def compare(results, baseline, thresholds):
+    """Return a list of (metric, baseline, current, change, regressed) rows"""
+    rows = []
+    for metric, (better, threshold_name) in METRICS.items():
+        old = baseline['summary'].get(metric)
+        new = results['summary'].get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if better == 'higher' else change
+        rows.append((metric, old, new, change, worse > thresholds[threshold_name]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', choices=sorted(CORPORA), default='standard', help="which synthetic corpus to run")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'ocr_to_txt_corpus'),
+                        help="where the corpus is rendered (reused across runs)")
+    parser.add_argument('--runs', type=int, default=3, help="timed runs per page; the median is kept")
+    parser.add_argument('--psm', type=int, default=3, help="page segmentation mode")
+    parser.add_argument('--engine', default=None, help="OCR backend (default: auto)")
+    parser.add_argument('--no-display', action='store_true', help="skip the preview drawing stage")
+    parser.add_argument('--output', default='bench_pipeline.json', help="JSON file the results are written to")
+    parser.add_argument('--baseline', default=None, help="earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed relative slow-down per stage and drop in pages/s (default 0.10)")
+    parser.add_argument('--rss-threshold', type=float, default=0.20,
+                        help="allowed relative growth of peak RSS (default 0.20)")
+    parser.add_argument('--tesseract-cmd', default=None, help="path to the tesseract executable")
+    args = parser.parse_args()
+    
+    configure_tesseract(args.tesseract_cmd)
+    engine = get_engine(args.engine)
+    display = None if args.no_display else make_display()
+    
+    start = time.perf_counter()
+    corpus = build_corpus(args.corpus_dir, args.corpus)
+    print(f"corpus '{args.corpus}' ({corpus_id(CORPORA[args.corpus])}): {len(corpus)} files, "
+          f"{sum(len(sample.pages) for sample in corpus)} pages, ready in {time.perf_counter() - start:.1f} s")
+    
+    # One untimed pass loads the engine and warms the OS file cache
+    bench_sample(corpus[0], engine, display, args.psm)
+    
+    samples = []
+    print(f"{'sample':<16} {'pages':>5} {'load (ms)':>10} {'prep (ms)':>10} {'ocr (ms)':>10} {'display (ms)':>13} {'conf':>5}")
+    for sample in corpus:
+        runs = []
+        for _ in range(args.runs):
+            clear_memo_caches()
+            runs.append(bench_sample(sample, engine, display, args.psm))
+        pages = median_pages(runs)
+        samples.append({'name': sample.name, 'file': os.path.basename(sample.path), 'pages': pages})
+        
+        def total(stage):
+            values = [page[stage] for page in pages if page[stage] is not None]
+            return f"{sum(values) * 1000:.1f}" if values else "-"
+        
+        mean_score = sum(page['score'] for page in pages) / len(pages)
+        print(f"{sample.name:<16} {len(pages):>5} {total('load'):>10} {total('preprocess'):>10} "
+              f"{total('ocr'):>10} {total('display'):>13} {mean_score:>5.0f}")
+    
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'corpus': args.corpus,
+            'corpus_id': corpus_id(CORPORA[args.corpus]),
+            'runs': args.runs,
+            'psm': args.psm,
+            'engine': engine.name,
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'summary': None,
+        'samples': samples,
+    }
+    results['summary'] = summarise(samples)
+    summary = results['summary']
+    print(f"{summary['pages']} pages in {summary['total_s']:.2f} s: {summary['pages_per_second'] or 0:.2f} pages/s, "
+          f"peak RSS {summary['peak_rss_mb'] or 0:.0f} MB")
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1)
+    print(f"results written to {args.output}")
+    
+    if args.baseline is None:
+        return 0
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    for key in ('corpus_id', 'engine', 'psm'):
+        if baseline['meta'].get(key) != results['meta'][key]:
+            print(f"warning: baseline {key} is {baseline['meta'].get(key)!r}, this run used {results['meta'][key]!r}")
+    
+    rows = compare(results, baseline, {'threshold': args.threshold, 'rss_threshold': args.rss_threshold})
+    print(f"{'metric':<18} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, old, new, change, regressed in rows:
+        print(f"{metric:<18} {old:>10.3f} {new:>10.3f} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
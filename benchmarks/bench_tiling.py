@@ -0,0 +1,80 @@
+"""Benchmark of banded versus whole-page OCR on a very tall image
+
+Usage:
+    python benchmarks/bench_tiling.py [--height 12000] [--engine pytesseract] [--workers 1,2,4]
+
+A tall synthetic page (think of a long stitched screenshot) is rendered
+locally. It is recognised once in one piece and then in bands with
+different numbers of band workers, so the speed-up per core is visible.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+from ocr_core.engines import get_engine
+from ocr_core.strategy import select_best_psm
+from ocr_core.tesseract import configure_tesseract
+from ocr_core.tiling import find_bands, ocr_tiled
+
+SAMPLE_WORDS = ("The quick brown fox jumps over the lazy dog. Pack my box with five dozen "
+                "liquor jugs 0123456789. Sphinx of black quartz, judge my vow!").split()
+
+
+def render_tall_page(height, width=1200, line_height=44):
+    """Render lines of text down a white page, with a paragraph gap every 10 lines"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    y = 60
+    for i in range(height):
+        y += line_height + (line_height if i % 10 == 9 else 0)
+        if y > height - 40:
+            break
+        words = rng.choice(SAMPLE_WORDS, size=9)
+        cv2.putText(page, ' '.join(words), (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2, cv2.LINE_AA)
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--height', type=int, default=12000, help="page height in pixels")
+    parser.add_argument('--engine', default=None, help="OCR backend (default: auto)")
+    parser.add_argument('--workers', default=f"1,{os.cpu_count() or 1}", help="comma-separated band worker counts")
+    parser.add_argument('--psm', type=int, default=6, help="page segmentation mode")
+    parser.add_argument('--tesseract-cmd', default=None, help="path to the tesseract executable")
+    args = parser.parse_args()
+    
+    configure_tesseract(args.tesseract_cmd)
+    engine = get_engine(args.engine)
+    page = render_tall_page(args.height)
+    
+    start = time.perf_counter()
+    bands = find_bands(page)
+    print(f"page {page.shape[1]}x{page.shape[0]}, {len(bands)} bands "
+          f"found in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    # Size the candidate pool so it never limits the band workers
+    candidates = ThreadPoolExecutor(max_workers=max(int(n) for n in args.workers.split(',')))
+    start = time.perf_counter()
+    whole = select_best_psm(engine, page, args.psm, executor=candidates)
+    whole_time = time.perf_counter() - start
+    print(f"{'mode':<16} {'seconds':>8} {'speed-up':>9} {'lines':>6}")
+    print(f"{'whole page':<16} {whole_time:>8.2f} {1.0:>9.2f} {len(whole.text.splitlines()):>6}")
+    
+    for workers in (int(n) for n in args.workers.split(',')):
+        with ThreadPoolExecutor(max_workers=workers) as band_executor:
+            start = time.perf_counter()
+            tiled = ocr_tiled(engine, page, args.psm, bands=bands, executor=candidates,
+                              band_executor=band_executor)
+            seconds = time.perf_counter() - start
+        label = f"bands x{workers}"
+        print(f"{label:<16} {seconds:>8.2f} {whole_time / seconds:>9.2f} {len(tiled.text.splitlines()):>6}")
+
+
+if __name__ == "__main__":
+    main()
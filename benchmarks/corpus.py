@@ -0,0 +1,129 @@
+"""Synthetic, reproducible OCR corpus for the pipeline benchmarks
+
+Pages of known text are rendered locally with OpenCV's Hershey font and
+then degraded the way real inputs are: small or large print, tilted
+scans, sensor noise, low and high resolution, and multi-page TIFFs. Every
+page is generated from a fixed seed, so the same corpus (and the same
+``corpus_id``) is produced on every machine, and results from different
+runs can be compared.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+SAMPLE_WORDS = ("The quick brown fox jumps over the lazy dog. Pack my box with five dozen "
+                "liquor jugs 0123456789. Sphinx of black quartz, judge my vow!").split()
+
+# Bumped whenever rendering changes, so old baselines are not compared with new pages
+CORPUS_VERSION = 1
+
+# name: file stem; font_scale/thickness: Hershey text size; skew: degrees;
+# noise: std-dev of Gaussian noise in gray levels; resolution: scale applied
+# after rendering; pages: more than one makes a multi-page TIFF
+SampleSpec = namedtuple('SampleSpec', ['name', 'font_scale', 'thickness', 'skew', 'noise', 'resolution', 'pages'])
+
+# Sample: a rendered file with the text of each of its pages
+Sample = namedtuple('Sample', ['name', 'path', 'pages', 'spec'])
+
+CORPORA = {
+    'quick': (
+        SampleSpec('plain', 1.0, 2, 0.0, 0, 1.0, 1),
+        SampleSpec('skewed', 1.0, 2, 4.0, 0, 1.0, 1),
+        SampleSpec('multipage', 1.0, 2, 0.0, 0, 1.0, 3),
+    ),
+    'standard': (
+        SampleSpec('plain', 1.0, 2, 0.0, 0, 1.0, 1),
+        SampleSpec('small-print', 0.55, 1, 0.0, 0, 1.0, 1),
+        SampleSpec('large-print', 1.8, 3, 0.0, 0, 1.0, 1),
+        SampleSpec('skewed', 1.0, 2, 4.0, 0, 1.0, 1),
+        SampleSpec('skewed-steep', 1.0, 2, -8.0, 0, 1.0, 1),
+        SampleSpec('noisy', 1.0, 2, 0.0, 18, 1.0, 1),
+        SampleSpec('noisy-skewed', 1.0, 2, 2.5, 12, 1.0, 1),
+        SampleSpec('low-res', 1.0, 2, 0.0, 0, 0.5, 1),
+        SampleSpec('high-res', 1.0, 2, 0.0, 0, 2.0, 1),
+        SampleSpec('multipage', 1.0, 2, 0.0, 6, 1.0, 6),
+    ),
+}
+
+
+def corpus_id(specs):
+    """Return a short hash identifying the pages a list of specs renders"""
+    payload = json.dumps([CORPUS_VERSION] + [list(spec) for spec in specs])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def render_page(spec, seed, width=1700, height=2200):
+    """Render one page of a spec and return (BGR image, its text)"""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width), 255, dtype=np.uint8)
+    
+    # Lines of random words, wrapped to the page width
+    (_, text_height), _ = cv2.getTextSize("Xg", cv2.FONT_HERSHEY_SIMPLEX, spec.font_scale, spec.thickness)
+    line_height = int(text_height * 2.2)
+    lines = []
+    for y in range(120 + text_height, height - 120, line_height):
+        words = []
+        while True:
+            candidate = ' '.join(words + [str(rng.choice(SAMPLE_WORDS))])
+            (line_width, _), _ = cv2.getTextSize(candidate, cv2.FONT_HERSHEY_SIMPLEX, spec.font_scale, spec.thickness)
+            if line_width > width - 200:
+                break
+            words = candidate.split(' ')
+        line = ' '.join(words)
+        cv2.putText(page, line, (100, y), cv2.FONT_HERSHEY_SIMPLEX, spec.font_scale, 0, spec.thickness, cv2.LINE_AA)
+        lines.append(line)
+    
+    # Tilt around the centre, filling the uncovered corners with paper
+    if spec.skew:
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), spec.skew, 1.0)
+        page = cv2.warpAffine(page, matrix, (width, height), flags=cv2.INTER_LINEAR, borderValue=255)
+    
+    if spec.noise:
+        noise = rng.normal(0, spec.noise, page.shape)
+        page = np.clip(page + noise, 0, 255).astype(np.uint8)
+    
+    if spec.resolution != 1.0:
+        interpolation = cv2.INTER_AREA if spec.resolution < 1.0 else cv2.INTER_CUBIC
+        page = cv2.resize(page, None, fx=spec.resolution, fy=spec.resolution, interpolation=interpolation)
+    
+    return cv2.cvtColor(page, cv2.COLOR_GRAY2BGR), "\n".join(lines)
+
+
+def build_corpus(directory, name='standard'):
+    """Render a corpus into ``directory`` (reusing files already there) and return its Samples"""
+    from PIL import Image
+    
+    specs = CORPORA[name]
+    directory = os.path.join(directory, f"{name}-{corpus_id(specs)}")
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        return [Sample(entry['name'], os.path.join(directory, entry['file']), entry['pages'], spec)
+                for entry, spec in zip(manifest, specs)]
+    
+    manifest = []
+    samples = []
+    for index, spec in enumerate(specs):
+        rendered = [render_page(spec, seed=index * 1000 + page) for page in range(spec.pages)]
+        if spec.pages > 1:
+            filename = f"{spec.name}.tif"
+            frames = [Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB)) for image, _ in rendered]
+            frames[0].save(os.path.join(directory, filename), save_all=True, append_images=frames[1:],
+                           compression='tiff_lzw')
+        else:
+            filename = f"{spec.name}.png"
+            cv2.imwrite(os.path.join(directory, filename), rendered[0][0])
+        texts = [text for _, text in rendered]
+        manifest.append({'name': spec.name, 'file': filename, 'pages': texts})
+        samples.append(Sample(spec.name, os.path.join(directory, filename), texts, spec))
+    
+    # Written last, so an interrupted build is redone next time
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    return samples
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Import and run the batch command line
+from ocr_batch import main
+
+if __name__ == "__main__":
+    sys.exit(main())
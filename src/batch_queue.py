@@ -0,0 +1,50 @@
+import heapq
+import itertools
+
+
+class BatchQueue:
+    """Tabs waiting for "Process All", highest priority first
+    
+    Tabs of equal priority come out in the order they were pushed. A tab's
+    priority can be raised while it waits (e.g. when it becomes the visible
+    tab); the entry it replaces is skipped when it reaches the top.
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._priority = {}  # tab_id -> priority of its live entry
+        self._order = itertools.count()
+        
+    def push(self, tab_id, priority=0):
+        """Queue a tab, or move it to ``priority`` if it is already queued"""
+        self._priority[tab_id] = priority
+        heapq.heappush(self._heap, (-priority, next(self._order), tab_id))
+        
+    def raise_priority(self, tab_id, priority):
+        """Move a queued tab up to ``priority``; tabs not queued, or already as urgent, are left alone"""
+        if tab_id in self._priority and self._priority[tab_id] < priority:
+            self.push(tab_id, priority)
+        
+    def pop(self):
+        """Remove and return the most urgent tab ID, or None if the queue is empty"""
+        while self._heap:
+            priority, _, tab_id = heapq.heappop(self._heap)
+            if self._priority.get(tab_id) == -priority:
+                del self._priority[tab_id]
+                return tab_id
+        return None
+        
+    def discard(self, tab_id):
+        """Drop a tab from the queue if it is queued"""
+        self._priority.pop(tab_id, None)
+        
+    def clear(self):
+        """Drop every queued tab"""
+        self._heap.clear()
+        self._priority.clear()
+        
+    def __contains__(self, tab_id):
+        return tab_id in self._priority
+        
+    def __len__(self):
+        return len(self._priority)
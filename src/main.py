@@ -1,41 +1,100 @@
 import sys
 import os
-import cv2
-import numpy as np
-import pytesseract
-import traceback
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+import sqlite3
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QTextEdit, 
                             QFileDialog, QMessageBox, QSplitter, QSlider,
                             QFrame, QGroupBox, QCheckBox, QComboBox, 
-                            QTabWidget, QTabBar, QDialog, QStyle)
+                            QTabWidget, QTabBar, QDialog, QStyle, QProgressBar,
+                            QProgressDialog)
 from PyQt5.QtGui import QPixmap, QImage, QIcon, QFont, QPalette, QColor
-from PyQt5.QtCore import Qt, pyqtSlot, QSize
+from PyQt5.QtCore import Qt, pyqtSlot, QSize, QThreadPool, QThread, QEventLoop
 import time
 from PyQt5.QtCore import QTimer
+from ocr_worker import OCRJob, DocumentJob, OCRCancelled
+from region_label import RegionSelectLabel
+from tab_state import Tab, TabRegistry, TabState, TabWidgets
+from batch_queue import BatchQueue
+from screen_capture import RegionCapture, grab_screen, when_hidden
+from preview import PreviewPyramid
+from performance_panel import PerformancePanel
+from ocr_core.engines import get_engine
+from ocr_core.cache import OCRCache
+from ocr_core.pipeline import ocr_image
+from ocr_core.documents import is_document, count_pages, iter_pages, load_page, ocr_pages, page_header
+from ocr_core.regions import ocr_regions
+from ocr_core.watch import ScreenWatcher, format_delta
+from ocr_core.preprocess import StageCacheRegistry
+from ocr_core.image_store import ImageStore
+from ocr_core.tesseract import configure_tesseract
+from ocr_core.profiling import Profile, activate, span
+from ocr_core.autotune import TuneCache, TuneSettings, appearance_fingerprint, autotune
+from ocr_core.layout import merge_pages, offset_page
+from ocr_core.export import WRITERS, PageStore, export_pages, format_for_path
 
-# Try to set the path to the Tesseract executable
-tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-if os.path.exists(tesseract_path):
-    pytesseract.pytesseract.tesseract_cmd = tesseract_path
-else:
-    # Look for Tesseract in common locations
-    common_paths = [
-        r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-        r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-        r'C:\Tesseract-OCR\tesseract.exe'
-    ]
-    
-    found = False
-    for path in common_paths:
-        if os.path.exists(path):
-            pytesseract.pytesseract.tesseract_cmd = path
-            found = True
-            break
-    
-    if not found:
-        print("Warning: Tesseract OCR not found. Please install it and set the correct path.")
+# cv2, numpy and pytesseract are imported inside the methods that use them so
+# the window appears without waiting for them; Tesseract itself is located
+# by ocr_core.tesseract the first time an engine is requested
+
+# Quiet period after the last settings change before OCR is re-run
+OCR_DEBOUNCE_MS = 400
+
+# Page segmentation modes, indexed by mode number
+PSM_MODE_NAMES = [
+    "0 - Orientation and script detection only",
+    "1 - Automatic page segmentation with OSD",
+    "2 - Automatic page segmentation, but no OSD or OCR",
+    "3 - Fully automatic page segmentation, but no OSD (Default)",
+    "4 - Assume a single column of text of variable sizes",
+    "5 - Assume a single uniform block of vertically aligned text",
+    "6 - Assume a single uniform block of text",
+    "7 - Treat the image as a single text line",
+    "8 - Treat the image as a single word",
+    "9 - Treat the image as a single word in a circle",
+    "10 - Treat the image as a single character",
+    "11 - Sparse text. Find as much text as possible in no particular order",
+    "12 - Sparse text with OSD",
+    "13 - Raw line. Treat the image as a single text line"
+]
+
+# Memory budget for cached preprocessing intermediates across all tabs
+PREPROCESS_CACHE_BYTES = 512 * 1024 * 1024
+
+# Memory budget for the full-resolution images of all tabs; inactive tabs past it
+# keep only their preview and are re-loaded from their file or a spill file
+TAB_IMAGE_BYTES = 1024 * 1024 * 1024
+
+# On-disk OCR result cache; set OCR_CACHE_PATH to an empty string to disable it
+OCR_CACHE_PATH = os.environ.get(
+    'OCR_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.ocr_to_txt', 'ocr_cache.sqlite3')
+)
+
+# Settings found by "Auto-tune", reused for similar images; set OCR_AUTOTUNE_PATH to an empty string to keep them in memory only
+AUTOTUNE_CACHE_PATH = os.environ.get(
+    'OCR_AUTOTUNE_PATH',
+    os.path.join(os.path.expanduser('~'), '.ocr_to_txt', 'autotune.json')
+)
+
+# Watch mode: how often the region is re-captured, and where text deltas are logged
+WATCH_INTERVAL_MS = 1000
+WATCH_LOG_DIR = os.environ.get(
+    'OCR_WATCH_LOG_DIR',
+    os.path.join(os.path.expanduser('~'), '.ocr_to_txt', 'watch')
+)
+
+# Watch mode recognises blocks of text lines rather than whole pages
+WATCH_PSM_MODE = 6
+
+# Thread pool priorities: jobs the user is waiting on run before queued batch jobs
+INTERACTIVE_PRIORITY = 1
+BATCH_PRIORITY = 0
+
+# "Process All" queue priorities; the visible tab is always next
+VISIBLE_TAB_PRIORITY = 1
+
+# Save dialog filters of the structured export formats, written from the recognised layout
+STRUCTURED_FILTERS = ";;".join(f"{writer.label} (*{writer.extension})" for writer in WRITERS.values())
 
 class ModernStyle:
     """Class to define modern styling for the application"""
@@ -45,6 +104,7 @@ class ModernStyle:
     CARD_COLOR = "#ffffff"
     TEXT_COLOR = "#212121"
     ACCENT_COLOR = "#ff4081"  # Pink accent
+    ERROR_COLOR = "#d32f2f"  # Material Red 700
     LIGHT_TEXT_COLOR = "#757575"  # Gray
     HOVER_COLOR = "#E3F2FD"  # Material Blue 50
     
@@ -289,15 +349,43 @@ class OCRTextExtractor(QMainWindow):
         super().__init__()
         
         # Initialize variables
-        self.tabs = {}  # Dictionary to store tab data
-        self.current_tab = 0
+        self.tabs = None  # TabRegistry, created with the tab widget in initUI
         self.next_tab_id = 0
+        self.next_job_id = 0
+        self.ocr_jobs = {}  # Jobs in flight, kept alive until they report back
+        
+        # Results keyed by image content and effective settings
+        self.ocr_cache = self.create_ocr_cache()
+        
+        # Auto-tuned settings by image appearance
+        self.tune_cache = TuneCache(AUTOTUNE_CACHE_PATH or None)
+        
+        # Per-tab preprocessing intermediates, so a slider change only redoes later stages
+        self.stage_caches = StageCacheRegistry(PREPROCESS_CACHE_BYTES)
+        
+        # Full-resolution tab images, evicted from memory least recently used first
+        self.image_store = ImageStore(TAB_IMAGE_BYTES, on_evict=self.on_image_evicted)
+        
+        # Thread pool used to run OCR jobs off the GUI thread; not the global
+        # pool, which Qt blocks on for large image conversions in the GUI thread
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(QThread.idealThreadCount())
+        
+        # "Process All": tabs still queued, tabs whose OCR is under way, and progress counters
+        self.batch_queue = BatchQueue()
+        self.batch_running = set()
+        self.batch_total = 0
+        self.batch_failed = 0
+        self.batch_started = 0.0
+        
+        # Overlays of a region capture in progress
+        self.region_capture = None
         
         # Initialize UI
         self.initUI()
         
-        # Check if Tesseract is installed
-        self.check_tesseract()
+        # Check if Tesseract is installed once the window is up
+        QTimer.singleShot(0, self.check_tesseract)
         
     def close_tab(self, index):
         """Close a tab and remove its data"""
@@ -305,74 +393,89 @@ class OCRTextExtractor(QMainWindow):
             # Don't close the last tab
             return
             
-        # Check if the index is valid and not the plus tab
-        if index < 0 or index >= self.tab_widget.count() - 1:  # Skip the plus tab
-            return
-            
-        # Get the tab key to remove
-        tab_keys = list(self.tabs.keys())
-        if index >= len(tab_keys):
-            # Index out of range for the tabs dictionary
+        # Tabs can be moved, so the position is resolved through the page widget
+        tab = self.tabs.at(index)
+        if tab is None:
+            # The plus tab, or an invalid index
             return
             
-        tab_idx = tab_keys[index]
+        # Stop any pending or running OCR for the tab
+        self.stop_watch(tab.tab_id)
+        tab.ui.ocr_timer.stop()
+        tab.ui.watch_timer.stop()
+        self.cancel_ocr_jobs(tab)
+        
+        # A closed tab no longer counts towards "Process All"
+        self.batch_queue.discard(tab.tab_id)
+        self.batch_running.discard(tab.tab_id)
         
         # Remove the tab
+        self.tabs.remove(tab.tab_id)
         self.tab_widget.removeTab(index)
-        del self.tabs[tab_idx]
-        
-        # Update current tab index
-        self.current_tab = self.tab_widget.currentIndex()
-        
+        tab.ui.page.deleteLater()
+        self.stage_caches.discard(tab.tab_id)
+        self.image_store.discard(tab.tab_id)
+        self.set_tab_pages(tab, None)
+        self.update_memory_status()
+        
+        # Never leave the plus tab selected
+        if self.tabs.current() is None:
+            self.tab_widget.setCurrentIndex(max(0, self.tab_widget.count() - 2))
+            
         # Update UI for the current tab
         self.update_ui_from_tab()
+        self.feed_batch()
             
     def tab_changed(self, index):
         """Handle tab change event"""
-        # Check if the index is valid
-        if index < 0 or index >= self.tab_widget.count():
-            return
-            
-        # Check if the tab is the plus tab (last tab)
-        if index == self.tab_widget.count() - 1:
-            # If it's the plus tab, don't update the current tab
+        # The plus tab and invalid indexes have no tab
+        tab = self.tabs.at(index) if self.tabs is not None else None
+        if tab is None:
             return
             
-        # Update current tab index
-        self.current_tab = index
+        # Keep the visible tab's preprocessing intermediates and image; others may be evicted
+        self.stage_caches.set_active(tab.tab_id)
+        self.image_store.set_active(tab.tab_id)
+        
+        # A tab still waiting for "Process All" is done next once it is shown
+        self.batch_queue.raise_priority(tab.tab_id, VISIBLE_TAB_PRIORITY)
+        
+        # An evicted image comes back when its tab is shown again
+        if tab.state.preview is None and self.image_store.has(tab.tab_id):
+            self.display_image(tab)
         
         # Update UI based on current tab
         self.update_ui_from_tab()
             
     def update_ui_from_tab(self):
         """Update UI elements based on current tab"""
-        # Check if there are any tabs
-        if not self.tabs:
-            return
-            
-        # Check if current_tab is valid
-        if self.current_tab < 0 or self.current_tab >= self.tab_widget.count():
-            return
-            
-        # Check if the current tab is the plus tab (last tab)
-        if self.current_tab == self.tab_widget.count() - 1:
-            return
-            
-        # Get the tab data for the current tab
-        tab_keys = list(self.tabs.keys())
-        if self.current_tab >= len(tab_keys):
+        tab = self.tabs.current()
+        if tab is None:
             return
             
-        tab_idx = tab_keys[self.current_tab]
-        tab_data = self.tabs[tab_idx]
-        
         # Update button states
-        has_image = tab_data['cv_image'] is not None
-        self.process_btn.setEnabled(has_image)
+        has_image = self.image_store.has(tab.tab_id)
+        watching = tab.state.watcher is not None
+        self.process_btn.setEnabled(has_image and not watching)
+        
+        # One search at a time per tab, and not while "Process All" is working on it
+        in_batch = tab.tab_id in self.batch_running or tab.tab_id in self.batch_queue
+        tuning = tab.state.tune_job_id is not None
+        self.autotune_btn.setEnabled(has_image and not watching and not tuning and not in_batch)
+        self.autotune_btn.setText("Tuning..." if tuning else "Auto-tune")
+        
+        # Watch mode re-captures the tab's last captured region
+        self.watch_btn.setEnabled(tab.state.capture_region is not None)
+        self.watch_btn.setText("Stop Watching" if watching else "Watch Region")
         
-        has_text = bool(tab_data['text_edit'].toPlainText().strip())
+        has_text = bool(tab.ui.text_edit.toPlainText().strip())
         self.save_btn.setEnabled(has_text)
         
+        # "Process All" becomes "Cancel All" while a batch runs
+        batch_active = bool(self.batch_queue or self.batch_running)
+        self.process_all_btn.setText("Cancel All" if batch_active else "Process All")
+        self.process_all_btn.setEnabled(batch_active or any(self.image_store.has(tab.tab_id) for tab in self.tabs))
+        
         # Update save all button
         self.update_save_all_button()
         
@@ -380,8 +483,8 @@ class OCRTextExtractor(QMainWindow):
         """Update the state of the save all button"""
         # Enable save all button if any tab has text
         has_any_text = False
-        for tab_data in self.tabs.values():
-            if tab_data['text_edit'].toPlainText().strip():
+        for tab in self.tabs:
+            if tab.ui.text_edit.toPlainText().strip():
                 has_any_text = True
                 break
                 
@@ -389,230 +492,1009 @@ class OCRTextExtractor(QMainWindow):
         
     def load_image(self):
         """Load an image from file"""
-        # Get current tab index
-        tab_idx = list(self.tabs.keys())[self.current_tab]
-        tab_data = self.tabs[tab_idx]
+        # Get the current tab
+        tab = self.tabs.current()
+        tab_id = tab.tab_id
         
         # Open file dialog
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
             "Open Image", 
             "", 
-            "Image Files (*.png *.jpg *.jpeg *.bmp *.tif *.tiff)"
+            "Image Files (*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.pdf)"
         )
         
         if file_path:
             try:
-                # Load image
-                cv_image = cv2.imread(file_path)
+                import cv2
+                
+                # Multi-page TIFFs and PDFs are OCR'd page by page from the file;
+                # only the first page is decoded now, as the preview
+                with activate(tab.state.profile), span('load'):
+                    if is_document(file_path):
+                        page_count = count_pages(file_path)
+                        cv_image = load_page(file_path)
+                    else:
+                        page_count = 1
+                        cv_image = cv2.imread(file_path)
                 if cv_image is None:
                     raise Exception("Failed to load image")
                     
-                # Store image in tab data
-                tab_data['cv_image'] = cv_image
+                # A loaded file replaces whatever region was being watched
+                self.stop_watch(tab_id)
+                
+                # Store the image; it can be decoded again from the file if evicted
+                self.set_tab_image(tab_id, cv_image, source=file_path,
+                                   loader=lambda path=file_path: load_page(path))
+                tab.state.document_path = file_path if page_count > 1 else None
+                tab.state.page_count = page_count
+                tab.state.capture_region = None
                 
                 # Display image
-                self.display_image(tab_data)
+                self.display_image(tab)
+                self.show_performance(tab)
                 
-                # Enable process button
-                self.process_btn.setEnabled(True)
+                # Update button states
+                self.update_ui_from_tab()
                 
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load image: {str(e)}")
                 
     def capture_screenshot(self):
         """Capture a screenshot and load it into the current tab"""
-        # Minimize the window to avoid capturing it
-        self.showMinimized()
-        
-        # Wait a moment for the window to minimize
-        QTimer.singleShot(500, self._take_screenshot)
+        # Hide the window to avoid capturing it, and capture as soon as it is gone
+        when_hidden(self, self._take_screenshot)
         
     def _take_screenshot(self):
-        """Take the actual screenshot after minimizing the window"""
+        """Take the actual screenshot once the window is hidden"""
         try:
-            # Capture the full screen
-            screen = QApplication.primaryScreen()
-            screenshot = screen.grabWindow(0)
+            # Capture the full primary screen straight into a BGR array
+            cv_image = grab_screen(QApplication.primaryScreen())
+            self.load_captured_image(cv_image)
+            self.restore_window()
             
-            # Convert QPixmap to QImage
-            image = screenshot.toImage()
+        except Exception as e:
+            self.restore_window()  # Make sure window is restored even if there's an error
+            QMessageBox.critical(self, "Error", f"Failed to capture screenshot: {str(e)}")
             
-            # Convert QImage to numpy array
-            width, height = image.width(), image.height()
-            ptr = image.constBits()
-            ptr.setsize(image.byteCount())
-            arr = np.array(ptr).reshape(height, width, 4)  # RGBA
+    def capture_region(self):
+        """Let the user drag a region on any screen, then load and OCR just that region"""
+        when_hidden(self, self._select_capture_region)
+        
+    def _select_capture_region(self):
+        """Freeze the screens and show the region selection overlays once the window is hidden"""
+        try:
+            self.region_capture = RegionCapture(self._on_region_captured, self.restore_window)
+            self.region_capture.start()
+        except Exception as e:
+            self.restore_window()
+            QMessageBox.critical(self, "Error", f"Failed to capture screenshot: {str(e)}")
             
-            # Convert RGBA to BGR (OpenCV format)
-            cv_image = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+    def _on_region_captured(self, cv_image, screen, rect):
+        """Load a captured region into the current tab and start OCR right away"""
+        self.region_capture = None
+        if cv_image is None:
+            self.restore_window()
+            return
             
-            # Get current tab data
-            tab_idx = list(self.tabs.keys())[self.current_tab]
-            tab_data = self.tabs[tab_idx]
+        tab = self.load_captured_image(cv_image)
+        
+        # Remember where the region was, so it can be captured again later
+        tab.state.capture_region = (screen.name(), rect)
+        
+        self.restore_window()
+        self.update_ui_from_tab()
+        self.process_ocr(tab)
+        
+    def load_captured_image(self, cv_image):
+        """Store a captured image in the current tab and display it"""
+        # Get the current tab
+        tab = self.tabs.current()
+        tab_id = tab.tab_id
+        
+        # A new capture replaces whatever region was being watched
+        self.stop_watch(tab_id)
+        
+        # Store the image
+        self.set_tab_image(tab_id, cv_image)
+        tab.state.document_path = None
+        tab.state.page_count = 1
+        tab.state.capture_region = None
+        
+        # Display the image
+        self.display_image(tab)
+        
+        # Update button states
+        self.update_ui_from_tab()
+        return tab
+        
+    def toggle_watch(self):
+        """Start or stop watching the current tab's captured region"""
+        tab = self.tabs.current()
+        if tab.state.watcher is None:
+            self.start_watch(tab.tab_id)
+        else:
+            self.stop_watch(tab.tab_id)
+        self.update_ui_from_tab()
+        
+    def start_watch(self, tab_id):
+        """Re-capture a tab's region on an interval and stream its text changes"""
+        tab = self.tabs.get(tab_id)
+        if tab.state.capture_region is None:
+            QMessageBox.warning(self, "Warning", "Capture a region first to choose what to watch")
+            return
             
-            # Store the image
-            tab_data['cv_image'] = cv_image
+        # Every delta is also appended to a log file, one per watch session
+        log_path = os.path.join(WATCH_LOG_DIR, f"watch_{time.strftime('%Y%m%d-%H%M%S')}.log")
+        try:
+            os.makedirs(WATCH_LOG_DIR, exist_ok=True)
+            tab.state.watch_log = open(log_path, 'a', encoding='utf-8')
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to open watch log: {str(e)}")
+            return
             
-            # Display the image
-            self.display_image(tab_data)
+        # Watch mode owns the tab's text from now on
+        tab.ui.ocr_timer.stop()
+        self.cancel_ocr_jobs(tab)
+        if tab_id in self.batch_queue or tab_id in self.batch_running:
+            self.settle_batch_tab(tab, 'cancelled')
+        tab.state.watcher = ScreenWatcher()
+        tab.ui.text_edit.clear()
+        tab.ui.ocr_info_label.setText("Watching")
+        tab.ui.ocr_info_label.setToolTip(f"Changes are logged to {log_path}")
+        
+        tab.ui.watch_timer.start(WATCH_INTERVAL_MS)
+        self.watch_tick(tab_id)
+        
+    def stop_watch(self, tab_id):
+        """Stop watching a tab's region and close its log"""
+        tab = self.tabs.get(tab_id)
+        if tab is None or tab.state.watcher is None:
+            return
             
-            # Enable process button
-            self.process_btn.setEnabled(True)
+        tab.ui.watch_timer.stop()
+        tab.state.watcher = None
+        self.cancel_ocr_jobs(tab)
+        tab.state.watch_log.close()
+        tab.state.watch_log = None
+        tab.ui.ocr_info_label.setText("Stopped watching")
+        
+    def watch_tick(self, tab_id):
+        """Re-capture a watched region and OCR it if it changed"""
+        tab = self.tabs.get(tab_id)
+        if tab is None or tab.state.watcher is None:
+            return
             
-            # Restore and maximize the window
-            self.showNormal()
-            self.showMaximized()
-            self.activateWindow()  # Ensure window gets focus
-            self.raise_()  # Bring window to front
+        # Skip the tick while the previous frame is still being recognised, so work never piles up
+        if tab.state.watch_job_id is not None:
+            return
             
+        screen_name, rect = tab.state.capture_region
+        screen = next((screen for screen in QApplication.screens() if screen.name() == screen_name), None)
+        try:
+            if screen is None:
+                raise RuntimeError(f"Screen {screen_name} is no longer connected")
+            frame = grab_screen(screen, rect)
+            if frame is None:
+                raise RuntimeError("The watched region is no longer on the screen")
         except Exception as e:
-            self.showNormal()  # Make sure window is restored even if there's an error
-            self.activateWindow()  # Ensure window gets focus even after error
+            self.stop_watch(tab_id)
+            self.update_ui_from_tab()
             QMessageBox.critical(self, "Error", f"Failed to capture screenshot: {str(e)}")
+            return
             
-    def display_image(self, tab_data=None):
-        """Display the image in the current tab"""
-        if isinstance(tab_data, np.ndarray):
-            # If tab_data is actually a cv_image
-            cv_image = tab_data
+        # Unchanged frames stop at a cheap downscaled comparison
+        if not tab.state.watcher.has_changed(frame):
+            return
             
-            # Get current tab data
-            tab_idx = list(self.tabs.keys())[self.current_tab]
-            tab_data = self.tabs[tab_idx]
+        self.set_tab_image(tab_id, frame)
+        self.display_image(tab)
+        
+        settings = self.settings_snapshot(tab)
+        settings['watcher'] = tab.state.watcher
+        
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        job = OCRJob(tab_id, job_id, self.run_watch_ocr, frame, settings, **self.profiling_options(tab))
+        job.signals.finished.connect(self.on_watch_finished)
+        job.signals.error.connect(self.on_watch_error)
+        job.signals.cancelled.connect(self.on_watch_cancelled)
+        
+        self.ocr_jobs[job_id] = job
+        tab.state.jobs_in_flight.add(job_id)
+        tab.state.latest_job_id = job_id
+        tab.state.watch_job_id = job_id
+        self.update_busy_indicator(tab)
+        
+        self.thread_pool.start(job)
+        
+    def restore_window(self):
+        """Show the window again after a capture"""
+        # Restore and maximize the window
+        self.showNormal()
+        self.showMaximized()
+        self.activateWindow()  # Ensure window gets focus
+        self.raise_()  # Bring window to front
+        
+    def display_image(self, tab=None):
+        """Display the image in the current tab"""
+        import numpy as np
+        
+        if isinstance(tab, np.ndarray):
+            # If tab is actually a cv_image
+            cv_image = tab
             
-            # Store the image
-            tab_data['cv_image'] = cv_image
+            # Store the image in the current tab
+            tab = self.tabs.current()
+            self.set_tab_image(tab.tab_id, cv_image)
         
-        if tab_data is None:
-            # Get current tab data
-            tab_idx = list(self.tabs.keys())[self.current_tab]
-            tab_data = self.tabs[tab_idx]
+        if tab is None:
+            # Get the current tab
+            tab = self.tabs.current()
+            
+        image = self.tab_image(tab.tab_id)
+        if image is None:
+            return
+            
+        with activate(tab.state.profile), span('display'):
+            # The pyramid is built once per image; redraws only read its small levels
+            if tab.state.preview is None or tab.state.preview.image is not image:
+                tab.state.preview = PreviewPyramid(image)
+                
+            # Draw the preview to fit the label while maintaining aspect ratio
+            label = tab.ui.image_label
+            label.setPixmap(tab.state.preview.render(label.width(), label.height()))
+        height, width = image.shape[:2]
+        label.set_image_size(width, height)
+        
+    def redraw_preview(self, tab_id):
+        """Redraw a tab's preview after its label was resized"""
+        # Evicted images are not re-loaded just to redraw; the old preview stays until the tab is shown
+        if tab_id in self.tabs and self.image_store.is_resident(tab_id):
+            self.display_image(self.tabs.get(tab_id))
+            
+    def set_tab_image(self, tab_id, image, source=None, loader=None):
+        """Store a tab's full-resolution image under the memory budget"""
+        self.image_store.put(tab_id, image, source=source, loader=loader)
+        self.update_memory_status()
+        
+        # A badge from an earlier "Process All" describes the old image
+        tab = self.tabs.get(tab_id)
+        if tab is not None and tab_id not in self.batch_running:
+            self.set_badge(tab, None)
+        
+    def tab_image(self, tab_id):
+        """Return a tab's full-resolution image, re-loading it if it was evicted, or None"""
+        try:
+            image = self.image_store.get(tab_id)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to reload image: {str(e)}")
+            return None
+        self.update_memory_status()
+        return image
+        
+    def on_image_evicted(self, tab_id):
+        """Let go of everything derived from an image that left memory"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            # The label keeps showing its pixmap as a thumbnail
+            tab.state.preview = None
+        self.update_memory_status()
+        
+    def update_memory_status(self):
+        """Show how much of the image memory budget is in use"""
+        stats = self.image_store.stats()
+        text = (f"Images in memory: {stats['resident_bytes'] / (1024 * 1024):.0f} of "
+                f"{stats['max_bytes'] / (1024 * 1024):.0f} MB")
+        if stats['evicted']:
+            text += f" \u00b7 {stats['evicted']} unloaded"
+        self.memory_label.setText(text)
+        self.memory_label.setToolTip(
+            f"{stats['resident']} tab images in memory, {stats['evicted']} unloaded; "
+            f"{stats['spilled_bytes'] / (1024 * 1024):.0f} MB spilled to disk")
+        
+    def schedule_ocr(self, tab_id):
+        """Queue a re-OCR for a tab once its settings stop changing"""
+        tab = self.tabs.get(tab_id)
+        if tab is None or not self.image_store.has(tab_id):
+            return
             
-        if tab_data['cv_image'] is None:
+        # Watch mode picks up the new settings with the next changed frame
+        if tab.state.watcher is not None:
             return
             
-        # Convert OpenCV image to QPixmap
-        height, width, channel = tab_data['cv_image'].shape
-        bytes_per_line = 3 * width
-        q_image = QImage(tab_data['cv_image'].data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
-        pixmap = QPixmap.fromImage(q_image)
+        # Any job started with the old settings is now out of date
+        self.cancel_ocr_jobs(tab)
+        
+        # Restart the quiet period; only the last change in a burst starts a job
+        tab.ui.ocr_timer.start(OCR_DEBOUNCE_MS)
+        
+    def run_scheduled_ocr(self, tab_id):
+        """Start the OCR job for a tab whose quiet period has elapsed"""
+        if tab_id in self.tabs and self.image_store.has(tab_id):
+            self.process_ocr(self.tabs.get(tab_id))
+            
+    def cancel_ocr_jobs(self, tab):
+        """Cancel every OCR job in flight for a tab"""
+        for job_id in list(tab.state.jobs_in_flight):
+            job = self.ocr_jobs[job_id]
+            
+            # Jobs still waiting in the queue can be dropped outright
+            if self.thread_pool.tryTake(job):
+                del self.ocr_jobs[job_id]
+                tab.state.jobs_in_flight.discard(job_id)
+            else:
+                # Running jobs stop at their next cancellation point
+                job.cancel()
+                
+        self.update_busy_indicator(tab)
+        
+    def process_ocr(self, tab=None, priority=INTERACTIVE_PRIORITY):
+        """Start OCR on the current image in a background worker and return the job ID, or None"""
+        if tab is None:
+            # Get the current tab
+            tab = self.tabs.current()
+            
+        # Results are routed back to the tab by its ID
+        tab_id = tab.tab_id
+        
+        if not self.image_store.has(tab_id):
+            QMessageBox.warning(self, "Warning", "No image loaded")
+            return None
+            
+        # Documents are read from their file; anything else needs the image back in memory
+        image = None
+        if not tab.state.document_path:
+            image = self.tab_image(tab_id)
+            if image is None:
+                return None
+                
+        # A direct request supersedes any pending or running job for this tab
+        tab.ui.ocr_timer.stop()
+        self.cancel_ocr_jobs(tab)
+        
+        # Snapshot the settings so the worker never touches the widgets
+        settings = self.settings_snapshot(tab)
+        
+        # Create the job and route its signals back to the GUI thread
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        if tab.state.document_path:
+            job = DocumentJob(tab_id, job_id, self.run_document_ocr, tab.state.document_path, settings,
+                              **self.profiling_options(tab))
+            job.signals.page_finished.connect(self.on_page_finished)
+            job.signals.finished.connect(self.on_document_finished)
+        elif settings['regions']:
+            job = OCRJob(tab_id, job_id, self.run_region_ocr, image, settings, **self.profiling_options(tab))
+            job.signals.finished.connect(self.on_regions_finished)
+        else:
+            job = OCRJob(tab_id, job_id, self.run_ocr, image, settings, **self.profiling_options(tab))
+            job.signals.finished.connect(self.on_ocr_finished)
+        job.signals.started.connect(self.on_ocr_started)
+        job.signals.error.connect(self.on_ocr_error)
+        job.signals.cancelled.connect(self.on_ocr_cancelled)
+        
+        # Track the job as in flight and show the busy indicator
+        self.ocr_jobs[job_id] = job
+        tab.state.jobs_in_flight.add(job_id)
+        tab.state.latest_job_id = job_id
+        self.update_busy_indicator(tab)
+        
+        self.thread_pool.start(job, priority)
+        return job_id
+        
+    def settings_snapshot(self, tab):
+        """Copy a tab's OCR settings into a plain dict a worker can use without the widgets"""
+        return {
+            'tab_id': tab.tab_id,
+            'font_index': tab.state.font_index,
+            'psm_mode': tab.state.psm_mode,
+            'oem_mode': tab.state.oem_mode,
+            'contrast_value': tab.state.contrast_value,
+            'brightness_value': tab.state.brightness_value,
+            'sharpness_value': tab.state.sharpness_value,
+            'deskew_enabled': tab.state.deskew_enabled,
+            'normalize_enabled': tab.state.normalize_enabled,
+            'tiling_enabled': tab.state.tiling_enabled,
+            'regions': list(tab.state.regions)
+        }
+        
+    def profiling_options(self, tab):
+        """Return the OCRJob keyword arguments recording a job into the tab's profile"""
+        return {
+            'profile': tab.state.profile,
+            'cprofile': tab.ui.perf_panel.cprofile_enabled,
+            'memory': tab.ui.perf_panel.memory_enabled
+        }
+        
+    def show_performance(self, tab, job_id=None):
+        """Show a job's stage timings (by default the tab's latest job) in the tab's Performance panel"""
+        tab.ui.perf_panel.show_profile(tab.state.profile, tab.state.latest_job_id if job_id is None else job_id)
+        
+    def create_ocr_cache(self):
+        """Create the OCR result cache, falling back to memory only if the disk tier fails"""
+        try:
+            return OCRCache(disk_path=OCR_CACHE_PATH or None)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: OCR disk cache disabled: {e}")
+            return OCRCache()
+            
+    def ocr_options(self, settings):
+        """Return the ocr_image keyword arguments for a settings snapshot"""
+        return {
+            'psm_mode': settings['psm_mode'],
+            'oem_mode': settings['oem_mode'],
+            'contrast': settings['contrast_value'],
+            'brightness': settings['brightness_value'],
+            'sharpness': settings['sharpness_value'],
+            'deskew': settings['deskew_enabled'],
+            'normalize': settings['normalize_enabled'],
+            'tiling': settings['tiling_enabled'],
+            # Reuse the shared engine; in-process backends keep a handle per worker thread
+            'engine': get_engine(),
+            'cache': self.ocr_cache
+        }
+        
+    def run_ocr(self, image, settings, is_cancelled=lambda: False):
+        """Run preprocessing and Tesseract on an image (called from worker threads)"""
+        # Preprocess and recognise, reusing cached results for unchanged inputs
+        result = ocr_image(image, **self.ocr_options(settings),
+                           stage_cache=self.stage_caches.get(settings['tab_id']),
+                           is_cancelled=is_cancelled)
+        if result is None:
+            raise OCRCancelled()
+            
+        return result
         
-        # Scale pixmap to fit in the label while maintaining aspect ratio
-        label_size = tab_data['image_label'].size()
-        scaled_pixmap = pixmap.scaled(label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    def run_region_ocr(self, image, settings, is_cancelled=lambda: False):
+        """OCR each selected region of an image in parallel (called from worker threads)"""
+        options = self.ocr_options(settings)
         
-        tab_data['image_label'].setPixmap(scaled_pixmap)
+        def ocr_region(view, region):
+            # Regions may override the tab's PSM mode
+            psm_mode = options['psm_mode'] if region.psm is None else region.psm
+            return ocr_image(view, **dict(options, psm_mode=psm_mode), is_cancelled=is_cancelled)
+            
+        # Regions are views into the image, and each is cached by its own content
+        results = ocr_regions(ocr_region, image, settings['regions'], is_cancelled=is_cancelled)
+        if results is None:
+            raise OCRCancelled()
+            
+        return results
+        
+    def run_document_ocr(self, path, settings, is_cancelled, report_page):
+        """OCR every page of a document, reporting each page as it completes (called from worker threads)"""
+        options = self.ocr_options(settings)
+        
+        def ocr_page(page):
+            # Pages are not memoized per stage; each one is seen only once per run
+            result = ocr_image(page, **options, is_cancelled=is_cancelled)
+            if result is None:
+                raise OCRCancelled()
+            return result
+            
+        # Pages are decoded lazily into a bounded queue, so memory does not grow with the page count
+        page_count = 0
+        for page_index, result in ocr_pages(iter_pages(path), ocr_page, is_cancelled=is_cancelled):
+            report_page(page_index, result)
+            page_count += 1
+            
+        if is_cancelled():
+            raise OCRCancelled()
+        return page_count
+        
+    def run_watch_ocr(self, frame, settings, is_cancelled=lambda: False):
+        """OCR the text blocks of a watched frame that were not seen before (called from worker threads)"""
+        # Screen text is not skewed and the blocks are small, so those stages are skipped
+        options = dict(self.ocr_options(settings), psm_mode=WATCH_PSM_MODE, deskew=False, tiling=False)
+        
+        def ocr_block(view):
+            result = ocr_image(view, **options, is_cancelled=is_cancelled)
+            if result is None:
+                raise OCRCancelled()
+            return result.text
+            
+        return settings['watcher'].update(frame, ocr_block)
         
-    def preprocess_image(self, image):
-        """Simple image preprocessing to improve OCR results"""
+    def start_autotune(self, tab=None):
+        """Search for the best settings of a tab's image in a background worker"""
+        if tab is None:
+            # Get the current tab
+            tab = self.tabs.current()
+            
+        tab_id = tab.tab_id
+        if not self.image_store.has(tab_id):
+            QMessageBox.warning(self, "Warning", "No image loaded")
+            return
+            
+        # Documents are tuned on their first page, which is the one shown
+        image = self.tab_image(tab_id)
         if image is None:
+            return
+            
+        # Tuning tries its own settings; the tab's are only the starting point
+        settings = self.settings_snapshot(tab)
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        job = OCRJob(tab_id, job_id, self.run_autotune, image, settings, **self.profiling_options(tab))
+        job.signals.finished.connect(self.on_autotune_finished)
+        job.signals.error.connect(self.on_autotune_error)
+        job.signals.cancelled.connect(self.on_autotune_cancelled)
+        
+        # Tracked like an OCR job, so closing the tab or a new OCR run cancels it
+        self.ocr_jobs[job_id] = job
+        tab.state.jobs_in_flight.add(job_id)
+        tab.state.tune_job_id = job_id
+        self.update_busy_indicator(tab)
+        self.update_ui_from_tab()
+        self.statusBar().showMessage(f"Auto-tuning {self.tab_widget.tabText(self.tabs.index_of(tab))}...")
+        
+        self.thread_pool.start(job, INTERACTIVE_PRIORITY)
+        
+    def run_autotune(self, image, settings, is_cancelled=lambda: False):
+        """Return tuned settings for an image, reusing those of a similar image (called from worker threads)"""
+        engine = get_engine()
+        context = TuneCache.context_key(engine, settings['deskew_enabled'], settings['normalize_enabled'])
+        fingerprint = appearance_fingerprint(image)
+        cached = self.tune_cache.lookup(fingerprint, context)
+        if cached is not None:
+            return cached
+            
+        start = TuneSettings(settings['psm_mode'], settings['oem_mode'], settings['contrast_value'],
+                             settings['brightness_value'], settings['sharpness_value'])
+        result = autotune(image, engine, start, deskew=settings['deskew_enabled'],
+                          normalize=settings['normalize_enabled'], is_cancelled=is_cancelled)
+        if result is None:
+            raise OCRCancelled()
+            
+        # Images without readable text tell nothing about other images
+        if result.score > 0:
+            self.tune_cache.store(fingerprint, context, result)
+        return result
+        
+    def on_autotune_finished(self, tab_id, job_id, result):
+        """Apply tuned settings to the tab's controls, which re-runs OCR with them"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        if tab is None:
+            return
+            
+        self.update_ui_from_tab()
+        if result.score <= 0:
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Warning", "Auto-tune found no text to tune on in this image")
+            return
+            
+        # The controls' handlers update the tab state and schedule one OCR run
+        tuned = result.settings
+        tab.ui.contrast_slider.setValue(int(round(tuned.contrast * 100)))
+        tab.ui.brightness_slider.setValue(int(round(tuned.brightness * 100)))
+        tab.ui.sharpness_slider.setValue(int(round(tuned.sharpness * 100)))
+        tab.ui.psm_combo.setCurrentIndex(tuned.psm)
+        tab.ui.oem_combo.setCurrentIndex(tuned.oem)
+        self.schedule_ocr(tab_id)
+        
+        summary = (f"PSM {tuned.psm}, OEM {tuned.oem}, contrast {tuned.contrast:.2f}, "
+                   f"brightness {tuned.brightness:.2f}, sharpness {tuned.sharpness:.2f}")
+        if result.cached:
+            self.statusBar().showMessage(f"Auto-tune: reused settings of a similar image ({summary})")
+        else:
+            self.statusBar().showMessage(f"Auto-tune: {summary} \u00b7 confidence {result.score:.0f}% on a sample, "
+                                         f"{result.trials} trials")
+            
+    def on_autotune_error(self, tab_id, job_id, message):
+        """Report a failed auto-tune search"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        if tab is None:
+            return
+            
+        self.statusBar().clearMessage()
+        self.update_ui_from_tab()
+        QMessageBox.critical(self, "Error", f"Auto-tune failed: {message}")
+        
+    def on_autotune_cancelled(self, tab_id, job_id):
+        """Clean up after an auto-tune search that was stopped"""
+        if self.release_ocr_job(tab_id, job_id, 'cancelled') is not None:
+            self.statusBar().clearMessage()
+            self.update_ui_from_tab()
+            
+    def release_ocr_job(self, tab_id, job_id, outcome='done'):
+        """Forget a job that has reported back and return its tab if still open
+        
+        ``outcome`` ('done', 'failed' or 'cancelled') is what the job's report
+        means for a "Process All" run that is waiting on the tab.
+        """
+        self.ocr_jobs.pop(job_id, None)
+        
+        # Ignore jobs for tabs that were closed while the job was running
+        tab = self.tabs.get(tab_id)
+        if tab is None:
             return None
             
-        # Convert to PIL image for better processing
-        pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        tab.state.jobs_in_flight.discard(job_id)
+        if tab.state.watch_job_id == job_id:
+            tab.state.watch_job_id = None
+        if tab.state.tune_job_id == job_id:
+            tab.state.tune_job_id = None
+        self.update_busy_indicator(tab)
+        
+        # A batch tab is settled once no job for it is pending; only the newest job's outcome counts
+        if tab_id in self.batch_running and not tab.state.jobs_in_flight and not tab.ui.ocr_timer.isActive():
+            self.settle_batch_tab(tab, outcome if job_id == tab.state.latest_job_id else 'cancelled')
+        return tab
+        
+    def on_ocr_finished(self, tab_id, job_id, result):
+        """Display the text produced by a finished OCR job"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        
+        # The job may have grown the preprocessing intermediates past their budget
+        self.stage_caches.trim()
+        
+        # Only the newest job for a tab may update its text
+        if tab is None or job_id != tab.state.latest_job_id:
+            return
+            
+        # Store text and layout in tab data
+        tab.state.ocr_text = result.text
+        self.set_tab_pages(tab, PageStore([result.page]) if result.page is not None else None)
+        
+        # Display text and the mode that produced it
+        tab.ui.text_edit.setText(result.text)
+        info = f"PSM {result.psm} \u00b7 confidence {result.score:.0f}%"
+        if result.cached:
+            info += " \u00b7 cached"
+        tab.ui.ocr_info_label.setText(info)
+        
+        # Expose stage timings and the cache counters on hover
+        stats = self.ocr_cache.stats()
+        tooltip = ""
+        if result.timings:
+            tooltip += "\n".join(f"{name}: {seconds * 1000:.1f} ms"
+                                 for name, seconds in result.timings.items()) + "\n"
+        tooltip += (
+            f"OCR cache: {stats['hits']} memory hits, {stats['disk_hits']} disk hits, "
+            f"{stats['misses']} misses, {stats['entries']} entries "
+            f"({stats['bytes'] / (1024 * 1024):.1f} of {stats['max_bytes'] / (1024 * 1024):.0f} MB)"
+        )
+        tab.ui.ocr_info_label.setToolTip(tooltip)
+        self.show_performance(tab, job_id)
+        
+        # Update button states if the result belongs to the visible tab
+        self.update_ui_from_tab()
         
-        # Convert to grayscale
-        gray_image = ImageOps.grayscale(pil_image)
+    def on_regions_finished(self, tab_id, job_id, results):
+        """Display the text of every region, in reading order"""
+        tab = self.release_ocr_job(tab_id, job_id)
         
-        # Increase contrast
-        contrast_image = ImageEnhance.Contrast(gray_image).enhance(2.0)
+        # Only the newest job for a tab may update its text
+        if tab is None or job_id != tab.state.latest_job_id:
+            return
+            
+        text = "\n\n".join(result.text for _, result in results)
+        tab.state.ocr_text = text
+        tab.ui.text_edit.setText(text)
+        
+        # Region layouts are moved into the whole image's coordinates and combined into one page
+        if all(result.page is not None for _, result in results):
+            width, height = tab.ui.image_label.image_size
+            page = merge_pages([offset_page(result.page, region.x, region.y, width, height)
+                                for region, result in results], width, height)
+            self.set_tab_pages(tab, PageStore([page]))
+        else:
+            self.set_tab_pages(tab, None)
+        
+        scores = [result.score for _, result in results]
+        cached = sum(1 for _, result in results if result.cached)
+        info = f"{len(results)} regions \u00b7 mean confidence {sum(scores) / max(1, len(scores)):.0f}%"
+        if cached:
+            info += f" \u00b7 {cached} cached"
+        tab.ui.ocr_info_label.setText(info)
+        tab.ui.ocr_info_label.setToolTip("\n".join(
+            f"Region {number}: PSM {result.psm}, confidence {result.score:.0f}%"
+            + (", cached" if result.cached else "")
+            for number, (_, result) in enumerate(results, 1)
+        ))
+        self.show_performance(tab, job_id)
+        
+        # Update button states if the result belongs to the visible tab
+        self.update_ui_from_tab()
         
-        # Increase sharpness
-        sharp_image = ImageEnhance.Sharpness(contrast_image).enhance(2.0)
+    def on_page_finished(self, tab_id, job_id, page_index, result):
+        """Append one page of a document to the tab's text as soon as it is recognised"""
+        tab = self.tabs.get(tab_id)
+        
+        # Only the newest job for a tab may update its text
+        if tab is None or job_id != tab.state.latest_job_id:
+            return
+            
+        # Pages arrive in order; the first one replaces the previous run's text
+        page_text = f"{page_header(page_index)}\n\n{result.text}"
+        if page_index == 0:
+            tab.state.page_scores = []
+            tab.ui.text_edit.setText(page_text)
+            self.set_tab_pages(tab, PageStore())
+        else:
+            tab.ui.text_edit.append("\n" + page_text)
+        tab.state.page_scores.append(result.score)
+        if tab.state.pages is not None and result.page is not None:
+            tab.state.pages.append(result.page)
+        tab.state.ocr_text = tab.ui.text_edit.toPlainText()
+        
+        info = f"Page {page_index + 1} of {tab.state.page_count} \u00b7 PSM {result.psm} \u00b7 confidence {result.score:.0f}%"
+        tab.ui.ocr_info_label.setText(info)
+        if tab_id in self.batch_running:
+            self.set_badge(tab, f"{page_index + 1}/{tab.state.page_count}", "Processing pages")
+        
+        # Update button states if the result belongs to the visible tab
+        self.update_ui_from_tab()
         
-        # Apply a slight blur to reduce noise
-        blurred_image = sharp_image.filter(ImageFilter.GaussianBlur(radius=0.5))
+    def set_tab_pages(self, tab, pages):
+        """Replace the layout kept for a tab's structured export, deleting the old one's temporary file"""
+        if tab.state.pages is not None and tab.state.pages is not pages:
+            tab.state.pages.close()
+        tab.state.pages = pages
         
-        return blurred_image
+    def on_document_finished(self, tab_id, job_id, page_count):
+        """Summarise a document once all of its pages are recognised"""
+        tab = self.release_ocr_job(tab_id, job_id)
         
-    def process_ocr(self, tab_data=None):
-        """Process OCR on the current image"""
-        if tab_data is None:
-            # Get current tab data
-            tab_idx = list(self.tabs.keys())[self.current_tab]
-            tab_data = self.tabs[tab_idx]
+        if tab is None or job_id != tab.state.latest_job_id:
+            return
             
-        # Ensure tab_data is a dictionary before proceeding
-        if not isinstance(tab_data, dict):
-            QMessageBox.warning(self, "Warning", "Invalid tab data")
+        scores = tab.state.page_scores
+        mean_score = sum(scores) / len(scores) if scores else 0.0
+        tab.ui.ocr_info_label.setText(f"{page_count} pages \u00b7 mean confidence {mean_score:.0f}%")
+        self.show_performance(tab, job_id)
+        
+    def on_ocr_started(self, tab_id, job_id):
+        """Show that a "Process All" tab has reached a worker"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None and tab_id in self.batch_running and job_id == tab.state.latest_job_id:
+            self.set_badge(tab, "\u25b6", "Processing")
+            
+    def on_ocr_error(self, tab_id, job_id, message):
+        """Report a failed OCR job"""
+        in_batch = tab_id in self.batch_running
+        tab = self.release_ocr_job(tab_id, job_id, 'failed')
+        
+        # Errors from superseded jobs are no longer relevant
+        if tab is None or job_id != tab.state.latest_job_id:
             return
             
-        if tab_data['cv_image'] is None:
-            QMessageBox.warning(self, "Warning", "No image loaded")
+        # A batch reports failures on the tabs' badges instead of one dialog each
+        if in_batch:
+            tab.ui.ocr_info_label.setText(f"OCR failed: {message}")
             return
             
-        try:
-            # Preprocess the image
-            preprocessed_image = self.preprocess_image(tab_data['cv_image'])
+        QMessageBox.critical(self, "Error", f"OCR processing failed: {message}")
+        
+    def on_ocr_cancelled(self, tab_id, job_id):
+        """Clean up after a job that stopped early"""
+        self.release_ocr_job(tab_id, job_id, 'cancelled')
+        
+    def on_watch_finished(self, tab_id, job_id, delta):
+        """Append the text changes of a watched frame to the tab and its log"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        
+        # Ignore frames that finished after watching stopped
+        if tab is None or tab.state.watcher is None:
+            return
             
-            # Get font type for specialized configurations
-            font_index = tab_data['font_combo'].currentIndex()
+        tab.ui.ocr_info_label.setText(
+            f"Watching \u00b7 {delta.recognised} of {delta.blocks} blocks recognised")
+        if not delta.added and not delta.removed:
+            return
             
-            # Get PSM mode from the UI
-            psm_mode = tab_data['psm_mode']
+        entry = format_delta(delta)
+        tab.ui.text_edit.append(entry)
+        tab.state.ocr_text = tab.ui.text_edit.toPlainText()
+        try:
+            tab.state.watch_log.write(entry + "\n")
+            tab.state.watch_log.flush()
+        except OSError as e:
+            self.stop_watch(tab_id)
+            QMessageBox.critical(self, "Error", f"Failed to write watch log: {str(e)}")
             
-            # Try different configurations to get the best results
-            text = ""
+        # Update button states if the result belongs to the visible tab
+        self.update_ui_from_tab()
+        
+    def on_watch_error(self, tab_id, job_id, message):
+        """Stop watching after a frame failed to be recognised"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        if tab is None or tab.state.watcher is None:
+            return
             
-            # First try with the selected PSM mode and default OEM
-            config = f'--psm {psm_mode} --oem 3'
-            text = pytesseract.image_to_string(preprocessed_image, config=config)
+        self.stop_watch(tab_id)
+        self.update_ui_from_tab()
+        QMessageBox.critical(self, "Error", f"OCR processing failed: {message}")
+        
+    def on_watch_cancelled(self, tab_id, job_id):
+        """Make sure a frame whose OCR was cancelled is looked at again"""
+        tab = self.release_ocr_job(tab_id, job_id)
+        if tab is not None and tab.state.watcher is not None:
+            tab.state.watcher.reset()
             
-            # If text is empty or very short, try with PSM mode 6 (single block of text)
-            if not text.strip() or len(text.strip()) < 5:
-                config = '--psm 6 --oem 3'
-                text = pytesseract.image_to_string(preprocessed_image, config=config)
-                
-                # If still no good results, try with PSM mode 4 (single column of text)
-                if not text.strip() or len(text.strip()) < 5:
-                    config = '--psm 4 --oem 3'
-                    text = pytesseract.image_to_string(preprocessed_image, config=config)
-                    
-                    # Last resort, try with PSM mode 3 (fully automatic page segmentation)
-                    if not text.strip() or len(text.strip()) < 5:
-                        config = '--psm 3 --oem 3'
-                        text = pytesseract.image_to_string(preprocessed_image, config=config)
+    def update_busy_indicator(self, tab):
+        """Show the busy indicator while a tab has OCR jobs in flight"""
+        tab.ui.busy_bar.setVisible(bool(tab.state.jobs_in_flight))
+        
+    def needs_ocr(self, tab):
+        """Return True if a tab has an image without text, or a document with pages still unread"""
+        if not self.image_store.has(tab.tab_id) or tab.state.watcher is not None or tab.state.jobs_in_flight:
+            return False
+        if tab.state.document_path:
+            return len(tab.state.page_scores) < tab.state.page_count
+        return not tab.state.ocr_text.strip()
+        
+    def process_all(self):
+        """OCR every tab that still needs it, the visible tab first, or cancel the run in progress"""
+        if self.batch_queue or self.batch_running:
+            self.cancel_all()
+            return
             
-            # Store text in tab data
-            tab_data['ocr_text'] = text
+        pending = [tab for tab in self.tabs.in_tab_order() if self.needs_ocr(tab)]
+        if not pending:
+            QMessageBox.information(self, "Process All", "Every tab with an image has already been processed")
+            return
             
-            # Display text
-            tab_data['text_edit'].setText(text)
+        # Queue in tab order, with the visible tab ahead of the rest
+        current = self.tabs.current()
+        for tab in pending:
+            self.batch_queue.push(tab.tab_id, VISIBLE_TAB_PRIORITY if tab is current else 0)
+            self.set_badge(tab, "\u2026", "Waiting to be processed")
+        self.batch_total = len(pending)
+        self.batch_failed = 0
+        self.batch_started = time.perf_counter()
+        
+        self.feed_batch()
+        self.update_ui_from_tab()
+        
+    def feed_batch(self):
+        """Start queued "Process All" tabs until every worker thread has one"""
+        while self.batch_queue and len(self.batch_running) < self.thread_pool.maxThreadCount():
+            tab = self.tabs.get(self.batch_queue.pop())
+            if tab is None or not self.needs_ocr(tab):
+                # Closed, or processed some other way while it waited
+                if tab is not None:
+                    self.set_badge(tab, None)
+                continue
+                
+            # Only a limited number of batch images are loaded back into memory at once
+            self.batch_running.add(tab.tab_id)
+            if self.process_ocr(tab, BATCH_PRIORITY) is None:
+                self.record_batch_outcome(tab, 'failed')
+                
+        self.update_batch_status()
+        
+    def settle_batch_tab(self, tab, outcome):
+        """Record how a "Process All" tab ended and start the next queued one"""
+        self.record_batch_outcome(tab, outcome)
+        self.feed_batch()
+        self.update_ui_from_tab()
+        
+    def record_batch_outcome(self, tab, outcome):
+        """Take a tab out of the "Process All" run and mark its badge with 'done', 'failed' or 'cancelled'"""
+        self.batch_queue.discard(tab.tab_id)
+        self.batch_running.discard(tab.tab_id)
+        if outcome == 'done':
+            self.set_badge(tab, "\u2713", "Processed")
+        elif outcome == 'failed':
+            self.batch_failed += 1
+            self.set_badge(tab, "\u2717", "OCR failed", ModernStyle.ERROR_COLOR)
+        else:
+            self.set_badge(tab, None)
             
-            # Enable save button
-            self.save_btn.setEnabled(bool(text.strip()))
+    def cancel_all(self):
+        """Stop a "Process All" run; tabs already processed keep their text"""
+        for tab_id in list(self.batch_running):
+            tab = self.tabs.get(tab_id)
+            if tab is not None:
+                self.cancel_ocr_jobs(tab)
+                self.set_badge(tab, None)
+        for tab in self.tabs:
+            if tab.tab_id in self.batch_queue:
+                self.set_badge(tab, None)
+        self.batch_queue.clear()
+        self.batch_running.clear()
+        
+        self.statusBar().showMessage("Process All cancelled", 5000)
+        self.update_ui_from_tab()
+        
+    def update_batch_status(self):
+        """Show the progress of a "Process All" run in the status bar"""
+        remaining = len(self.batch_queue) + len(self.batch_running)
+        if remaining:
+            self.statusBar().showMessage(
+                f"Processing all tabs: {self.batch_total - remaining} of {self.batch_total} done")
+        elif self.batch_total:
+            elapsed = time.perf_counter() - self.batch_started
+            message = f"Processed {self.batch_total} tabs in {elapsed:.1f} s"
+            if self.batch_failed:
+                message += f", {self.batch_failed} failed"
+            self.statusBar().showMessage(message, 10000)
+            self.batch_total = 0
             
-            # Update save all button
-            self.update_save_all_button()
+    def set_badge(self, tab, text, tooltip="", color=None):
+        """Show a short progress mark on a tab, or hide it when ``text`` is None"""
+        badge = tab.ui.badge
+        badge.setVisible(text is not None)
+        badge.setText(text or "")
+        badge.setToolTip(tooltip)
+        badge.setStyleSheet(f"color: {color or ModernStyle.PRIMARY_COLOR}; font-weight: bold; padding: 0 2px;")
+        
+    def wait_for_ocr_jobs(self):
+        """Keep the window responsive until no tab has OCR pending; the user may stop waiting"""
+        # Settings changes still in their quiet period are started now
+        for tab in self.tabs:
+            if tab.ui.ocr_timer.isActive():
+                tab.ui.ocr_timer.stop()
+                self.run_scheduled_ocr(tab.tab_id)
+                
+        # Only a tab's latest OCR or document job produces its text; auto-tune jobs and
+        # watched tabs (which are never finished) are not waited for
+        def outstanding():
+            busy = sum(1 for tab in self.tabs
+                       if tab.state.latest_job_id in tab.state.jobs_in_flight and tab.state.watcher is None)
+            return len(self.batch_queue) + busy
             
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"OCR processing failed: {str(e)}")
-            traceback.print_exc()  # Print the full traceback for debugging
+        total = outstanding()
+        if not total:
+            return
             
+        dialog = QProgressDialog("Waiting for OCR to finish...", "Save Now", 0, total, self)
+        dialog.setWindowTitle("Save All Tabs")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        dialog.setAutoReset(False)
+        
+        # Results arrive through this thread's event loop, so wait in a nested one
+        loop = QEventLoop()
+        
+        def check():
+            remaining = outstanding()
+            dialog.setValue(max(0, total - remaining))
+            if not remaining:
+                loop.quit()
+                
+        poll = QTimer()
+        poll.timeout.connect(check)
+        poll.start(50)
+        dialog.canceled.connect(loop.quit)
+        loop.exec_()
+        poll.stop()
+        dialog.close()
+        
     def save_current_text(self):
         """Save the current tab's text to a file"""
-        # Get current tab data
-        tab_idx = list(self.tabs.keys())[self.current_tab]
-        tab_data = self.tabs[tab_idx]
+        # Get the current tab
+        tab = self.tabs.current()
         
-        text = tab_data['text_edit'].toPlainText()
+        text = tab.ui.text_edit.toPlainText()
         if not text.strip():
             QMessageBox.warning(self, "Warning", "No text to save")
             return
             
         # Open file dialog
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self, 
             "Save Text", 
             f"ocr_text_{int(time.time())}.txt", 
-            "Text Files (*.txt);;CSV Files (*.csv);;All Files (*)"
+            "Text Files (*.txt);;CSV Files (*.csv);;" + STRUCTURED_FILTERS + ";;All Files (*)"
         )
         
         if file_path:
+            # Structured formats are written from the recognised layout, not the edited text
+            format_name = self.export_format(file_path, selected_filter)
+            if format_name is not None and not tab.state.pages:
+                QMessageBox.warning(self, "Warning", "No recognised layout to export; run OCR first")
+                return
+                
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
+                if format_name is not None:
+                    tab_name = self.tab_widget.tabText(self.tabs.index_of(tab))
+                    export_pages(tab.state.pages, file_path, format_name, source=tab_name)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(text)
                 QMessageBox.information(self, "Success", f"Text saved to {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
@@ -626,21 +1508,30 @@ class OCRTextExtractor(QMainWindow):
         default_filename = f"ocr_all_tabs_{timestamp}.txt"
         
         # Get save path
-        save_path, _ = QFileDialog.getSaveFileName(
+        save_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Save All Tabs",
             default_filename,
-            "Text Files (*.txt);;All Files (*)"
+            "Text Files (*.txt);;" + STRUCTURED_FILTERS + ";;All Files (*)"
         )
         
         if not save_path:
             return
             
+        # Text still being recognised would otherwise be missing from the file
+        self.wait_for_ocr_jobs()
+        
+        format_name = self.export_format(save_path, selected_filter)
+        if format_name is not None:
+            self.export_all_tabs(save_path, format_name)
+            return
+            
         try:
             with open(save_path, 'w', encoding='utf-8') as f:
-                for tab_idx, tab_data in self.tabs.items():
-                    tab_name = self.tab_widget.tabText(list(self.tabs.keys()).index(tab_idx))
-                    text = tab_data['text_edit'].toPlainText()
+                # Tabs are written in the order they are shown
+                for tab in self.tabs.in_tab_order():
+                    tab_name = self.tab_widget.tabText(self.tabs.index_of(tab))
+                    text = tab.ui.text_edit.toPlainText()
                     
                     if text.strip():
                         f.write(f"--- {tab_name} ---\n\n")
@@ -651,10 +1542,36 @@ class OCRTextExtractor(QMainWindow):
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save: {str(e)}")
+            
+    def export_format(self, path, selected_filter):
+        """Return the structured format a save dialog asked for, by extension or else by filter, or None for text"""
+        format_name = format_for_path(path)
+        if format_name is None and not os.path.splitext(path)[1]:
+            format_name = next((name for name, writer in WRITERS.items()
+                                if selected_filter.startswith(writer.label + " (")), None)
+        return format_name
+        
+    def export_all_tabs(self, save_path, format_name):
+        """Write every tab's recognised layout to one structured file, a tab's pages at a time"""
+        # Tabs are written in the order they are shown, each page named after its tab
+        tabs = [(self.tab_widget.tabText(self.tabs.index_of(tab)), tab) for tab in self.tabs.in_tab_order()
+                if tab.state.pages]
+        if not tabs:
+            QMessageBox.warning(self, "Warning", "No recognised layout to export; run OCR first")
+            return
+            
+        pages = ((page, tab_name) for tab_name, tab in tabs for page in tab.state.pages)
+        try:
+            export_pages(pages, save_path, format_name, source=os.path.basename(save_path))
+            QMessageBox.information(self, "Success", f"All tabs saved to {save_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save: {str(e)}")
                 
     def check_tesseract(self):
         """Check if Tesseract is installed and configured"""
         try:
+            import pytesseract
+            configure_tesseract()
             pytesseract.get_tesseract_version()
             return True
         except Exception:
@@ -679,6 +1596,7 @@ class OCRTextExtractor(QMainWindow):
         self.tab_widget.setTabsClosable(True)
         self.tab_widget.setMovable(True)
         self.tab_widget.setStyleSheet(ModernStyle.TAB_STYLE)
+        self.tabs = TabRegistry(self.tab_widget)
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
         self.tab_widget.currentChanged.connect(self.tab_changed)
         
@@ -699,12 +1617,39 @@ class OCRTextExtractor(QMainWindow):
         self.capture_btn.setMinimumHeight(40)
         self.capture_btn.clicked.connect(self.capture_screenshot)
         
+        self.capture_region_btn = QPushButton("Capture Region")
+        self.capture_region_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
+        self.capture_region_btn.setMinimumHeight(40)
+        self.capture_region_btn.clicked.connect(self.capture_region)
+        
+        self.watch_btn = QPushButton("Watch Region")
+        self.watch_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
+        self.watch_btn.setMinimumHeight(40)
+        self.watch_btn.setToolTip("Re-capture the last captured region every second and log how its text changes")
+        self.watch_btn.clicked.connect(self.toggle_watch)
+        self.watch_btn.setEnabled(False)
+        
         self.process_btn = QPushButton("Process OCR")
         self.process_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
         self.process_btn.setMinimumHeight(40)
         self.process_btn.clicked.connect(lambda: self.process_ocr())
         self.process_btn.setEnabled(False)
         
+        self.autotune_btn = QPushButton("Auto-tune")
+        self.autotune_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
+        self.autotune_btn.setMinimumHeight(40)
+        self.autotune_btn.setToolTip("Search for the fastest contrast, brightness, sharpness, PSM and OEM settings "
+                                     "that still read this image well, and apply them")
+        self.autotune_btn.clicked.connect(lambda: self.start_autotune())
+        self.autotune_btn.setEnabled(False)
+        
+        self.process_all_btn = QPushButton("Process All")
+        self.process_all_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
+        self.process_all_btn.setMinimumHeight(40)
+        self.process_all_btn.setToolTip("OCR every tab that has an image but no text yet, the visible tab first")
+        self.process_all_btn.clicked.connect(self.process_all)
+        self.process_all_btn.setEnabled(False)
+        
         self.save_btn = QPushButton("Save Current Text")
         self.save_btn.setStyleSheet(ModernStyle.BUTTON_STYLE)
         self.save_btn.setMinimumHeight(40)
@@ -720,7 +1665,11 @@ class OCRTextExtractor(QMainWindow):
         # Add buttons to button layout
         button_layout.addWidget(self.load_btn)
         button_layout.addWidget(self.capture_btn)
+        button_layout.addWidget(self.capture_region_btn)
+        button_layout.addWidget(self.watch_btn)
         button_layout.addWidget(self.process_btn)
+        button_layout.addWidget(self.autotune_btn)
+        button_layout.addWidget(self.process_all_btn)
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.save_all_btn)
         
@@ -733,6 +1682,12 @@ class OCRTextExtractor(QMainWindow):
         # Set main widget as central widget
         self.setCentralWidget(main_widget)
         
+        # Image memory usage against its budget
+        self.memory_label = QLabel("")
+        self.memory_label.setStyleSheet(f"color: {ModernStyle.LIGHT_TEXT_COLOR};")
+        self.statusBar().addPermanentWidget(self.memory_label)
+        self.update_memory_status()
+        
         # Add first tab
         self.add_new_tab()
         
@@ -762,8 +1717,8 @@ class OCRTextExtractor(QMainWindow):
         
     def handle_tab_click(self, index):
         """Handle clicks on tabs, specifically the plus tab"""
-        # Check if the clicked tab is the plus tab (last tab)
-        if index == self.tab_widget.count() - 1:
+        # The plus tab is the only one without a registered tab; it may have been dragged away from the end
+        if index >= 0 and self.tabs.at(index) is None:
             # Remove the plus tab
             self.tab_widget.removeTab(index)
             
@@ -783,16 +1738,9 @@ class OCRTextExtractor(QMainWindow):
         tab_layout = QVBoxLayout(tab_content)
         tab_layout.setContentsMargins(8, 8, 8, 8)
         
-        # Create tab data dictionary to store tab-specific data
-        tab_data = {
-            'cv_image': None,
-            'ocr_text': "",
-            'contrast_value': 1.0,
-            'brightness_value': 1.0,
-            'sharpness_value': 1.0,
-            'psm_mode': 3,  # Default PSM mode
-            'oem_mode': 3   # Default to auto-select best engine
-        }
+        # Tabs are identified by an ID that never changes, whatever their position
+        tab_id = self.next_tab_id
+        self.next_tab_id += 1
         
         # Create horizontal splitter
         splitter = QSplitter(Qt.Horizontal)
@@ -809,13 +1757,12 @@ class OCRTextExtractor(QMainWindow):
         image_frame.setMinimumHeight(300)
         image_layout = QVBoxLayout(image_frame)
         
-        # Image label
-        image_label = QLabel("No image loaded")
+        # Image label; drag on the image to OCR only the selected regions
+        image_label = RegionSelectLabel("No image loaded", psm_names=PSM_MODE_NAMES)
         image_label.setAlignment(Qt.AlignCenter)
         image_label.setStyleSheet("background-color: #f0f0f0;")
         image_label.setMinimumSize(400, 300)
         image_layout.addWidget(image_label)
-        tab_data['image_label'] = image_label
         
         # Add image frame to left layout
         left_layout.addWidget(image_frame, 3)
@@ -878,6 +1825,24 @@ class OCRTextExtractor(QMainWindow):
         deskew_layout.addWidget(deskew_check)
         processing_layout.addLayout(deskew_layout)
         
+        # Text size normalization checkbox
+        normalize_layout = QHBoxLayout()
+        normalize_check = QCheckBox("Normalize text size")
+        normalize_check.setChecked(True)
+        normalize_check.setStyleSheet(ModernStyle.CHECKBOX_STYLE)
+        normalize_check.setToolTip("Resize the image so letters have the height Tesseract reads best")
+        normalize_layout.addWidget(normalize_check)
+        processing_layout.addLayout(normalize_layout)
+        
+        # Tiling checkbox
+        tiling_layout = QHBoxLayout()
+        tiling_check = QCheckBox("Split tall images into parallel bands")
+        tiling_check.setChecked(True)
+        tiling_check.setStyleSheet(ModernStyle.CHECKBOX_STYLE)
+        tiling_check.setToolTip("Images taller than a few thousand pixels are OCR'd in strips on all CPU cores")
+        tiling_layout.addWidget(tiling_check)
+        processing_layout.addLayout(tiling_layout)
+        
         # Add processing group to controls layout
         controls_layout.addWidget(processing_group)
         
@@ -904,22 +1869,7 @@ class OCRTextExtractor(QMainWindow):
         psm_layout = QHBoxLayout()
         psm_label = QLabel("PSM Mode:")
         psm_combo = QComboBox()
-        psm_combo.addItems([
-            "0 - Orientation and script detection only",
-            "1 - Automatic page segmentation with OSD",
-            "2 - Automatic page segmentation, but no OSD or OCR",
-            "3 - Fully automatic page segmentation, but no OSD (Default)",
-            "4 - Assume a single column of text of variable sizes",
-            "5 - Assume a single uniform block of vertically aligned text",
-            "6 - Assume a single uniform block of text",
-            "7 - Treat the image as a single text line",
-            "8 - Treat the image as a single word",
-            "9 - Treat the image as a single word in a circle",
-            "10 - Treat the image as a single character",
-            "11 - Sparse text. Find as much text as possible in no particular order",
-            "12 - Sparse text with OSD",
-            "13 - Raw line. Treat the image as a single text line"
-        ])
+        psm_combo.addItems(PSM_MODE_NAMES)
         psm_combo.setCurrentIndex(3)  # Default to PSM mode 3
         psm_combo.setStyleSheet(ModernStyle.COMBOBOX_STYLE)
         psm_help_btn = QPushButton("?")
@@ -972,6 +1922,20 @@ class OCRTextExtractor(QMainWindow):
         text_label.setAlignment(Qt.AlignCenter)
         text_layout.addWidget(text_label)
         
+        # Busy indicator shown while OCR runs in the background
+        busy_bar = QProgressBar()
+        busy_bar.setRange(0, 0)  # Indeterminate
+        busy_bar.setTextVisible(False)
+        busy_bar.setMaximumHeight(4)
+        busy_bar.setVisible(False)
+        text_layout.addWidget(busy_bar)
+        
+        # Page segmentation mode and confidence of the last OCR result
+        ocr_info_label = QLabel("")
+        ocr_info_label.setAlignment(Qt.AlignRight)
+        ocr_info_label.setStyleSheet(f"color: {ModernStyle.LIGHT_TEXT_COLOR}; border: none;")
+        text_layout.addWidget(ocr_info_label)
+        
         text_edit = QTextEdit()
         text_edit.setStyleSheet(ModernStyle.TEXTEDIT_STYLE)
         text_edit.setReadOnly(False)  # Allow editing
@@ -981,6 +1945,10 @@ class OCRTextExtractor(QMainWindow):
         # Add text frame to right layout
         right_layout.addWidget(text_frame)
         
+        # Collapsible stage timings of the tab's OCR jobs
+        perf_panel = PerformancePanel()
+        right_layout.addWidget(perf_panel)
+        
         # Add panels to splitter
         splitter.addWidget(left_panel)
         splitter.addWidget(right_panel)
@@ -989,104 +1957,160 @@ class OCRTextExtractor(QMainWindow):
         # Add splitter to tab layout
         tab_layout.addWidget(splitter)
         
-        # Store widgets in tab data
-        tab_data['text_edit'] = text_edit
-        tab_data['contrast_slider'] = contrast_slider
-        tab_data['contrast_value_label'] = contrast_value_label
-        tab_data['brightness_slider'] = brightness_slider
-        tab_data['brightness_value_label'] = brightness_value_label
-        tab_data['sharpness_slider'] = sharpness_slider
-        tab_data['sharpness_value_label'] = sharpness_value_label
-        tab_data['deskew_check'] = deskew_check
-        tab_data['font_combo'] = font_combo
-        tab_data['psm_combo'] = psm_combo
-        tab_data['oem_combo'] = oem_combo
+        # Single-shot timer that coalesces rapid settings changes into one OCR run
+        ocr_timer = QTimer(tab_content)
+        ocr_timer.setSingleShot(True)
+        ocr_timer.timeout.connect(lambda: self.run_scheduled_ocr(tab_id))
+        
+        # Repeating timer that re-captures the region while watch mode is on
+        watch_timer = QTimer(tab_content)
+        watch_timer.timeout.connect(lambda: self.watch_tick(tab_id))
         
         # Connect signals
-        contrast_slider.valueChanged.connect(lambda value, tab_idx=self.next_tab_id: self.update_contrast(value, tab_idx))
-        brightness_slider.valueChanged.connect(lambda value, tab_idx=self.next_tab_id: self.update_brightness(value, tab_idx))
-        sharpness_slider.valueChanged.connect(lambda value, tab_idx=self.next_tab_id: self.update_sharpness(value, tab_idx))
-        psm_combo.currentIndexChanged.connect(lambda index, tab_idx=self.next_tab_id: self.update_psm(index, tab_idx))
-        oem_combo.currentIndexChanged.connect(lambda index, tab_idx=self.next_tab_id: self.update_oem(index, tab_idx))
+        contrast_slider.valueChanged.connect(lambda value: self.update_contrast(value, tab_id))
+        brightness_slider.valueChanged.connect(lambda value: self.update_brightness(value, tab_id))
+        sharpness_slider.valueChanged.connect(lambda value: self.update_sharpness(value, tab_id))
+        image_label.resized.connect(lambda: self.redraw_preview(tab_id))
+        image_label.regions_changed.connect(lambda regions: self.update_regions(regions, tab_id))
+        deskew_check.stateChanged.connect(lambda state: self.update_deskew(state, tab_id))
+        normalize_check.stateChanged.connect(lambda state: self.update_normalize(state, tab_id))
+        tiling_check.stateChanged.connect(lambda state: self.update_tiling(state, tab_id))
+        psm_combo.currentIndexChanged.connect(lambda index: self.update_psm(index, tab_id))
+        font_combo.currentIndexChanged.connect(lambda index: self.update_font(index, tab_id))
+        oem_combo.currentIndexChanged.connect(lambda index: self.update_oem(index, tab_id))
         font_help_btn.clicked.connect(self.show_font_help)
         psm_help_btn.clicked.connect(self.show_psm_help)
         oem_help_btn.clicked.connect(self.show_oem_help)
         
-        # Add the tab data to the tabs dictionary
-        self.tabs[self.next_tab_id] = tab_data
-        self.next_tab_id += 1
+        # Register the tab's state and widgets
+        # "Process All" progress mark, shown on the tab itself
+        badge = QLabel()
+        
+        widgets = TabWidgets(
+            page=tab_content,
+            badge=badge,
+            image_label=image_label,
+            text_edit=text_edit,
+            busy_bar=busy_bar,
+            ocr_info_label=ocr_info_label,
+            contrast_slider=contrast_slider,
+            contrast_value_label=contrast_value_label,
+            brightness_slider=brightness_slider,
+            brightness_value_label=brightness_value_label,
+            sharpness_slider=sharpness_slider,
+            sharpness_value_label=sharpness_value_label,
+            deskew_check=deskew_check,
+            normalize_check=normalize_check,
+            tiling_check=tiling_check,
+            font_combo=font_combo,
+            psm_combo=psm_combo,
+            oem_combo=oem_combo,
+            perf_panel=perf_panel,
+            ocr_timer=ocr_timer,
+            watch_timer=watch_timer
+        )
+        self.tabs.add(Tab(TabState(tab_id, profile=Profile()), widgets))
         
         # Add the tab to the tab widget
-        tab_index = self.tab_widget.addTab(tab_content, f"Scan {self.next_tab_id - 1}")
+        tab_index = self.tab_widget.addTab(tab_content, f"Scan {tab_id}")
+        self.tab_widget.tabBar().setTabButton(tab_index, QTabBar.LeftSide, badge)
+        badge.hide()  # setTabButton shows it
         
         # Set the current tab to the new tab
         self.tab_widget.setCurrentIndex(tab_index)
         
-    def update_contrast(self, value, tab_idx=None):
+    def update_contrast(self, value, tab_id):
         """Update contrast value for a tab"""
-        if tab_idx is None:
-            tab_idx = self.current_tab
-            
-        if tab_idx in self.tabs:
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
             contrast_value = value / 100.0
-            self.tabs[tab_idx]['contrast_value'] = contrast_value
-            self.tabs[tab_idx]['contrast_value_label'].setText(f"{contrast_value:.1f}")
+            tab.state.contrast_value = contrast_value
+            tab.ui.contrast_value_label.setText(f"{contrast_value:.1f}")
             
-            # Process OCR if image is loaded
-            if self.tabs[tab_idx]['cv_image'] is not None:
-                self.process_ocr(self.tabs[tab_idx])
+            # Re-run OCR once the value stops changing
+            self.schedule_ocr(tab_id)
                 
-    def update_brightness(self, value, tab_idx=None):
+    def update_brightness(self, value, tab_id):
         """Update brightness value for a tab"""
-        if tab_idx is None:
-            tab_idx = self.current_tab
-            
-        if tab_idx in self.tabs:
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
             brightness_value = value / 100.0
-            self.tabs[tab_idx]['brightness_value'] = brightness_value
-            self.tabs[tab_idx]['brightness_value_label'].setText(f"{brightness_value:.1f}")
+            tab.state.brightness_value = brightness_value
+            tab.ui.brightness_value_label.setText(f"{brightness_value:.1f}")
             
-            # Process OCR if image is loaded
-            if self.tabs[tab_idx]['cv_image'] is not None:
-                self.process_ocr(self.tabs[tab_idx])
+            # Re-run OCR once the value stops changing
+            self.schedule_ocr(tab_id)
                 
-    def update_sharpness(self, value, tab_idx=None):
+    def update_sharpness(self, value, tab_id):
         """Update sharpness value for a tab"""
-        if tab_idx is None:
-            tab_idx = self.current_tab
-            
-        if tab_idx in self.tabs:
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
             sharpness_value = value / 100.0
-            self.tabs[tab_idx]['sharpness_value'] = sharpness_value
-            self.tabs[tab_idx]['sharpness_value_label'].setText(f"{sharpness_value:.1f}")
+            tab.state.sharpness_value = sharpness_value
+            tab.ui.sharpness_value_label.setText(f"{sharpness_value:.1f}")
             
-            # Process OCR if image is loaded
-            if self.tabs[tab_idx]['cv_image'] is not None:
-                self.process_ocr(self.tabs[tab_idx])
+            # Re-run OCR once the value stops changing
+            self.schedule_ocr(tab_id)
                 
-    def update_psm(self, index, tab_idx=None):
-        """Update PSM mode for a tab"""
-        if tab_idx is None:
-            tab_idx = self.current_tab
+    def update_regions(self, regions, tab_id):
+        """Update the regions of interest for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.regions = regions
             
-        if tab_idx in self.tabs:
-            self.tabs[tab_idx]['psm_mode'] = index
+            # Re-run OCR; unchanged regions are answered from the cache
+            self.schedule_ocr(tab_id)
+                
+    def update_deskew(self, state, tab_id):
+        """Enable or disable automatic deskewing for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.deskew_enabled = state == Qt.Checked
             
-            # Process OCR if image is loaded
-            if self.tabs[tab_idx]['cv_image'] is not None:
-                self.process_ocr(self.tabs[tab_idx])
+            # Re-run OCR with the new setting
+            self.schedule_ocr(tab_id)
                 
-    def update_oem(self, index, tab_idx=None):
-        """Update OEM mode for a tab"""
-        if tab_idx is None:
-            tab_idx = self.current_tab
+    def update_normalize(self, state, tab_id):
+        """Enable or disable text size normalization for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.normalize_enabled = state == Qt.Checked
+            
+            # Re-run OCR with the new setting
+            self.schedule_ocr(tab_id)
+                
+    def update_tiling(self, state, tab_id):
+        """Enable or disable banded OCR of tall images for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.tiling_enabled = state == Qt.Checked
+            
+            # Re-run OCR with the new setting
+            self.schedule_ocr(tab_id)
+                
+    def update_font(self, index, tab_id):
+        """Update the font type for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.font_index = index
             
-        if tab_idx in self.tabs:
-            self.tabs[tab_idx]['oem_mode'] = index
+    def update_psm(self, index, tab_id):
+        """Update PSM mode for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.psm_mode = index
+            
+            # Re-run OCR once the value stops changing
+            self.schedule_ocr(tab_id)
+                
+    def update_oem(self, index, tab_id):
+        """Update OEM mode for a tab"""
+        tab = self.tabs.get(tab_id)
+        if tab is not None:
+            tab.state.oem_mode = index
             
-            # Process OCR if image is loaded
-            if self.tabs[tab_idx]['cv_image'] is not None:
-                self.process_ocr(self.tabs[tab_idx])
+            # Re-run OCR once the value stops changing
+            self.schedule_ocr(tab_id)
                 
     def show_psm_help(self):
         """Show help for Page Segmentation Modes"""
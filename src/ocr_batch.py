@@ -0,0 +1,361 @@
+"""Headless batch OCR for files, globs and directories
+
+Usage:
+    python run_batch.py scans/ "photos/**/*.png" page.tif -o out/ --jobs 4
+    python -m ocr_batch scans/ --format jsonl -o results.jsonl   (from src/)
+
+Images are OCR'd on a process pool with the same preprocessing and PSM
+selection as the desktop application. Multi-page TIFFs and PDFs are decoded
+one page at a time inside their worker, which writes each page to the
+output file as soon as it is recognised. Outputs that are newer than their
+source image are skipped unless --force is given.
+
+Besides plain text, --format hocr, tsv or alto writes each file's words
+with their boxes and confidences.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.pdf')
+
+# Per-file output formats and their extensions; jsonl instead appends one record per file to a single file
+FILE_FORMATS = {'txt': '.txt', 'hocr': '.hocr', 'tsv': '.tsv', 'alto': '.xml'}
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def input_root(pattern):
+    """Return the directory a pattern's images are found under
+    
+    That is the directory itself, a glob's leading directories without
+    wildcards, or a file's directory.
+    """
+    if os.path.isdir(pattern):
+        return os.path.abspath(pattern)
+    if glob.has_magic(pattern):
+        parts = []
+        for part in os.path.normpath(pattern).split(os.sep):
+            if glob.has_magic(part):
+                break
+            parts.append(part)
+        return os.path.abspath(os.sep.join(parts) or os.curdir)
+    return os.path.dirname(os.path.abspath(pattern))
+
+
+def collect_inputs(patterns, recursive=False):
+    """Expand files, glob patterns and directories into {image path: input root}, sorted by path
+    
+    The root is the directory an image was found under (see input_root);
+    outputs written to another directory mirror the image's path below it.
+    An image matched by several patterns keeps the first one's root.
+    """
+    images = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                paths = [os.path.join(root, name) for root, _, files in os.walk(pattern) for name in files]
+            else:
+                paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        elif glob.has_magic(pattern):
+            paths = glob.glob(pattern, recursive=True)
+        else:
+            paths = [pattern]
+        
+        root = input_root(pattern)
+        for path in paths:
+            if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                images.setdefault(os.path.abspath(path), root)
+    return dict(sorted(images.items()))
+
+
+def text_output_path(image_path, output_dir=None, extension='.txt', root=None):
+    """Return where the output file for an image is written
+    
+    Outputs go next to the image, or under ``output_dir`` at the image's
+    path relative to ``root``, so images with the same name in different
+    folders do not share an output.
+    """
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    directory = os.path.dirname(image_path)
+    if output_dir:
+        directory = os.path.join(output_dir, os.path.relpath(directory, root)) if root else output_dir
+    return os.path.normpath(os.path.join(directory, stem + extension))
+
+
+def duplicate_outputs(outputs):
+    """Return {output path: [image paths]} for outputs that more than one image would write"""
+    writers = {}
+    for image_path, output_path in outputs.items():
+        writers.setdefault(os.path.normcase(os.path.abspath(output_path)), []).append(image_path)
+    return {output_path: images for output_path, images in writers.items() if len(images) > 1}
+
+
+def is_up_to_date(image_path, output_path):
+    """Return True if ``output_path`` exists and is newer than ``image_path``"""
+    try:
+        return os.path.getmtime(output_path) >= os.path.getmtime(image_path)
+    except OSError:
+        return False
+
+
+def load_jsonl_index(jsonl_path):
+    """Map image path to the source mtime recorded in an existing JSONL output"""
+    index = {}
+    if not os.path.exists(jsonl_path):
+        return index
+    
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                index[record['path']] = record['mtime']
+            except (ValueError, KeyError):
+                continue
+    return index
+
+
+def _init_worker(tesseract_cmd, engine_name, candidate_threads):
+    """Configure Tesseract and the engine once per worker process"""
+    from ocr_core.engines import get_engine
+    from ocr_core.tesseract import configure_tesseract
+    
+    configure_tesseract(tesseract_cmd)
+    _worker['engine'] = get_engine(engine_name)
+    _worker['executor'] = ThreadPoolExecutor(max_workers=candidate_threads)
+
+
+class _TextOutput:
+    """Writes page texts the way the desktop application joins them, one page at a time
+    
+    A single page is written as is; pages of a longer document each get a
+    header, so the first page is held back until the second one arrives.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.first = None
+        
+    def write_page(self, text):
+        from ocr_core.documents import page_header
+        
+        self.count += 1
+        if self.count == 1:
+            self.first = text
+            return
+        if self.count == 2:
+            self.stream.write(f"{page_header(0)}\n\n{self.first}")
+            self.first = None
+        self.stream.write(f"\n\n{page_header(self.count - 1)}\n\n{text}")
+        
+    def end(self):
+        if self.first is not None:
+            self.stream.write(self.first)
+            
+    @property
+    def text(self):
+        return self.stream.getvalue()
+
+
+def ocr_file(image_path, psm_mode, oem_mode, deskew=True, normalize=True, tiling=True,
+             output_path=None, output_format='txt'):
+    """OCR one image or multi-page document in a worker process and return a result record
+    
+    With ``output_path`` each page goes to that file in ``output_format``
+    ('txt', 'hocr', 'tsv' or 'alto') as soon as it is recognised, and the
+    record has no text; otherwise the record carries the whole plain text.
+    """
+    import io
+    from ocr_core.documents import iter_pages
+    from ocr_core.export import WRITERS
+    from ocr_core.pipeline import ocr_image
+    
+    start = time.perf_counter()
+    results = []
+    
+    # A partial file is only moved into place once the whole document is written
+    partial_path = output_path + '.part' if output_path else None
+    stream = open(partial_path, 'w', encoding='utf-8', newline='\n') if partial_path else io.StringIO()
+    if output_format == 'txt':
+        writer = _TextOutput(stream)
+    else:
+        writer = WRITERS[output_format](stream, os.path.basename(image_path))
+        writer.begin()
+    try:
+        # Pages are decoded one at a time and written once recognised, so long documents do not pile up in memory
+        for page in iter_pages(image_path):
+            result = ocr_image(page, psm_mode, oem_mode, deskew=deskew, normalize=normalize,
+                               tiling=tiling, engine=_worker['engine'],
+                               executor=_worker['executor'])
+            del page
+            if output_format == 'txt':
+                writer.write_page(result.text)
+            else:
+                writer.write_page(result.page)
+            
+            # Only the summary is kept; the word data and layout are already written
+            results.append(result._replace(text=None, data=None, page=None))
+        writer.end()
+    except Exception as e:
+        stream.close()
+        if partial_path:
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+        # Some engine exceptions cannot be pickled back to the parent process
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    
+    if partial_path:
+        text = None
+        stream.close()
+        os.replace(partial_path, output_path)
+    else:
+        text = writer.text
+    
+    timings = Counter()
+    for result in results:
+        timings.update(result.timings or {})
+        
+    return {
+        'path': image_path,
+        'mtime': os.path.getmtime(image_path),
+        'pages': len(results),
+        'psm': Counter(result.psm for result in results).most_common(1)[0][0] if results else None,
+        'confidence': round(sum(result.score for result in results) / len(results), 2) if results else 0.0,
+        'seconds': round(time.perf_counter() - start, 3),
+        'timings': {name: round(seconds, 4) for name, seconds in timings.items()},
+        'text': text,
+    }
+
+
+def print_progress(done, total, pages, elapsed, width=30, stream=sys.stderr):
+    """Draw a single-line progress bar"""
+    filled = int(width * done / total) if total else width
+    rate = pages / elapsed if elapsed > 0 else 0.0
+    stream.write(f"\r[{'#' * filled}{'.' * (width - filled)}] {done}/{total} files  {rate:.2f} pages/s")
+    stream.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='ocr_batch',
+        description="OCR images in bulk without starting the desktop application."
+    )
+    parser.add_argument('inputs', nargs='+', help="image/PDF files, glob patterns or directories")
+    parser.add_argument('-o', '--output', default=None,
+                        help="output directory for per-image files, mirroring the folders below each input "
+                             "(default: next to each image), or the .jsonl file to write with --format jsonl")
+    parser.add_argument('--format', choices=(*FILE_FORMATS, 'jsonl'), default='txt',
+                        help="output format: plain text, hOCR, Tesseract TSV or ALTO XML per image, "
+                             "or one JSON Lines file of text records (default: txt)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--candidate-threads', type=int, default=1,
+                        help="PSM candidates recognised at once inside each worker (default: 1)")
+    parser.add_argument('--psm', type=int, default=3, help="preferred page segmentation mode (default: 3)")
+    parser.add_argument('--oem', type=int, default=3, help="OCR engine mode (default: 3)")
+    parser.add_argument('--no-deskew', dest='deskew', action='store_false',
+                        help="do not straighten tilted pages before OCR")
+    parser.add_argument('--no-normalize', dest='normalize', action='store_false',
+                        help="OCR images at their original size instead of a normalized text height")
+    parser.add_argument('--no-tiling', dest='tiling', action='store_false',
+                        help="recognise tall images in one piece instead of parallel bands")
+    parser.add_argument('--engine', default=None, help="OCR backend: auto, pytesseract, tesserocr or capi")
+    parser.add_argument('--tesseract-cmd', default=None, help="path to the tesseract executable")
+    parser.add_argument('-r', '--recursive', action='store_true', help="descend into subdirectories")
+    parser.add_argument('-f', '--force', action='store_true', help="re-OCR images whose output is up to date")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    images = collect_inputs(args.inputs, recursive=args.recursive)
+    if not images:
+        print("No images found.", file=sys.stderr)
+        return 1
+    
+    if args.format == 'jsonl':
+        jsonl_path = args.output or 'ocr_results.jsonl'
+        index = {} if args.force else load_jsonl_index(jsonl_path)
+        todo = [path for path in images if index.get(path) != os.path.getmtime(path)]
+        outputs = {}
+        jsonl_file = open(jsonl_path, 'a', encoding='utf-8')
+    else:
+        extension = FILE_FORMATS[args.format]
+        outputs = {path: text_output_path(path, args.output, extension, root) for path, root in images.items()}
+        
+        # Two images writing one file would overwrite each other's text
+        duplicates = duplicate_outputs(outputs)
+        if duplicates:
+            print("These images would write the same output file:", file=sys.stderr)
+            for output_path, sources in sorted(duplicates.items()):
+                print(f"  {output_path}: {', '.join(sources)}", file=sys.stderr)
+            print("Rename them or OCR them into separate output directories.", file=sys.stderr)
+            return 1
+        
+        todo = [path for path in images if args.force or not is_up_to_date(path, outputs[path])]
+        for path in todo:
+            os.makedirs(os.path.dirname(outputs[path]), exist_ok=True)
+        jsonl_file = None
+    
+    skipped = len(images) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} up-to-date image(s).", file=sys.stderr)
+    if not todo:
+        if jsonl_file is not None:
+            jsonl_file.close()
+        return 0
+    
+    pages = 0
+    failures = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs), initializer=_init_worker,
+                                 initargs=(args.tesseract_cmd, args.engine, max(1, args.candidate_threads))) as pool:
+            futures = {}
+            for path in todo:
+                # Per-image files are written by the workers themselves, page by page
+                if jsonl_file is not None:
+                    output_path, output_format = None, 'txt'
+                else:
+                    output_path, output_format = outputs[path], args.format
+                futures[pool.submit(ocr_file, path, args.psm, args.oem, args.deskew, args.normalize, args.tiling,
+                                    output_path, output_format)] = path
+            print_progress(0, len(todo), 0, 0)
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    failures += 1
+                    sys.stderr.write(f"\nFailed: {path}: {e}\n")
+                else:
+                    pages += record['pages']
+                    if jsonl_file is not None:
+                        jsonl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        jsonl_file.flush()
+                
+                print_progress(done, len(todo), pages, time.perf_counter() - start)
+    finally:
+        if jsonl_file is not None:
+            jsonl_file.close()
+    
+    elapsed = time.perf_counter() - start
+    rate = pages / elapsed if elapsed > 0 else 0.0
+    print(f"\nProcessed {pages} page(s) in {elapsed:.1f}s ({rate:.2f} pages/s), "
+          f"{skipped} skipped, {failures} failed.", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Qt-free OCR building blocks shared by the GUI, background workers and the batch CLI
+
+Public names are resolved lazily so ``import ocr_core`` does not pull in
+numpy, OpenCV, Pillow or pytesseract until they are actually used.
+"""
+import importlib
+
+_EXPORTS = {
+    'OCREngine': 'engines',
+    'create_engine': 'engines',
+    'get_engine': 'engines',
+    'OCRCache': 'cache',
+    'image_fingerprint': 'cache',
+    'PSMResult': 'strategy',
+    'select_best_psm': 'strategy',
+    'ocr_image': 'pipeline',
+    'preprocess_image': 'pipeline',
+    'TuneCache': 'autotune',
+    'Page': 'layout',
+    'page_from_data': 'layout',
+    'PageStore': 'export',
+    'export_pages': 'export',
+    'levenshtein': 'metrics',
+    'error_counts': 'metrics',
+    'error_rates': 'metrics',
+    'configure_tesseract': 'tesseract',
+    'find_tesseract_cmd': 'tesseract',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'ocr_core' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,318 @@
+"""Search for the fastest settings that still read an image well
+
+Instead of re-running the whole image for every nudge of a slider, the
+search works on a sample: the image is scaled down to the target text
+x-height (never up) and the window of it holding the most ink is cropped
+out, so each trial is a fraction of a full run.
+
+Trials are scored by the confidence of Tesseract's words (``score_data``).
+The search is budgeted and runs in three steps: every candidate PSM/OEM
+pair at the current slider values, a coarse grid of contrast and sharpness
+with the best pair, then a refinement that nudges each slider by a
+halving step around the most accurate point. Of all trials scoring within
+SCORE_TOLERANCE of the best, the one whose recognition was fastest wins.
+
+Tuned settings are kept in a TuneCache under an appearance fingerprint of
+the image (where the text is, its size, tone and contrast), so a similar
+image gets them back without searching.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from .preprocess import StageCache, default_pipeline, effective_settings
+from .profiling import span
+from .strategy import NON_TEXT_PSM_MODES, recognize_candidate
+
+# Size of the sample window, in pixels after scaling to the target x-height
+SAMPLE_WIDTH = 1000
+SAMPLE_HEIGHT = 700
+
+# PSM and OEM modes tried in the first step, besides the tab's own
+PSM_CANDIDATES = (3, 4, 6, 11)
+OEM_CANDIDATES = (1, 3)
+
+# Slider values of the coarse grid (brightness stays at the tab's value until refinement)
+COARSE_CONTRAST = (0.75, 1.0, 1.25)
+COARSE_SHARPNESS = (0.75, 1.0, 1.25)
+
+# First refinement step; it halves until it is smaller than the last
+REFINE_STEP = 0.2
+MIN_REFINE_STEP = 0.05
+
+# Slider range of the GUI
+MIN_SLIDER = 0.5
+MAX_SLIDER = 1.5
+
+# Trials and seconds one search may use
+MAX_TRIALS = 40
+TIME_BUDGET = 30.0
+
+# Trials scoring this close to the best are acceptable; the fastest of them wins
+SCORE_TOLERANCE = 2.0
+
+# Layout of a fingerprint: a grid of cells, each marked if more than LAYOUT_INK of it is ink
+LAYOUT_GRID = 4
+LAYOUT_INK = 0.02
+
+# Fingerprints whose layouts differ in at most this many cells count as similar
+SIMILAR_LAYOUT_CELLS = 2
+
+# Tuned images remembered by a TuneCache
+TUNE_CACHE_SIZE = 256
+
+# psm/oem: Tesseract modes; contrast/brightness/sharpness: slider values
+TuneSettings = namedtuple('TuneSettings', ['psm', 'oem', 'contrast', 'brightness', 'sharpness'])
+
+# score: confidence on the sample; seconds: recognition time of the winning trial;
+# trials: trials run (0 when the settings came from the cache)
+TuneResult = namedtuple('TuneResult', ['settings', 'score', 'seconds', 'trials', 'cached'])
+
+# layout: bit mask of the grid cells holding text; the rest are coarse buckets of text size, tone and contrast
+Fingerprint = namedtuple('Fingerprint', ['layout', 'x_height', 'tone', 'contrast'])
+
+
+def _gray(image):
+    """Return a grayscale version of a BGR, BGRA or grayscale image"""
+    import cv2
+    
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def _ink(gray):
+    """Return a 0/1 mask of the ink, whether the text is dark on light or light on dark"""
+    import cv2
+    
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size / 2:
+        binary = 1 - binary
+    return binary
+
+
+def appearance_fingerprint(image):
+    """Return a Fingerprint of what matters to the settings: layout, text size, tone and contrast"""
+    import math
+    
+    import cv2
+    
+    from .resolution import estimate_x_height
+    
+    gray = _gray(image)
+    
+    # Which cells of a LAYOUT_GRID x LAYOUT_GRID grid hold text
+    density = cv2.resize(_ink(gray).astype('float32'), (LAYOUT_GRID, LAYOUT_GRID), interpolation=cv2.INTER_AREA)
+    layout = sum(1 << i for i, value in enumerate(density.ravel()) if value > LAYOUT_INK)
+    
+    x_height = estimate_x_height(gray)
+    mean, std = cv2.meanStdDev(gray)
+    return Fingerprint(
+        layout=layout,
+        x_height=None if not x_height else round(math.log2(x_height) * 2),
+        tone=int(mean[0][0] // 32),
+        contrast=int(std[0][0] // 16),
+    )
+
+
+def is_similar(a, b):
+    """Return True if two Fingerprints describe images that should share settings"""
+    return (a.x_height == b.x_height and a.tone == b.tone and a.contrast == b.contrast
+            and bin(a.layout ^ b.layout).count('1') <= SIMILAR_LAYOUT_CELLS)
+
+
+def tuning_sample(image, normalize=True):
+    """Return the part of ``image`` trials are run on
+    
+    With ``normalize`` the image is first scaled down to the target text
+    x-height, as the pipeline would; without it pixel sizes are kept. The
+    SAMPLE_WIDTH x SAMPLE_HEIGHT window with the most ink is then cropped.
+    """
+    import cv2
+    import numpy as np
+    
+    from .resolution import estimate_x_height, normalization_scale, resize_image
+    
+    gray = _gray(image)
+    scale = min(1.0, normalization_scale(estimate_x_height(gray))) if normalize else 1.0
+    
+    # Window size in the image's own pixels
+    height, width = gray.shape[:2]
+    window_height = min(height, int(SAMPLE_HEIGHT / scale))
+    window_width = min(width, int(SAMPLE_WIDTH / scale))
+    
+    binary = _ink(gray)
+    
+    def densest(counts, size):
+        """Start of the ``size``-long run of ``counts`` with the largest sum"""
+        if size >= len(counts):
+            return 0
+        sums = np.convolve(counts, np.ones(size, dtype=np.int64), mode='valid')
+        return int(np.argmax(sums))
+    
+    # Rows with the most ink first, then the columns with the most ink within them
+    top = densest(cv2.reduce(binary, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel(), window_height)
+    rows = binary[top:top + window_height]
+    left = densest(cv2.reduce(rows, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel(), window_width)
+    
+    sample = image[top:top + window_height, left:left + window_width]
+    return resize_image(sample, scale) if scale != 1.0 else np.ascontiguousarray(sample)
+
+
+def clamp_slider(value):
+    """Round a slider value to the GUI's resolution and keep it in range"""
+    return round(min(MAX_SLIDER, max(MIN_SLIDER, value)), 2)
+
+
+def autotune(image, engine, start, deskew=True, normalize=True, max_trials=MAX_TRIALS,
+             time_budget=TIME_BUDGET, is_cancelled=lambda: False):
+    """Search for the fastest acceptable TuneSettings for ``image``, starting from ``start``
+    
+    ``start`` is a TuneSettings with the tab's current values; deskew and
+    normalization are kept as given. Returns a TuneResult, or None if
+    ``is_cancelled()`` became true first.
+    """
+    with span('tune sample'):
+        sample = tuning_sample(image, normalize)
+    stage_cache = StageCache()
+    trials = {}  # TuneSettings -> (score, seconds)
+    deadline = time.perf_counter() + time_budget
+    
+    def trial(settings):
+        """Score one setting, once; returns False when the budget is spent"""
+        if settings in trials:
+            return True
+        if is_cancelled() or len(trials) >= max_trials or time.perf_counter() > deadline:
+            return False
+        
+        # Only the stages after a changed slider are recomputed
+        preprocess_settings = effective_settings(settings.contrast, settings.brightness, settings.sharpness,
+                                                 deskew, normalize)
+        preprocessed, _ = default_pipeline.run_memoized(sample, preprocess_settings, stage_cache, 'sample')
+        
+        # Only recognition is timed; preprocessing the sample costs about the same for every setting
+        start_time = time.perf_counter()
+        result = recognize_candidate(engine, preprocessed, settings.psm, settings.oem)
+        trials[settings] = (result.score, time.perf_counter() - start_time)
+        return True
+        
+    def best():
+        """The fastest acceptable setting tried so far"""
+        top = max(score for score, _ in trials.values())
+        acceptable = [settings for settings, (score, _) in trials.items() if score >= top - SCORE_TOLERANCE]
+        return min(acceptable, key=lambda settings: trials[settings][1])
+        
+    def most_accurate():
+        """The highest-scoring setting tried so far"""
+        return max(trials, key=lambda settings: trials[settings][0])
+    
+    with span('tune search'):
+        # Step 1: page segmentation and engine modes at the current slider values
+        psm_modes = list(dict.fromkeys([start.psm] + list(PSM_CANDIDATES)))
+        psm_modes = [psm for psm in psm_modes if psm not in NON_TEXT_PSM_MODES]
+        oem_modes = list(dict.fromkeys([start.oem] + list(OEM_CANDIDATES)))
+        for psm in psm_modes:
+            for oem in oem_modes:
+                trial(start._replace(psm=psm, oem=oem))
+        
+        # Step 2: coarse grid of the enhancement sliders with the chosen modes
+        if trials:
+            modes = best()
+            for contrast in COARSE_CONTRAST:
+                for sharpness in COARSE_SHARPNESS:
+                    trial(modes._replace(contrast=contrast, sharpness=sharpness))
+        
+        # Step 3: nudge each slider around the most accurate point with a halving step
+        step = REFINE_STEP
+        while trials and step >= MIN_REFINE_STEP:
+            center = most_accurate()
+            for field in ('contrast', 'brightness', 'sharpness'):
+                for direction in (-1, 1):
+                    value = clamp_slider(getattr(center, field) + direction * step)
+                    trial(center._replace(**{field: value}))
+            if center == most_accurate():
+                step /= 2
+            if is_cancelled() or len(trials) >= max_trials or time.perf_counter() > deadline:
+                break
+    
+    if is_cancelled():
+        return None
+    if not trials:
+        return TuneResult(start, 0.0, 0.0, 0, False)
+    winner = best()
+    score, seconds = trials[winner]
+    return TuneResult(winner, score, seconds, len(trials), False)
+
+
+class TuneCache:
+    """Tuned settings of recent images, found again for images that look alike
+    
+    Entries are matched by Fingerprint (see is_similar) and by the context
+    they were tuned in (engine, deskew, normalization). With ``path`` they
+    are kept in a JSON file across restarts.
+    """
+    
+    def __init__(self, path=None, max_entries=TUNE_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (context, fingerprint) -> TuneResult
+        self._lock = threading.Lock()
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for entry in json.load(f):
+                        result = TuneResult(TuneSettings(**entry['settings']), entry['score'], entry['seconds'],
+                                            entry['trials'], False)
+                        self._entries[(entry['context'], Fingerprint(*entry['fingerprint']))] = result
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Warning: ignoring auto-tune cache {path}: {e}")
+                self._entries.clear()
+        
+    @staticmethod
+    def context_key(engine, deskew, normalize):
+        """Return the part of a key that must match exactly"""
+        return json.dumps({'engine': engine.name, 'deskew': bool(deskew), 'normalize': bool(normalize)},
+                          sort_keys=True, separators=(',', ':'))
+        
+    def lookup(self, fingerprint, context):
+        """Return the TuneResult of the most similar tuned image, or None"""
+        with self._lock:
+            matches = [(bin(fingerprint.layout ^ key[1].layout).count('1'), key)
+                       for key in self._entries if key[0] == context and is_similar(fingerprint, key[1])]
+            if not matches:
+                return None
+            key = min(matches)[1]
+            self._entries.move_to_end(key)
+            return self._entries[key]._replace(cached=True)
+        
+    def store(self, fingerprint, context, result):
+        """Remember the settings tuned for an image"""
+        with self._lock:
+            self._entries[(context, fingerprint)] = result._replace(cached=False)
+            self._entries.move_to_end((context, fingerprint))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            entries = [{'context': context, 'fingerprint': list(fingerprint), 'settings': result.settings._asdict(),
+                        'score': result.score, 'seconds': result.seconds, 'trials': result.trials}
+                       for (context, fingerprint), result in self._entries.items()]
+        
+        if self.path:
+            self._save(entries)
+        
+    def _save(self, entries):
+        """Write the entries to the JSON file, replacing it atomically"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Warning: failed to save auto-tune cache {self.path}: {e}")
+        
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,184 @@
+"""Content-addressed cache of OCR results
+
+Results are keyed by a fast hash of the image buffer plus the effective
+preprocessing and Tesseract settings, so switching a combo back and forth
+or reloading the same file does not repeat the OCR. The in-memory tier is
+an LRU bounded by the serialized size of its entries; an optional SQLite
+tier keeps results across restarts.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Default size of the in-memory tier
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Default number of rows kept in the on-disk tier
+DEFAULT_MAX_DISK_ENTRIES = 5000
+
+# Recent fingerprints by image object id, so an unchanged buffer is hashed only once
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def hash_bytes(*chunks):
+    """Return a hex digest of the given buffers using the fastest available hash"""
+    hasher = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def image_fingerprint(image):
+    """Return a content hash of a numpy image, memoized per array object
+    
+    The memo assumes images are replaced rather than modified in place,
+    which is how the application treats ``cv_image``.
+    """
+    import numpy as np
+    
+    key = id(image)
+    with _fingerprints_lock:
+        entry = _fingerprints.get(key)
+        if entry is not None and entry[0]() is image:
+            return entry[1]
+    
+    header = f"{image.shape}|{image.dtype}".encode('ascii')
+    if image.flags.c_contiguous:
+        fingerprint = hash_bytes(header, image.data)
+    else:
+        # Views such as region slices are hashed row by row instead of being copied
+        fingerprint = hash_bytes(header, *(np.ascontiguousarray(row).data for row in image))
+    
+    with _fingerprints_lock:
+        # Drop the memo entry as soon as the array is garbage collected
+        _fingerprints[key] = (weakref.ref(image, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+    return fingerprint
+
+
+def make_key(fingerprint, settings):
+    """Combine an image fingerprint and a settings dict into a cache key"""
+    return f"{fingerprint}:{json.dumps(settings, sort_keys=True, separators=(',', ':'))}"
+
+
+class OCRCache:
+    """Two-tier LRU cache of serialisable OCR results
+    
+    Values are stored as JSON-compatible dicts. ``max_bytes`` bounds the
+    memory tier by the size of the JSON encoding of its entries.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_path=None,
+                 max_disk_entries=DEFAULT_MAX_DISK_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+        
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    value = json.loads(row[0])
+                    self._store(key, value, len(row[0]))
+                    self.disk_hits += 1
+                    return value
+            
+            self.misses += 1
+            return None
+        
+    def put(self, key, value):
+        """Store a JSON-serialisable value under ``key``"""
+        encoded = json.dumps(value, separators=(',', ':'))
+        with self._lock:
+            self._store(key, value, len(encoded))
+            
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)",
+                    (key, encoded, time.time())
+                )
+                self._db.execute(
+                    "DELETE FROM results WHERE key NOT IN "
+                    "(SELECT key FROM results ORDER BY accessed DESC LIMIT ?)",
+                    (self.max_disk_entries,)
+                )
+                self._db.commit()
+        
+    def _store(self, key, value, size):
+        """Insert into the memory tier and evict least recently used entries (lock held)"""
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        
+        # Values larger than the whole budget only go to the disk tier
+        if size > self.max_bytes:
+            return
+        
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+        
+    def clear(self):
+        """Drop every entry from both tiers and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+        
+    def stats(self):
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk': self._db is not None,
+            }
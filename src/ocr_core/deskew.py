@@ -0,0 +1,116 @@
+"""Skew estimation and correction
+
+The angle is estimated on a downscaled, binarized copy with a projection
+profile search: the foreground pixel coordinates are rotated by each
+candidate angle and the angle whose row histogram has the sharpest peaks
+(text lines lying flat) wins. Only the final rotation touches the
+full-resolution image.
+"""
+import threading
+from collections import OrderedDict
+
+# Longest side of the copy used for estimation
+ESTIMATE_MAX_SIDE = 1000
+
+# Largest skew searched for, and the coarse/fine search steps, in degrees
+MAX_ANGLE = 10.0
+COARSE_STEP = 0.5
+FINE_STEP = 0.05
+
+# Skews smaller than this are not worth a full-resolution rotation
+MIN_ANGLE = 0.1
+
+# Foreground points sampled for the search; more adds time, not accuracy
+MAX_POINTS = 50000
+
+# Estimated angles by content hash of the downscaled binary image
+_angle_cache = OrderedDict()
+_angle_cache_lock = threading.Lock()
+ANGLE_CACHE_SIZE = 256
+
+
+def _profile_score(xs, ys, angle):
+    """Sum of squared row counts after rotating the points by ``angle`` degrees"""
+    import numpy as np
+    
+    radians = np.deg2rad(angle)
+    # Row coordinate after cv2.getRotationMatrix2D(center, angle, 1) about the origin
+    rows = np.round(ys * np.cos(radians) - xs * np.sin(radians)).astype(np.int64)
+    counts = np.bincount(rows - rows.min())
+    return float(np.dot(counts, counts))
+
+
+def _search(xs, ys, low, high, step):
+    """Return the angle in [low, high] with the highest profile score"""
+    import numpy as np
+    
+    angles = np.arange(low, high + step / 2, step)
+    scores = [_profile_score(xs, ys, angle) for angle in angles]
+    return float(angles[int(np.argmax(scores))])
+
+
+def estimate_skew(gray):
+    """Estimate the skew of a grayscale page in degrees (counter-clockwise positive)
+    
+    Rotating the image by the returned angle with cv2.getRotationMatrix2D
+    straightens it. Results are cached by the content of the downscaled copy.
+    """
+    import cv2
+    import numpy as np
+    
+    from .cache import hash_bytes
+    
+    # Work on a small copy; the angle does not depend on scale
+    height, width = gray.shape[:2]
+    scale = min(1.0, ESTIMATE_MAX_SIDE / max(height, width))
+    small = gray if scale == 1.0 else cv2.resize(gray, (int(width * scale), int(height * scale)),
+                                                 interpolation=cv2.INTER_AREA)
+    
+    # Text becomes foreground (non-zero) whether it is dark on light or light on dark
+    _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size / 2:
+        cv2.bitwise_not(binary, dst=binary)
+    
+    key = hash_bytes(f"{binary.shape}".encode('ascii'), np.ascontiguousarray(binary).data)
+    with _angle_cache_lock:
+        if key in _angle_cache:
+            _angle_cache.move_to_end(key)
+            return _angle_cache[key]
+    
+    ys, xs = np.nonzero(binary)
+    if len(xs) < 2:
+        angle = 0.0
+    else:
+        if len(xs) > MAX_POINTS:
+            keep = np.random.default_rng(0).choice(len(xs), MAX_POINTS, replace=False)
+            xs, ys = xs[keep], ys[keep]
+        xs = xs.astype(np.float64)
+        ys = ys.astype(np.float64)
+        
+        coarse = _search(xs, ys, -MAX_ANGLE, MAX_ANGLE, COARSE_STEP)
+        angle = _search(xs, ys, coarse - COARSE_STEP, coarse + COARSE_STEP, FINE_STEP)
+    
+    with _angle_cache_lock:
+        _angle_cache[key] = angle
+        while len(_angle_cache) > ANGLE_CACHE_SIZE:
+            _angle_cache.popitem(last=False)
+    return angle
+
+
+def rotate_image(image, angle):
+    """Rotate an image by ``angle`` degrees, growing the canvas so no corner is cut off"""
+    import cv2
+    import numpy as np
+    
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    
+    radians = np.deg2rad(angle)
+    cos, sin = abs(np.cos(radians)), abs(np.sin(radians))
+    new_width = int(round(height * sin + width * cos))
+    new_height = int(round(height * cos + width * sin))
+    matrix[0, 2] += (new_width - width) / 2
+    matrix[1, 2] += (new_height - height) / 2
+    
+    return cv2.warpAffine(image, matrix, (new_width, new_height),
+                          flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
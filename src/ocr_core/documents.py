@@ -0,0 +1,234 @@
+"""Multi-page TIFF and PDF loading with streamed page-by-page OCR
+
+Pages are decoded lazily, one at a time: TIFF frames through PIL's
+ImageSequence, PDF pages through a local rasterizer (the optional
+``pypdfium2`` package, or PyMuPDF). A single producer thread decodes pages
+into a bounded queue that OCR worker threads drain, so only a handful of
+pages are ever decoded at once however long the document is, and results
+can be shown as soon as each page is done.
+"""
+import os
+import queue
+import threading
+from contextlib import closing
+from itertools import islice
+
+from .profiling import bind, span
+from .strategy import CANCEL_POLL_INTERVAL
+
+# Files that may hold more than one page
+DOCUMENT_EXTENSIONS = ('.pdf', '.tif', '.tiff')
+
+# Resolution PDF pages are rendered at
+PDF_DPI = 300
+
+# Decoded pages waiting for a worker; bounds memory together with the worker count
+MAX_QUEUED_PAGES = 2
+
+# Pages recognised at once (each page still tries its PSM candidates in parallel)
+DOCUMENT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def is_document(path):
+    """Return True if ``path`` is a file type that may hold several pages"""
+    return path.lower().endswith(DOCUMENT_EXTENSIONS)
+
+
+def page_header(index):
+    """Return the line that introduces page ``index`` (0-based) in combined text"""
+    return f"--- Page {index + 1} ---"
+
+
+def _open_pdf(path):
+    """Open a PDF with the first available rasterizer and return (backend name, document)"""
+    try:
+        import pypdfium2
+        return 'pdfium', pypdfium2.PdfDocument(path)
+    except ImportError:
+        pass
+    
+    try:
+        import fitz
+        return 'mupdf', fitz.open(path)
+    except ImportError:
+        raise RuntimeError("PDF support requires the pypdfium2 or PyMuPDF package") from None
+
+
+def count_pages(path):
+    """Return the number of pages in an image, TIFF or PDF file"""
+    lower = path.lower()
+    if lower.endswith('.pdf'):
+        backend, document = _open_pdf(path)
+        try:
+            return len(document) if backend == 'pdfium' else document.page_count
+        finally:
+            document.close()
+    
+    if lower.endswith(('.tif', '.tiff')):
+        from PIL import Image
+        
+        with Image.open(path) as image:
+            return getattr(image, 'n_frames', 1)
+    return 1
+
+
+def _iter_tiff_pages(path):
+    """Yield the frames of a (multi-page) TIFF as BGR arrays"""
+    import cv2
+    import numpy as np
+    from PIL import Image, ImageSequence
+    
+    with Image.open(path) as image:
+        for frame in ImageSequence.Iterator(image):
+            yield cv2.cvtColor(np.asarray(frame.convert('RGB')), cv2.COLOR_RGB2BGR)
+
+
+def _iter_pdf_pages(path, dpi):
+    """Yield the pages of a PDF rendered at ``dpi`` as BGR arrays"""
+    import cv2
+    import numpy as np
+    
+    backend, document = _open_pdf(path)
+    try:
+        if backend == 'pdfium':
+            for index in range(len(document)):
+                page = document[index]
+                try:
+                    bitmap = page.render(scale=dpi / 72)
+                    yield cv2.cvtColor(np.asarray(bitmap.to_pil().convert('RGB')), cv2.COLOR_RGB2BGR)
+                finally:
+                    page.close()
+        else:
+            for page in document:
+                pixmap = page.get_pixmap(dpi=dpi, alpha=False)
+                samples = np.frombuffer(pixmap.samples, dtype=np.uint8)
+                rgb = samples.reshape(pixmap.height, pixmap.width, pixmap.n)
+                # cvtColor copies, so the pixmap buffer may be freed afterwards
+                yield cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR if pixmap.n == 3 else cv2.COLOR_GRAY2BGR)
+    finally:
+        document.close()
+
+
+def iter_pages(path, dpi=PDF_DPI):
+    """Yield the pages of an image, TIFF or PDF file one at a time as BGR arrays"""
+    lower = path.lower()
+    if lower.endswith('.pdf'):
+        yield from _iter_pdf_pages(path, dpi)
+    elif lower.endswith(('.tif', '.tiff')):
+        yield from _iter_tiff_pages(path)
+    else:
+        import cv2
+        
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError(f"Failed to load image: {path}")
+        yield image
+
+
+def load_page(path, index=0, dpi=PDF_DPI):
+    """Decode one page of an image, TIFF or PDF file as a BGR array, or return None if there is no such page
+    
+    The file is closed again before returning, rather than whenever a
+    half-consumed iter_pages() generator happens to be collected.
+    """
+    with closing(iter_pages(path, dpi)) as pages:
+        return next(islice(pages, index, None), None)
+
+
+def ocr_pages(pages, ocr_page, workers=DOCUMENT_WORKERS, max_queued=MAX_QUEUED_PAGES,
+              is_cancelled=lambda: False):
+    """Recognise pages from an iterator on worker threads and yield (index, result) in page order
+    
+    One producer thread pulls pages from ``pages`` into a queue of at most
+    ``max_queued`` entries and ``workers`` threads call ``ocr_page(page)``,
+    so no more than ``max_queued + workers + 1`` decoded pages (counting
+    the one waiting to be queued) exist at once.
+    An exception from decoding or from ``ocr_page`` is re-raised here.
+    Stops early, leaving the remaining pages undecoded, once
+    ``is_cancelled()`` is true or the generator is closed.
+    """
+    page_queue = queue.Queue(maxsize=max_queued)
+    results = queue.Queue()
+    stop = threading.Event()
+    
+    def put_page(item):
+        """Queue a page, giving up if the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                page_queue.put(item, timeout=CANCEL_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+        
+    def produce():
+        count = 0
+        page_iter = iter(pages)
+        try:
+            while True:
+                # Decoding happens inside next(), so time that
+                with span('decode'):
+                    page = next(page_iter, None)
+                if page is None:
+                    break
+                count += 1
+                if not put_page((count - 1, page)):
+                    return
+            results.put(('end', count, None))
+        except Exception as e:
+            results.put(('error', None, e))
+        finally:
+            # One sentinel per worker so they all exit
+            for _ in range(workers):
+                put_page(None)
+        
+    def consume():
+        while not stop.is_set():
+            try:
+                item = page_queue.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            
+            index, page = item
+            try:
+                with span(f"page {index + 1}"):
+                    result = ocr_page(page)
+                results.put(('page', index, result))
+            except Exception as e:
+                results.put(('error', index, e))
+            del item, page
+    
+    threads = [threading.Thread(target=bind(produce), name='page-decoder', daemon=True)]
+    threads += [threading.Thread(target=bind(consume), name=f'page-ocr-{i}', daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    
+    # Pages can finish out of order; hold the early ones until their turn
+    finished = {}
+    next_index = 0
+    total = None
+    try:
+        while total is None or next_index < total:
+            try:
+                kind, index, value = results.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                if is_cancelled():
+                    return
+                continue
+            
+            if kind == 'error':
+                raise value
+            if kind == 'end':
+                total = index
+                continue
+            
+            finished[index] = value
+            while next_index in finished:
+                yield next_index, finished.pop(next_index)
+                next_index += 1
+            if is_cancelled():
+                return
+    finally:
+        stop.set()
@@ -0,0 +1,432 @@
+"""Pluggable OCR engine backends
+
+Every backend exposes the same ``image_to_string(image, psm, oem, lang)``
+and ``image_to_data(image, psm, oem, lang)`` calls so the rest of the
+application does not care whether Tesseract runs as a subprocess or
+in-process.
+
+- ``PytesseractEngine`` shells out to the tesseract executable for every
+  call (temp file, process start, traineddata load, stdout parse).
+- ``TesserocrEngine`` and ``CAPIEngine`` load libtesseract once and keep one
+  initialised API handle per worker thread, so the language model is only
+  loaded the first time a thread sees a given (lang, oem) pair.
+
+``image_to_data`` also takes a ``should_stop()`` callable. Backends with
+``can_stop`` check it while recognising and raise RecognitionStopped:
+pytesseract kills the tesseract process, and the C API backend cancels
+through Tesseract's progress monitor. tesserocr has no way to interrupt a
+recognition, so it only checks before starting.
+"""
+import glob
+import os
+import threading
+
+DEFAULT_LANG = 'eng'
+
+# Columns of Tesseract's TSV output, in order
+TSV_COLUMNS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text')
+
+# TSV level of individual words
+WORD_LEVEL = 5
+
+# How often a running tesseract process is checked for a stop request, in seconds
+STOP_POLL_INTERVAL = 0.05
+
+
+class RecognitionStopped(Exception):
+    """Raised by a recognition that was stopped through its ``should_stop()`` callable"""
+
+
+def _to_gray_array(image):
+    """Return a C-contiguous uint8 grayscale numpy array for a PIL or numpy image"""
+    import numpy as np
+    
+    if not isinstance(image, np.ndarray):
+        image = np.asarray(image.convert('L'))
+    elif image.ndim == 3:
+        import cv2
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+def parse_tsv(tsv):
+    """Parse Tesseract TSV output into a dict of column lists (like pytesseract's Output.DICT)"""
+    data = {column: [] for column in TSV_COLUMNS}
+    for line in tsv.splitlines():
+        fields = line.split('\t')
+        # Skip the header row and anything malformed
+        if len(fields) < 11 or not fields[0].isdigit():
+            continue
+        if len(fields) == 11:
+            fields.append('')
+        
+        for column, value in zip(TSV_COLUMNS[:10], fields[:10]):
+            data[column].append(int(value))
+        data['conf'].append(float(fields[10]))
+        data['text'].append(fields[11])
+    
+    return data
+
+
+def data_to_text(data):
+    """Rebuild plain text from word data, one line per Tesseract line and a blank line between paragraphs"""
+    paragraphs = []
+    lines = {}
+    for i, level in enumerate(data['level']):
+        word = data['text'][i].strip()
+        if level != WORD_LEVEL or not word:
+            continue
+        
+        paragraph_key = (data['page_num'][i], data['block_num'][i], data['par_num'][i])
+        if paragraph_key not in lines:
+            lines[paragraph_key] = {}
+            paragraphs.append(paragraph_key)
+        lines[paragraph_key].setdefault(data['line_num'][i], []).append(word)
+    
+    return '\n\n'.join(
+        '\n'.join(' '.join(words) for words in lines[key].values())
+        for key in paragraphs
+    )
+
+
+class OCREngine:
+    """Base class for OCR backends"""
+    name = None
+    
+    # True if a recognition already running can be stopped through should_stop()
+    can_stop = False
+    
+    def image_to_string(self, image, psm=3, oem=3, lang=DEFAULT_LANG):
+        """Recognise the text in a PIL image or numpy array"""
+        raise NotImplementedError
+        
+    def image_to_tsv(self, image, psm=3, oem=3, lang=DEFAULT_LANG, should_stop=None):
+        """Recognise an image and return Tesseract's TSV word table"""
+        raise NotImplementedError
+        
+    def image_to_data(self, image, psm=3, oem=3, lang=DEFAULT_LANG, should_stop=None):
+        """Recognise an image and return word boxes and confidences as a dict of lists
+        
+        Raises RecognitionStopped if ``should_stop()`` is true before the
+        recognition starts or, with ``can_stop``, while it runs.
+        """
+        if should_stop is not None and should_stop():
+            raise RecognitionStopped()
+        return parse_tsv(self.image_to_tsv(image, psm=psm, oem=oem, lang=lang, should_stop=should_stop))
+
+
+class PytesseractEngine(OCREngine):
+    """Run the tesseract executable through pytesseract for every call"""
+    name = 'pytesseract'
+    can_stop = True
+    
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+        
+    def image_to_string(self, image, psm=3, oem=3, lang=DEFAULT_LANG):
+        config = f'--psm {psm} --oem {oem}'
+        return self._pytesseract.image_to_string(image, lang=lang, config=config)
+        
+    def image_to_tsv(self, image, psm=3, oem=3, lang=DEFAULT_LANG, should_stop=None):
+        config = f'--psm {psm} --oem {oem}'
+        if should_stop is None:
+            return self._pytesseract.image_to_data(image, lang=lang, config=config)
+        return self._run_stoppable(image, lang, config, should_stop)
+        
+    def _run_stoppable(self, image, lang, config, should_stop):
+        """Produce a TSV with the same command as pytesseract, killing tesseract once ``should_stop()`` is true"""
+        import subprocess
+        
+        module = self._pytesseract.pytesseract
+        with module.save(image) as (temp_name, input_filename):
+            args = [module.tesseract_cmd, input_filename, temp_name, '-l', lang,
+                    '-c', 'tessedit_create_tsv=1', *config.split()]
+            try:
+                proc = subprocess.Popen(args, **module.subprocess_args())
+            except FileNotFoundError:
+                raise module.TesseractNotFoundError() from None
+            
+            # Wait for tesseract in short steps so a stop request is noticed while it runs
+            while True:
+                try:
+                    _, errors = proc.communicate(timeout=STOP_POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if should_stop():
+                        module.kill(proc, -1)
+                        proc.communicate()
+                        raise RecognitionStopped() from None
+            
+            if proc.returncode:
+                raise module.TesseractError(proc.returncode, module.get_errors(errors))
+            with open(f'{temp_name}.tsv', 'rb') as f:
+                return f.read().decode('utf-8')
+
+
+class TesserocrEngine(OCREngine):
+    """Keep a tesserocr.PyTessBaseAPI alive per worker thread"""
+    name = 'tesserocr'
+    
+    def __init__(self, tessdata_path=None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._tessdata_path = tessdata_path
+        self._local = threading.local()
+        
+    def _get_api(self, lang, oem):
+        """Return this thread's API handle for (lang, oem), creating it once"""
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        
+        api = apis.get((lang, oem))
+        if api is None:
+            kwargs = {'lang': lang, 'oem': self._tesserocr.OEM(oem)}
+            if self._tessdata_path:
+                kwargs['path'] = self._tessdata_path
+            api = apis[(lang, oem)] = self._tesserocr.PyTessBaseAPI(**kwargs)
+        
+        return api
+        
+    def _set_image(self, image, psm, oem, lang):
+        """Load an image into this thread's API handle and return the handle"""
+        from PIL import Image
+        
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(_to_gray_array(image))
+        
+        api = self._get_api(lang, oem)
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        return api
+        
+    def image_to_string(self, image, psm=3, oem=3, lang=DEFAULT_LANG):
+        return self._set_image(image, psm, oem, lang).GetUTF8Text()
+        
+    def image_to_tsv(self, image, psm=3, oem=3, lang=DEFAULT_LANG, should_stop=None):
+        # tesserocr cannot interrupt Recognize(), so should_stop() is only checked before it starts
+        api = self._set_image(image, psm, oem, lang)
+        api.Recognize()
+        return api.GetTSVText(0)
+
+
+def find_tesseract_library(tesseract_cmd=None):
+    """Locate the libtesseract shared library, or return None"""
+    import ctypes.util
+    
+    # Prefer the DLL shipped next to the executable (UB-Mannheim Windows builds)
+    if tesseract_cmd and os.path.isabs(tesseract_cmd):
+        install_dir = os.path.dirname(tesseract_cmd)
+        for pattern in ('libtesseract*.dll', 'tesseract*.dll'):
+            matches = sorted(glob.glob(os.path.join(install_dir, pattern)))
+            if matches:
+                return matches[-1]
+    
+    for name in ('tesseract', 'libtesseract', 'libtesseract-5', 'tesseract50'):
+        path = ctypes.util.find_library(name)
+        if path:
+            return path
+    
+    return None
+
+
+class _CAPIHandle:
+    """Own a TessBaseAPI pointer and release it when the worker thread goes away"""
+    
+    def __init__(self, lib, pointer):
+        self.lib = lib
+        self.pointer = pointer
+        
+    def __del__(self):
+        if self.pointer:
+            self.lib.TessBaseAPIEnd(self.pointer)
+            self.lib.TessBaseAPIDelete(self.pointer)
+            self.pointer = None
+
+
+class CAPIEngine(OCREngine):
+    """Call libtesseract's C API through ctypes, one handle per worker thread"""
+    name = 'capi'
+    
+    def __init__(self, library_path=None, tessdata_path=None, tesseract_cmd=None):
+        import ctypes
+        
+        library_path = library_path or find_tesseract_library(tesseract_cmd)
+        if not library_path:
+            raise ImportError("libtesseract shared library not found")
+        
+        lib = ctypes.CDLL(library_path)
+        
+        lib.TessBaseAPICreate.restype = ctypes.c_void_p
+        lib.TessBaseAPICreate.argtypes = []
+        lib.TessBaseAPIInit2.restype = ctypes.c_int
+        lib.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        lib.TessBaseAPISetPageSegMode.restype = None
+        lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPISetImage.restype = None
+        lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p,
+                                            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        # Keep the raw pointer so the string can be handed back to TessDeleteText
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+        lib.TessBaseAPIGetTsvText.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPIRecognize.restype = ctypes.c_int
+        lib.TessBaseAPIRecognize.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        lib.TessDeleteText.restype = None
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIClear.restype = None
+        lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIEnd.restype = None
+        lib.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIDelete.restype = None
+        lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+        
+        # A progress monitor whose cancel callback stops a running recognition (libtesseract 4+)
+        cancel_func = ctypes.CFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_int)
+        try:
+            lib.TessMonitorCreate.restype = ctypes.c_void_p
+            lib.TessMonitorCreate.argtypes = []
+            lib.TessMonitorDelete.restype = None
+            lib.TessMonitorDelete.argtypes = [ctypes.c_void_p]
+            lib.TessMonitorSetCancelFunc.restype = None
+            lib.TessMonitorSetCancelFunc.argtypes = [ctypes.c_void_p, cancel_func]
+            self.can_stop = True
+        except AttributeError:
+            self.can_stop = False
+        
+        # Fall back to the tessdata folder of the executable's install directory
+        if tessdata_path is None and tesseract_cmd and os.path.isabs(tesseract_cmd):
+            candidate = os.path.join(os.path.dirname(tesseract_cmd), 'tessdata')
+            if os.path.isdir(candidate):
+                tessdata_path = candidate
+        
+        self._lib = lib
+        self._cancel_func = cancel_func
+        self._tessdata_path = tessdata_path
+        self._local = threading.local()
+        
+    def _get_handle(self, lang, oem):
+        """Return this thread's initialised handle for (lang, oem), creating it once"""
+        handles = getattr(self._local, 'handles', None)
+        if handles is None:
+            handles = self._local.handles = {}
+        
+        handle = handles.get((lang, oem))
+        if handle is None:
+            handle = _CAPIHandle(self._lib, self._lib.TessBaseAPICreate())
+            datapath = self._tessdata_path.encode('utf-8') if self._tessdata_path else None
+            if self._lib.TessBaseAPIInit2(handle.pointer, datapath, lang.encode('utf-8'), oem) != 0:
+                raise RuntimeError(f"Could not initialise Tesseract for language '{lang}'")
+            handles[(lang, oem)] = handle
+        
+        return handle
+        
+    def _recognize(self, image, psm, oem, lang, get_text, should_stop=None):
+        """Run recognition on an image and return the string produced by ``get_text(handle)``"""
+        gray = _to_gray_array(image)
+        height, width = gray.shape
+        
+        handle = self._get_handle(lang, oem)
+        lib = self._lib
+        lib.TessBaseAPISetPageSegMode(handle.pointer, psm)
+        lib.TessBaseAPISetImage(handle.pointer, gray.ctypes.data, width, height, 1, gray.strides[0])
+        
+        import ctypes
+        
+        # Tesseract asks the monitor's callback whether to stop as it goes through the page
+        monitor = cancel = None
+        if should_stop is not None and self.can_stop:
+            cancel = self._cancel_func(lambda cancel_this, words: bool(should_stop()))
+            monitor = lib.TessMonitorCreate()
+            lib.TessMonitorSetCancelFunc(monitor, cancel)
+        
+        text_pointer = None
+        try:
+            failed = lib.TessBaseAPIRecognize(handle.pointer, monitor) != 0
+            if should_stop is not None and should_stop():
+                raise RecognitionStopped()
+            if failed:
+                raise RuntimeError("Tesseract recognition failed")
+            text_pointer = get_text(handle.pointer)
+            return ctypes.string_at(text_pointer).decode('utf-8') if text_pointer else ""
+        finally:
+            if text_pointer:
+                lib.TessDeleteText(text_pointer)
+            lib.TessBaseAPIClear(handle.pointer)
+            if monitor is not None:
+                lib.TessMonitorDelete(monitor)
+            
+    def image_to_string(self, image, psm=3, oem=3, lang=DEFAULT_LANG):
+        return self._recognize(image, psm, oem, lang, self._lib.TessBaseAPIGetUTF8Text)
+        
+    def image_to_tsv(self, image, psm=3, oem=3, lang=DEFAULT_LANG, should_stop=None):
+        return self._recognize(image, psm, oem, lang,
+                               lambda pointer: self._lib.TessBaseAPIGetTsvText(pointer, 0), should_stop)
+
+
+ENGINES = {
+    TesserocrEngine.name: TesserocrEngine,
+    CAPIEngine.name: CAPIEngine,
+    PytesseractEngine.name: PytesseractEngine,
+}
+
+# Order tried when no backend is requested explicitly
+AUTO_ORDER = (TesserocrEngine.name, CAPIEngine.name, PytesseractEngine.name)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def create_engine(name, **kwargs):
+    """Instantiate the backend called ``name``"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown OCR engine '{name}'. Choose from: {', '.join(ENGINES)}")
+    return ENGINES[name](**kwargs)
+
+
+def get_engine(name=None, **kwargs):
+    """Return a shared engine instance
+    
+    ``name`` defaults to the ``OCR_ENGINE`` environment variable, or 'auto',
+    which picks the first in-process backend that can be loaded and falls
+    back to pytesseract.
+    """
+    from .tesseract import configure_tesseract
+    
+    name = name or os.environ.get('OCR_ENGINE', 'auto')
+    
+    # Locate the executable (once) so both pytesseract and library discovery can use it
+    kwargs.setdefault('tesseract_cmd', configure_tesseract())
+    
+    with _engines_lock:
+        if name in _engines:
+            return _engines[name]
+        
+        if name == 'auto':
+            engine = None
+            for candidate in AUTO_ORDER:
+                try:
+                    engine = create_engine(candidate, **_engine_kwargs(candidate, kwargs))
+                    break
+                except (ImportError, OSError):
+                    continue
+            if engine is None:
+                raise RuntimeError("No OCR engine is available")
+        else:
+            engine = create_engine(name, **_engine_kwargs(name, kwargs))
+        
+        _engines[name] = engine
+        return engine
+
+
+def _engine_kwargs(name, kwargs):
+    """Keep only the keyword arguments the given backend understands"""
+    if name == PytesseractEngine.name:
+        return {}
+    if name == TesserocrEngine.name:
+        return {k: v for k, v in kwargs.items() if k == 'tessdata_path'}
+    return kwargs
@@ -0,0 +1,300 @@
+"""Export structured OCR results as hOCR, TSV, ALTO XML or JSON Lines
+
+Every format is written by a PageWriter: a header, then each page as soon
+as it is available, then a footer. Pages can come from any iterable (a
+generator over a long document, or a PageStore), so a document is never
+held in memory as one string.
+
+PageStore keeps the pages of one OCR run for later export; past a few
+pages it moves them to a temporary JSON Lines file.
+"""
+import json
+import os
+import tempfile
+import weakref
+from html import escape
+from xml.sax.saxutils import quoteattr
+
+from .engines import TSV_COLUMNS
+from .layout import page_from_dict, page_to_dict
+
+# Pages a PageStore keeps in memory before moving them to a temporary file
+MAX_PAGES_IN_MEMORY = 8
+
+SOFTWARE_NAME = 'ocr-to-txt'
+
+
+def _bbox(box):
+    """hOCR bbox of a (left, top, width, height) box"""
+    left, top, width, height = box
+    return f"bbox {left} {top} {left + width} {top + height}"
+
+
+class PageWriter:
+    """Writes pages to a text stream one at a time
+    
+    Call begin(), write_page() for each page, then end(). ``source`` names
+    the image or document the pages came from.
+    """
+    extension = None
+    label = None
+    
+    def __init__(self, stream, source=''):
+        self.stream = stream
+        self.source = source
+        self.pages = 0
+        
+    def begin(self):
+        """Write whatever comes before the first page"""
+        
+    def write_page(self, page, name=''):
+        """Write one page; ``name`` labels it (e.g. the tab it came from)"""
+        self.pages += 1
+        self.page(page, self.pages, name)
+        
+    def page(self, page, number, name):
+        raise NotImplementedError
+        
+    def end(self):
+        """Write whatever comes after the last page"""
+
+
+class HocrWriter(PageWriter):
+    """hOCR: XHTML with the layout in class and title attributes"""
+    extension = '.hocr'
+    label = "hOCR"
+    
+    def begin(self):
+        self.stream.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+            '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+            '<head>\n'
+            f'<title>{escape(self.source)}</title>\n'
+            '<meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+            f'<meta name="ocr-system" content="{SOFTWARE_NAME}"/>\n'
+            '<meta name="ocr-capabilities" content="ocr_page ocr_carea ocr_par ocr_line ocrx_word ocrp_wconf"/>\n'
+            '</head>\n'
+            '<body>\n'
+        )
+        
+    def page(self, page, number, name):
+        write = self.stream.write
+        image = escape(name or self.source).replace('"', '')
+        write(f'<div class="ocr_page" id="page_{number}" '
+              f'title="image &quot;{image}&quot;; bbox 0 0 {page.width} {page.height}; ppageno {number - 1}">\n')
+        for b, block in enumerate(page.blocks, 1):
+            write(f' <div class="ocr_carea" id="block_{number}_{b}" title="{_bbox(block.box)}">\n')
+            for p, paragraph in enumerate(block.paragraphs, 1):
+                write(f'  <p class="ocr_par" id="par_{number}_{b}_{p}" title="{_bbox(paragraph.box)}">\n')
+                for l, line in enumerate(paragraph.lines, 1):
+                    line_id = f"{number}_{b}_{p}_{l}"
+                    write(f'   <span class="ocr_line" id="line_{line_id}" title="{_bbox(line.box)}">')
+                    write(' '.join(
+                        f'<span class="ocrx_word" id="word_{line_id}_{w}" '
+                        f'title="{_bbox(word.box)}; x_wconf {max(0, int(round(word.conf)))}">{escape(word.text)}</span>'
+                        for w, word in enumerate(line.words, 1)
+                    ))
+                    write('</span>\n')
+                write('  </p>\n')
+            write(' </div>\n')
+        write('</div>\n')
+        
+    def end(self):
+        self.stream.write('</body>\n</html>\n')
+
+
+class TsvWriter(PageWriter):
+    """Tesseract's TSV table: one row per page, block, paragraph, line and word"""
+    extension = '.tsv'
+    label = "TSV"
+    
+    def begin(self):
+        self.stream.write('\t'.join(TSV_COLUMNS) + '\n')
+        
+    def page(self, page, number, name):
+        write = self.stream.write
+        
+        def row(level, numbers, box, conf=-1, text=''):
+            fields = [level, number, *numbers, *box, conf if conf == -1 else round(conf, 2), text]
+            write('\t'.join(str(field) for field in fields) + '\n')
+        
+        row(1, (0, 0, 0, 0), (0, 0, page.width, page.height))
+        for b, block in enumerate(page.blocks, 1):
+            row(2, (b, 0, 0, 0), block.box)
+            for p, paragraph in enumerate(block.paragraphs, 1):
+                row(3, (b, p, 0, 0), paragraph.box)
+                for l, line in enumerate(paragraph.lines, 1):
+                    row(4, (b, p, l, 0), line.box)
+                    for w, word in enumerate(line.words, 1):
+                        row(5, (b, p, l, w), word.box, word.conf, word.text)
+
+
+class AltoWriter(PageWriter):
+    """ALTO 4 XML; Tesseract's paragraphs have no ALTO element, so a block's lines are listed together"""
+    extension = '.xml'
+    label = "ALTO XML"
+    
+    def begin(self):
+        self.stream.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"\n'
+            '      xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"\n'
+            '      xsi:schemaLocation="http://www.loc.gov/standards/alto/ns-v4# '
+            'http://www.loc.gov/alto/v4/alto-4-2.xsd">\n'
+            ' <Description>\n'
+            '  <MeasurementUnit>pixel</MeasurementUnit>\n'
+            '  <sourceImageInformation>\n'
+            f'   <fileName>{escape(self.source)}</fileName>\n'
+            '  </sourceImageInformation>\n'
+            '  <OCRProcessing ID="OCR_0">\n'
+            '   <ocrProcessingStep>\n'
+            '    <processingSoftware>\n'
+            f'     <softwareName>{SOFTWARE_NAME}</softwareName>\n'
+            '    </processingSoftware>\n'
+            '   </ocrProcessingStep>\n'
+            '  </OCRProcessing>\n'
+            ' </Description>\n'
+            ' <Layout>\n'
+        )
+        
+    def page(self, page, number, name):
+        write = self.stream.write
+        
+        def position(box):
+            left, top, width, height = box
+            return f'HPOS="{left}" VPOS="{top}" WIDTH="{width}" HEIGHT="{height}"'
+        
+        write(f'  <Page ID="page_{number}" PHYSICAL_IMG_NR="{number}" WIDTH="{page.width}" HEIGHT="{page.height}">\n')
+        write(f'   <PrintSpace HPOS="0" VPOS="0" WIDTH="{page.width}" HEIGHT="{page.height}">\n')
+        for b, block in enumerate(page.blocks, 1):
+            write(f'    <TextBlock ID="block_{number}_{b}" {position(block.box)}>\n')
+            lines = [line for paragraph in block.paragraphs for line in paragraph.lines]
+            for l, line in enumerate(lines, 1):
+                line_id = f"{number}_{b}_{l}"
+                write(f'     <TextLine ID="line_{line_id}" {position(line.box)}>\n')
+                for w, word in enumerate(line.words, 1):
+                    if w > 1:
+                        write('      <SP/>\n')
+                    confidence = min(1.0, max(0.0, word.conf / 100))
+                    write(f'      <String ID="string_{line_id}_{w}" {position(word.box)} '
+                          f'WC="{confidence:.2f}" CONTENT={quoteattr(word.text)}/>\n')
+                write('     </TextLine>\n')
+            write('    </TextBlock>\n')
+        write('   </PrintSpace>\n')
+        write('  </Page>\n')
+        
+    def end(self):
+        self.stream.write(' </Layout>\n</alto>\n')
+
+
+class JsonlWriter(PageWriter):
+    """JSON Lines: one object per page with its text and full layout"""
+    extension = '.jsonl'
+    label = "JSON Lines"
+    
+    def page(self, page, number, name):
+        record = {'page': number, 'source': name or self.source, 'text': page.text}
+        record.update(page_to_dict(page))
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+# Export formats by name
+WRITERS = {
+    'hocr': HocrWriter,
+    'tsv': TsvWriter,
+    'alto': AltoWriter,
+    'jsonl': JsonlWriter,
+}
+
+
+def format_for_path(path):
+    """Return the export format a file name asks for by its extension, or None"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.html':
+        return 'hocr'
+    return next((name for name, writer in WRITERS.items() if writer.extension == extension), None)
+
+
+def export_pages(pages, path, format_name, source=''):
+    """Write pages to ``path`` in an export format, one page at a time, and return the page count
+    
+    ``pages`` yields Pages or (Page, name) pairs.
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        writer = WRITERS[format_name](f, source)
+        writer.begin()
+        for page in pages:
+            if isinstance(page, tuple) and len(page) == 2:
+                writer.write_page(*page)
+            else:
+                writer.write_page(page)
+        writer.end()
+    return writer.pages
+
+
+class PageStore:
+    """The pages of one OCR run, in order, kept for export
+    
+    The first ``max_in_memory`` pages stay in memory; once there are more,
+    every page goes to a temporary JSON Lines file that is read back one
+    page at a time when the store is iterated, and deleted with the store.
+    """
+    
+    def __init__(self, pages=(), max_in_memory=MAX_PAGES_IN_MEMORY):
+        self.max_in_memory = max_in_memory
+        self._pages = []
+        self._file = None
+        self._count = 0
+        for page in pages:
+            self.append(page)
+        
+    def append(self, page):
+        """Add the next page"""
+        self._count += 1
+        if self._file is None and self._count <= self.max_in_memory:
+            self._pages.append(page)
+            return
+        
+        if self._file is None:
+            # Too many to keep around: move everything to disk
+            self._file = tempfile.NamedTemporaryFile('w+', encoding='utf-8', prefix='ocr_to_txt_',
+                                                     suffix='.jsonl', delete=False)
+            self._finalizer = weakref.finalize(self, PageStore._remove, self._file)
+            for kept in self._pages:
+                self._write(kept)
+            self._pages = []
+        self._write(page)
+        
+    def _write(self, page):
+        self._file.write(json.dumps(page_to_dict(page), ensure_ascii=False) + '\n')
+        
+    @staticmethod
+    def _remove(file):
+        file.close()
+        try:
+            os.remove(file.name)
+        except OSError:
+            pass
+        
+    def close(self):
+        """Delete the temporary file, if any; the store is empty afterwards"""
+        if self._file is not None:
+            self._finalizer()
+            self._file = None
+        self._pages = []
+        self._count = 0
+        
+    def __iter__(self):
+        if self._file is None:
+            yield from list(self._pages)
+            return
+        
+        self._file.flush()
+        with open(self._file.name, encoding='utf-8') as f:
+            for line in f:
+                yield page_from_dict(json.loads(line))
+        
+    def __len__(self):
+        return self._count
@@ -0,0 +1,201 @@
+"""Memory-budgeted storage for the full-resolution images of the tabs
+
+Every tab's image is kept in RAM while the total fits in one budget. Past
+the budget, the least recently used images of inactive tabs are evicted:
+an image that can be decoded again from an unchanged file is simply
+dropped, anything else (screen captures, files changed on disk) is written
+once to an uncompressed .npy spill file in a private temporary directory.
+An evicted image is re-hydrated on its next access, memory-mapped from its
+spill file so only the pages that are actually read are loaded.
+
+On Windows a memory-mapped file cannot be deleted while any view of it is
+alive (a preview, a running job), so spill files that fail to delete are
+remembered and retried whenever the store trims or removes an image.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Default budget for the full-resolution images of all tabs together
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def _file_stamp(path):
+    """Return (mtime, size) of a file, or None if it cannot be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _Entry:
+    """One stored image and where to get it back from once evicted"""
+    
+    def __init__(self, image, loader, source):
+        self.image = image
+        self.shape = image.shape
+        self.nbytes = image.nbytes
+        self.loader = loader
+        self.source = source
+        self.stamp = _file_stamp(source) if source else None
+        self.spill_path = None
+
+
+class ImageStore:
+    """Images keyed by owner (a tab) under a global memory budget
+    
+    ``on_evict(owner)`` is called after an owner's image leaves memory, so
+    anything else holding on to it (such as a preview pyramid) can let go.
+    The active owner is never evicted.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # owner -> _Entry, least recently used first
+        self._active = None
+        self._spill_dir = None
+        self._stale_spills = set()  # Spill files of removed images that could not be deleted yet
+        self._lock = threading.RLock()
+        
+    def put(self, owner, image, source=None, loader=None):
+        """Store ``owner``'s image, replacing any previous one
+        
+        ``loader()`` must return the same image again from ``source`` (a file
+        path); without them the image is spilled to disk when evicted.
+        """
+        with self._lock:
+            self._remove(owner)
+            self._entries[owner] = _Entry(image, loader if source else None, source)
+        self.trim()
+        
+    def get(self, owner):
+        """Return ``owner``'s image, re-hydrating it if it was evicted, or None if there is none"""
+        with self._lock:
+            entry = self._entries.get(owner)
+            if entry is None:
+                return None
+            if entry.image is None:
+                entry.image = self._rehydrate(entry)
+            self._entries.move_to_end(owner)
+            image = entry.image
+        self.trim()
+        return image
+        
+    def has(self, owner):
+        """Return True if ``owner`` has an image, in memory or not"""
+        with self._lock:
+            return owner in self._entries
+        
+    def is_resident(self, owner):
+        """Return True if ``owner``'s image is in memory"""
+        with self._lock:
+            entry = self._entries.get(owner)
+            return entry is not None and entry.image is not None
+        
+    def shape(self, owner):
+        """Return the shape of ``owner``'s image without re-hydrating it"""
+        with self._lock:
+            entry = self._entries.get(owner)
+            return None if entry is None else entry.shape
+        
+    def set_active(self, owner):
+        """Mark ``owner`` as the visible tab, whose image is never evicted"""
+        with self._lock:
+            self._active = owner
+            if owner in self._entries:
+                self._entries.move_to_end(owner)
+        self.trim()
+        
+    def discard(self, owner):
+        """Forget the image of a closed tab"""
+        with self._lock:
+            self._remove(owner)
+        
+    def stats(self):
+        """Return memory and spill counters"""
+        with self._lock:
+            entries = list(self._entries.values())
+        resident = [entry for entry in entries if entry.image is not None]
+        return {
+            'resident_bytes': sum(entry.nbytes for entry in resident),
+            'max_bytes': self.max_bytes,
+            'resident': len(resident),
+            'evicted': len(entries) - len(resident),
+            'spilled_bytes': sum(entry.nbytes for entry in entries if entry.spill_path),
+            'stale_spills': len(self._stale_spills),
+        }
+        
+    def trim(self):
+        """Evict images of inactive owners, least recently used first, until under budget"""
+        evicted = []
+        with self._lock:
+            total = sum(entry.nbytes for entry in self._entries.values() if entry.image is not None)
+            for owner, entry in self._entries.items():
+                if total <= self.max_bytes:
+                    break
+                if owner == self._active or entry.image is None:
+                    continue
+                self._evict(entry)
+                total -= entry.nbytes
+                evicted.append(owner)
+            self._delete_stale_spills()
+        
+        if self.on_evict is not None:
+            for owner in evicted:
+                self.on_evict(owner)
+        
+    def _evict(self, entry):
+        """Drop an entry's pixels, spilling them first if they cannot be decoded again"""
+        import numpy as np
+        
+        reloadable = entry.loader is not None and entry.stamp is not None and _file_stamp(entry.source) == entry.stamp
+        if not reloadable and entry.spill_path is None:
+            if self._spill_dir is None:
+                # Removed automatically when the application exits
+                self._spill_dir = tempfile.TemporaryDirectory(prefix='ocr_to_txt_')
+            handle, path = tempfile.mkstemp(suffix='.npy', dir=self._spill_dir.name)
+            with os.fdopen(handle, 'wb') as f:
+                np.save(f, entry.image)
+            entry.spill_path = path
+        entry.image = None
+        
+    def _rehydrate(self, entry):
+        """Load an evicted entry's pixels back"""
+        import numpy as np
+        
+        if entry.spill_path is not None:
+            return np.load(entry.spill_path, mmap_mode='r')
+        
+        if _file_stamp(entry.source) != entry.stamp:
+            raise RuntimeError(f"{entry.source} changed on disk since it was loaded; load it again")
+        image = entry.loader()
+        if image is None or image.shape != entry.shape:
+            raise RuntimeError(f"Failed to reload {entry.source}")
+        return image
+        
+    def _remove(self, owner):
+        """Remove an entry and its spill file"""
+        entry = self._entries.pop(owner, None)
+        if entry is None:
+            return
+        
+        # Let go of the store's memory map first, or the file cannot be deleted on Windows
+        entry.image = None
+        if entry.spill_path is not None:
+            self._stale_spills.add(entry.spill_path)
+            entry.spill_path = None
+        self._delete_stale_spills()
+        
+    def _delete_stale_spills(self):
+        """Delete the spill files of removed images, keeping any still mapped elsewhere for a later try"""
+        for path in list(self._stale_spills):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            self._stale_spills.discard(path)
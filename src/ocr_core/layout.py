@@ -0,0 +1,186 @@
+"""Structured OCR results: blocks, paragraphs, lines and words with boxes and confidences
+
+One Page is built from the word table of each recognition run, and the
+plain text shown and saved is derived from it, so layout and confidences
+are available for export without running Tesseract again.
+
+Boxes are (left, top, width, height) in pixels. The pages and word data
+returned by ``ocr_image`` are in the coordinates of the image that was
+passed in, not of its resized and deskewed copy.
+"""
+from collections import namedtuple
+
+from .engines import WORD_LEVEL
+
+
+class Word(namedtuple('Word', ['text', 'box', 'conf'])):
+    """A recognised word; ``conf`` is Tesseract's confidence, 0-100"""
+    __slots__ = ()
+
+
+class Line(namedtuple('Line', ['box', 'words'])):
+    """Words on one text line"""
+    __slots__ = ()
+    
+    @property
+    def text(self):
+        return ' '.join(word.text for word in self.words)
+
+
+class Paragraph(namedtuple('Paragraph', ['box', 'lines'])):
+    """Lines of one paragraph"""
+    __slots__ = ()
+    
+    @property
+    def text(self):
+        return '\n'.join(line.text for line in self.lines)
+
+
+class Block(namedtuple('Block', ['box', 'paragraphs'])):
+    """Paragraphs of one text block (a column, a caption, a table cell...)"""
+    __slots__ = ()
+    
+    @property
+    def text(self):
+        return '\n\n'.join(paragraph.text for paragraph in self.paragraphs)
+
+
+class Page(namedtuple('Page', ['width', 'height', 'blocks'])):
+    """The recognised layout of one image or document page"""
+    __slots__ = ()
+    
+    @property
+    def text(self):
+        """Plain text: one line per line, a blank line between paragraphs"""
+        return '\n\n'.join(block.text for block in self.blocks)
+        
+    def words(self):
+        """Iterate over every word in reading order"""
+        for block in self.blocks:
+            for paragraph in block.paragraphs:
+                for line in paragraph.lines:
+                    yield from line.words
+
+
+EMPTY_PAGE = Page(0, 0, ())
+
+
+def union_box(boxes):
+    """Return the smallest box containing all ``boxes``"""
+    boxes = list(boxes)
+    left = min(box[0] for box in boxes)
+    top = min(box[1] for box in boxes)
+    right = max(box[0] + box[2] for box in boxes)
+    bottom = max(box[1] + box[3] for box in boxes)
+    return (left, top, right - left, bottom - top)
+
+
+def page_from_data(data, width=0, height=0):
+    """Build a Page from Tesseract word data (a dict of TSV columns)
+    
+    Words are grouped by their block, paragraph and line numbers in the
+    order they first appear; empty words, lines and blocks are left out.
+    Container boxes are the union of their words' boxes.
+    """
+    blocks = {}  # (page, block) -> {paragraph: {line: [Word]}}
+    for i, level in enumerate(data['level']):
+        text = data['text'][i].strip()
+        if level != WORD_LEVEL or not text:
+            continue
+        
+        box = (data['left'][i], data['top'][i], data['width'][i], data['height'][i])
+        paragraphs = blocks.setdefault((data['page_num'][i], data['block_num'][i]), {})
+        lines = paragraphs.setdefault(data['par_num'][i], {})
+        lines.setdefault(data['line_num'][i], []).append(Word(text, box, float(data['conf'][i])))
+    
+    return Page(width, height, tuple(
+        _block(tuple(_paragraph(tuple(_line(tuple(words)) for words in lines.values()))
+                     for lines in paragraphs.values()))
+        for paragraphs in blocks.values()
+    ))
+
+
+def _line(words):
+    return Line(union_box(word.box for word in words), words)
+
+
+def _paragraph(lines):
+    return Paragraph(union_box(line.box for line in lines), lines)
+
+
+def _block(paragraphs):
+    return Block(union_box(paragraph.box for paragraph in paragraphs), paragraphs)
+
+
+def map_page(page, map_box, width, height):
+    """Return a copy of ``page`` of the given size with every word box passed through ``map_box``"""
+    return Page(width, height, tuple(
+        _block(tuple(
+            _paragraph(tuple(
+                _line(tuple(word._replace(box=map_box(word.box)) for word in line.words))
+                for line in paragraph.lines))
+            for paragraph in block.paragraphs))
+        for block in page.blocks
+    ))
+
+
+def transform_data(data, matrix, width, height):
+    """Return a copy of Tesseract word data with its boxes mapped through a 2x3 affine ``matrix``
+    
+    Each box becomes the bounding box of its transformed corners, clipped
+    to an image of ``width`` x ``height``.
+    """
+    (a, b, c), (d, e, f) = matrix
+    data = {column: list(values) for column, values in data.items()}
+    for i in range(len(data['level'])):
+        left, top = data['left'][i], data['top'][i]
+        right, bottom = left + data['width'][i], top + data['height'][i]
+        corners = [(x, y) for x in (left, right) for y in (top, bottom)]
+        xs = [a * x + b * y + c for x, y in corners]
+        ys = [d * x + e * y + f for x, y in corners]
+        x0, y0 = max(0, int(round(min(xs)))), max(0, int(round(min(ys))))
+        x1, y1 = min(width, int(round(max(xs)))), min(height, int(round(max(ys))))
+        data['left'][i], data['top'][i] = x0, y0
+        data['width'][i], data['height'][i] = max(0, x1 - x0), max(0, y1 - y0)
+    return data
+
+
+def offset_page(page, dx, dy, width, height):
+    """Move a page's boxes by (dx, dy), e.g. from a region's coordinates into the whole image's"""
+    return map_page(page, lambda box: (box[0] + dx, box[1] + dy, box[2], box[3]), width, height)
+
+
+def merge_pages(pages, width, height):
+    """Combine pages covering parts of one image into a single page, blocks in the given order"""
+    return Page(width, height, tuple(block for page in pages for block in page.blocks))
+
+
+def page_to_dict(page):
+    """Return a JSON-serialisable dict of a page"""
+    return {
+        'width': page.width,
+        'height': page.height,
+        'blocks': [{
+            'box': list(block.box),
+            'paragraphs': [{
+                'box': list(paragraph.box),
+                'lines': [{
+                    'box': list(line.box),
+                    'words': [{'text': word.text, 'box': list(word.box), 'conf': word.conf} for word in line.words],
+                } for line in paragraph.lines],
+            } for paragraph in block.paragraphs],
+        } for block in page.blocks],
+    }
+
+
+def page_from_dict(value):
+    """Rebuild a page from page_to_dict's output"""
+    return Page(value['width'], value['height'], tuple(
+        Block(tuple(block['box']), tuple(
+            Paragraph(tuple(paragraph['box']), tuple(
+                Line(tuple(line['box']), tuple(
+                    Word(word['text'], tuple(word['box']), word['conf']) for word in line['words']))
+                for line in paragraph['lines']))
+            for paragraph in block['paragraphs']))
+        for block in value['blocks']
+    ))
@@ -0,0 +1,83 @@
+"""Character and word error rates of recognised text against a ground truth
+
+The edit distance uses the rapidfuzz package when it is installed and
+otherwise Hyyrö's bit-parallel form of Myers' algorithm, which processes a
+whole column of the dynamic-programming matrix per step using Python's
+arbitrary-size integers, so a page of text costs a few thousand big-integer
+operations instead of millions of cell updates. Both work on any sequence
+of hashable items: strings for characters, lists of words for words.
+"""
+from collections import namedtuple
+
+# Errors and reference lengths; rates are errors divided by reference length
+ErrorCounts = namedtuple('ErrorCounts', ['char_errors', 'chars', 'word_errors', 'words'])
+
+
+def _bit_parallel_distance(a, b):
+    """Levenshtein distance of two sequences, with ``b`` no longer than ``a``"""
+    m = len(b)
+    if not m:
+        return len(a)
+    
+    # One bit per position of b for every symbol that occurs in it
+    peq = {}
+    for i, symbol in enumerate(b):
+        peq[symbol] = peq.get(symbol, 0) | (1 << i)
+    
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for symbol in a:
+        eq = peq.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def levenshtein(a, b):
+    """Return the number of insertions, deletions and substitutions turning ``a`` into ``b``"""
+    try:
+        from rapidfuzz.distance import Levenshtein
+    except ImportError:
+        Levenshtein = None
+    
+    if Levenshtein is not None:
+        return Levenshtein.distance(a, b)
+    if len(a) < len(b):
+        a, b = b, a
+    return _bit_parallel_distance(a, b)
+
+
+def normalize_text(text):
+    """Collapse runs of whitespace, which OCR layout changes without changing the text"""
+    return ' '.join(text.split())
+
+
+def error_counts(reference, hypothesis):
+    """Count character and word errors of ``hypothesis`` against ``reference``"""
+    reference, hypothesis = normalize_text(reference), normalize_text(hypothesis)
+    reference_words, hypothesis_words = reference.split(), hypothesis.split()
+    return ErrorCounts(levenshtein(reference, hypothesis), len(reference),
+                       levenshtein(reference_words, hypothesis_words), len(reference_words))
+
+
+def error_rates(counts):
+    """Return (CER, WER) from ErrorCounts, or summed ErrorCounts of several pages"""
+    cer = counts.char_errors / counts.chars if counts.chars else float(counts.char_errors > 0)
+    wer = counts.word_errors / counts.words if counts.words else float(counts.word_errors > 0)
+    return cer, wer
+
+
+def sum_counts(counts):
+    """Add up the ErrorCounts of several pages"""
+    return ErrorCounts(*(sum(values) for values in zip(*counts))) if counts else ErrorCounts(0, 0, 0, 0)
@@ -0,0 +1,107 @@
+"""Image-to-text pipeline shared by the GUI workers and the batch CLI"""
+import time
+
+from .cache import image_fingerprint, make_key
+from .engines import get_engine
+from .layout import page_from_data, page_from_dict, page_to_dict, transform_data
+from .preprocess import default_pipeline, effective_settings, source_transform
+from .profiling import span
+from .strategy import (select_best_psm, PSMResult, FALLBACK_PSM_MODES,
+                       CONFIDENCE_THRESHOLD)
+from .tiling import TILE_MIN_HEIGHT, BAND_HEIGHT, ocr_tiled
+
+# Bumped when the shape or coordinates of cached results change, so older entries are not reused
+RESULT_FORMAT = 3
+
+
+def preprocess_image(image, contrast=1.0, brightness=1.0, sharpness=1.0, deskew=True, normalize=True):
+    """Preprocess a BGR image for OCR and return (grayscale image, stage timings)"""
+    if image is None:
+        return None, {}
+        
+    return default_pipeline.run(image, effective_settings(contrast, brightness, sharpness, deskew, normalize))
+
+
+def cache_key_for(image, engine, psm_mode, oem_mode, preprocess_settings, tiling=True):
+    """Return the cache key for OCR-ing ``image`` with the given engine, modes and preprocessing"""
+    return make_key(image_fingerprint(image), {
+        'engine': engine.name,
+        'psm_mode': psm_mode,
+        'oem_mode': oem_mode,
+        'band_height': BAND_HEIGHT if tiling else None,
+        'fallback_psm_modes': FALLBACK_PSM_MODES,
+        'confidence_threshold': CONFIDENCE_THRESHOLD,
+        'result': RESULT_FORMAT,
+        'preprocess': preprocess_settings
+    })
+
+
+def ocr_image(image, psm_mode=3, oem_mode=3, contrast=1.0, brightness=1.0, sharpness=1.0,
+              deskew=True, normalize=True, tiling=True, engine=None, cache=None, stage_cache=None, is_cancelled=lambda: False, executor=None):
+    """Preprocess a BGR image and recognise it with the best PSM mode
+    
+    ``contrast``, ``brightness`` and ``sharpness`` are the per-tab slider
+    values (1.0 is the default enhancement); ``normalize`` resizes the
+    image to a target text x-height and ``deskew`` straightens tilted
+    pages before enhancement; with ``tiling`` images taller than
+    TILE_MIN_HEIGHT are recognised in parallel bands. Returns a PSMResult whose
+    ``timings`` maps each stage to seconds, or None if ``is_cancelled()``
+    became true first.
+    ``cache`` is an optional OCRCache consulted before any work is done.
+    ``stage_cache`` is an optional StageCache holding this image's
+    preprocessing intermediates, so only stages affected by a changed
+    setting are recomputed.
+    ``executor`` is passed through to select_best_psm to bound how many
+    candidate modes run at once.
+    """
+    engine = engine or get_engine()
+    preprocess_settings = effective_settings(contrast, brightness, sharpness, deskew, normalize)
+    
+    # Look the result up by image content and everything that affects the output
+    cache_key = None
+    if cache is not None:
+        with span('cache lookup'):
+            cache_key = cache_key_for(image, engine, psm_mode, oem_mode, preprocess_settings, tiling)
+            cached = cache.get(cache_key)
+        if cached is not None:
+            return PSMResult(**dict(cached, page=page_from_dict(cached['page'])), cached=True)
+    
+    # Preprocess the image, reusing unchanged intermediate stages when possible
+    geometry = {'text_scale': 1.0, 'skew_angle': 0.0}
+    with span('preprocess'):
+        if stage_cache is not None:
+            preprocessed_image, timings = default_pipeline.run_memoized(
+                image, preprocess_settings, stage_cache, image_fingerprint(image), outputs=geometry)
+        else:
+            preprocessed_image, timings = default_pipeline.run(image, preprocess_settings, outputs=geometry)
+    
+    # Recognise the selected and fallback PSM modes in parallel and keep the
+    # candidate with the highest word confidence; tall images do this per band
+    start = time.perf_counter()
+    with span('ocr'):
+        if tiling and preprocessed_image.shape[0] > TILE_MIN_HEIGHT:
+            result = ocr_tiled(engine, preprocessed_image, psm_mode, oem=oem_mode,
+                               is_cancelled=is_cancelled, executor=executor)
+        else:
+            result = select_best_psm(engine, preprocessed_image, psm_mode, oem=oem_mode,
+                                     is_cancelled=is_cancelled, executor=executor)
+    if result is None:
+        return None
+    timings['ocr'] = time.perf_counter() - start
+    
+    # Boxes were found on the resized, deskewed copy; report them on the image given
+    to_source = source_transform(image.shape, geometry['text_scale'], geometry['skew_angle'])
+    data = transform_data(result.data, to_source, image.shape[1], image.shape[0])
+    page = page_from_data(data, image.shape[1], image.shape[0])
+    result = result._replace(data=data, timings=timings, page=page)
+    
+    if cache is not None:
+        with span('cache store'):
+            cache.put(cache_key, {
+                'psm': result.psm,
+                'text': result.text,
+                'score': result.score,
+                'data': result.data,
+                'page': page_to_dict(page)
+            })
+    return result
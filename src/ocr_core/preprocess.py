@@ -0,0 +1,376 @@
+"""Single-buffer preprocessing pipeline
+
+The image is converted to grayscale once and every later stage works on
+that one uint8 buffer in place (lookup tables, OpenCV filters with ``dst``),
+instead of building a new PIL image per step. The enhancements reproduce
+PIL's ImageEnhance semantics so results match the previous pipeline.
+
+When enabled, the page is resized so its text has a target x-height (see
+resolution.py) and then deskewed, right after the grayscale conversion.
+Both estimates run on downscaled copies; only the final resize and
+rotation touch the full-resolution image (see deskew.py).
+
+Stages form a small DAG: each names the stages it reads from ('source' is
+the original image) and the settings it depends on. With a StageCache the
+pipeline keeps every intermediate buffer and, when a setting changes, only
+recomputes the stages downstream of it.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from .profiling import span
+
+# Enhancement applied at the default slider position (1.0); the per-tab
+# contrast and sharpness values scale these
+BASE_CONTRAST = 2.0
+BASE_SHARPNESS = 2.0
+
+# Standard deviation of the final noise-reducing blur
+DENOISE_SIGMA = 0.5
+
+# PIL's ImageFilter.SMOOTH kernel, used as the "blurred" end of the sharpness blend
+_SMOOTH_KERNEL = [[1, 1, 1], [1, 5, 1], [1, 1, 1]]
+
+# Name of the pipeline input in stage ``inputs``
+SOURCE = 'source'
+
+Stage = namedtuple('Stage', ['name', 'function', 'inputs', 'params', 'in_place', 'skip'])
+
+
+def stage(name, function, inputs, params=(), in_place=False, skip=None):
+    """Describe a pipeline stage
+    
+    ``function(*input_values, settings)`` returns the stage output. Stages
+    marked ``in_place`` may overwrite their first input, so the pipeline
+    hands them a private copy whenever that input is still needed elsewhere.
+    ``skip(settings)`` returning True passes the first input through unchanged.
+    """
+    return Stage(name, function, tuple(inputs), tuple(params), in_place, skip)
+
+
+def effective_settings(contrast=1.0, brightness=1.0, sharpness=1.0, deskew=True, normalize=True):
+    """Map per-tab slider values to the enhancement factors actually applied"""
+    from .resolution import TARGET_X_HEIGHT
+    
+    return {
+        'normalize': bool(normalize),
+        'target_x_height': TARGET_X_HEIGHT,
+        'deskew': bool(deskew),
+        'contrast': round(BASE_CONTRAST * contrast, 4),
+        'brightness': round(brightness, 4),
+        'sharpness': round(BASE_SHARPNESS * sharpness, 4),
+        'denoise_sigma': DENOISE_SIGMA,
+    }
+
+
+def to_grayscale(image, settings):
+    """Return a new grayscale buffer that later stages may modify in place"""
+    import cv2
+    
+    if image.ndim == 2:
+        return image.copy()
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def text_scale(gray, settings):
+    """Return the factor that brings the dominant x-height to the target (1.0 when disabled)"""
+    from .resolution import estimate_x_height, normalization_scale
+    
+    if not settings['normalize']:
+        return 1.0
+    return normalization_scale(estimate_x_height(gray), settings['target_x_height'])
+
+
+def normalize_resolution(gray, scale, settings):
+    """Resize the image once so its text has the target x-height"""
+    from .resolution import resize_image
+    
+    if scale == 1.0:
+        return gray
+    return resize_image(gray, scale)
+
+
+def skew_angle(gray, settings):
+    """Estimate the page skew in degrees on a downscaled copy (0.0 when disabled)"""
+    from .deskew import estimate_skew
+    
+    if not settings['deskew']:
+        return 0.0
+    return estimate_skew(gray)
+
+
+def deskew(gray, angle, settings):
+    """Rotate the full-resolution image once to undo the estimated skew"""
+    from .deskew import MIN_ANGLE, rotate_image
+    
+    if abs(angle) < MIN_ANGLE:
+        return gray
+    return rotate_image(gray, angle)
+
+
+def adjust_contrast_brightness(gray, settings):
+    """Apply contrast around the mean, then brightness, with a single lookup table"""
+    import cv2
+    import numpy as np
+    
+    contrast = settings['contrast']
+    brightness = settings['brightness']
+    
+    # Same pivot as ImageEnhance.Contrast: the rounded mean gray level
+    mean = int(cv2.mean(gray)[0] + 0.5)
+    levels = np.arange(256, dtype=np.float32)
+    
+    # Like ImageEnhance, each step is clipped to 0-255 and truncated before the next
+    contrasted = np.clip(mean + np.float32(contrast) * (levels - mean), 0, 255).astype(np.uint8)
+    lut = np.clip(np.float32(brightness) * contrasted.astype(np.float32), 0, 255).astype(np.uint8)
+    
+    cv2.LUT(gray, lut, dst=gray)
+    return gray
+
+
+def sharpen(gray, settings):
+    """Blend with a smoothed copy like ImageEnhance.Sharpness (factor > 1 sharpens)"""
+    import cv2
+    import numpy as np
+    
+    factor = settings['sharpness']
+    kernel = np.array(_SMOOTH_KERNEL, dtype=np.float32) / 13.0
+    smooth = cv2.filter2D(gray, -1, kernel, borderType=cv2.BORDER_REPLICATE)
+    cv2.addWeighted(gray, factor, smooth, 1.0 - factor, 0, dst=gray)
+    return gray
+
+
+def denoise(gray, settings):
+    """Apply a slight Gaussian blur to reduce noise"""
+    import cv2
+    
+    cv2.GaussianBlur(gray, (0, 0), settings['denoise_sigma'], dst=gray)
+    return gray
+
+
+def _nbytes(value):
+    """Return the memory held by an intermediate value (0 for non-arrays)"""
+    return getattr(value, 'nbytes', 0)
+
+
+def output_transform(shape, scale, angle):
+    """Return the 2x3 affine matrix taking source pixel coordinates to the preprocessed image's
+    
+    ``shape`` is the source image's, and ``scale`` and ``angle`` the values
+    of the 'text_scale' and 'skew_angle' stages, applied the way
+    normalize_resolution and deskew apply them.
+    """
+    import cv2
+    import numpy as np
+    
+    from .deskew import MIN_ANGLE
+    
+    # Resizing rounds each side separately
+    height, width = shape[:2]
+    scaled_width, scaled_height = width, height
+    if scale != 1.0:
+        scaled_width, scaled_height = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+    matrix = np.array([[scaled_width / width, 0.0, 0.0], [0.0, scaled_height / height, 0.0], [0.0, 0.0, 1.0]])
+    
+    # Rotation about the centre onto a canvas grown to fit, as in rotate_image
+    if abs(angle) >= MIN_ANGLE:
+        rotation = cv2.getRotationMatrix2D((scaled_width / 2, scaled_height / 2), angle, 1.0)
+        radians = np.deg2rad(angle)
+        cos, sin = abs(np.cos(radians)), abs(np.sin(radians))
+        rotation[0, 2] += (int(round(scaled_height * sin + scaled_width * cos)) - scaled_width) / 2
+        rotation[1, 2] += (int(round(scaled_height * cos + scaled_width * sin)) - scaled_height) / 2
+        matrix = np.vstack([rotation, [0.0, 0.0, 1.0]]) @ matrix
+    return matrix[:2]
+
+
+def source_transform(shape, scale, angle):
+    """Return the 2x3 affine matrix taking preprocessed image coordinates back to the source's"""
+    import cv2
+    
+    return cv2.invertAffineTransform(output_transform(shape, scale, angle))
+
+
+class StageCache:
+    """Memoized intermediates of one image's preprocessing
+    
+    Maps each stage name to (signature, value). A stage's signature covers
+    the settings it depends on and the signatures of its inputs, so it
+    changes exactly when the stage or anything upstream must be recomputed.
+    """
+    
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        
+    @property
+    def nbytes(self):
+        """Memory held by the cached intermediates, counting shared buffers once"""
+        seen = {}
+        for _, value in self.entries.values():
+            seen[id(value)] = _nbytes(value)
+        return sum(seen.values())
+        
+    def clear(self):
+        """Drop every intermediate"""
+        self.entries.clear()
+
+
+class PreprocessPipeline:
+    """DAG of preprocessing stages with per-stage timings
+    
+    Stages are listed in dependency order; the last one is the output.
+    """
+    
+    def __init__(self, stages):
+        self.stages = list(stages)
+        
+        # Values still read by later stages, to know when in-place work needs a copy
+        self._read_later = []
+        for i in range(len(self.stages)):
+            self._read_later.append({name for s in self.stages[i + 1:] for name in s.inputs})
+        
+    def _call(self, s, values, settings, must_copy):
+        """Run one stage on already computed values"""
+        inputs = [values[name] for name in s.inputs]
+        if s.skip is not None and s.skip(settings):
+            return inputs[0]
+        if s.in_place and must_copy:
+            inputs[0] = inputs[0].copy()
+        return s.function(*inputs, settings)
+        
+    def run(self, image, settings, outputs=None):
+        """Run all stages and return (image, {stage name: seconds})
+        
+        If ``outputs`` is a dict, the values of the stages named by its keys
+        are stored in it (e.g. the estimated 'text_scale' and 'skew_angle').
+        """
+        values = {SOURCE: image}
+        timings = {}
+        for i, s in enumerate(self.stages):
+            # Never write into the caller's image or a buffer a later stage still reads
+            # (skipped stages pass their input through, so compare buffers, not names)
+            first = values[s.inputs[0]]
+            must_copy = first is image or any(values.get(name) is first for name in self._read_later[i])
+            start = time.perf_counter()
+            with span(s.name):
+                values[s.name] = self._call(s, values, settings, must_copy)
+            timings[s.name] = time.perf_counter() - start
+        if outputs is not None:
+            outputs.update((name, values[name]) for name in outputs)
+        return values[self.stages[-1].name], timings
+        
+    def run_memoized(self, image, settings, cache, source_signature, outputs=None):
+        """Run the pipeline reusing unchanged intermediates from ``cache``
+        
+        ``source_signature`` identifies the input image (e.g. its content
+        fingerprint). Only stages whose signature changed are recomputed and
+        timed. The returned image is shared with the cache and must not be
+        modified by the caller. ``outputs`` is filled in as by run().
+        """
+        with cache.lock:
+            values = {SOURCE: image}
+            signatures = {SOURCE: source_signature}
+            timings = {}
+            for s in self.stages:
+                signature = (
+                    tuple(settings[key] for key in s.params),
+                    tuple(signatures[name] for name in s.inputs),
+                )
+                signatures[s.name] = signature
+                
+                entry = cache.entries.get(s.name)
+                if entry is not None and entry[0] == signature:
+                    values[s.name] = entry[1]
+                    continue
+                
+                # Cached inputs must survive for the next run, so in-place stages get a copy
+                start = time.perf_counter()
+                with span(s.name):
+                    values[s.name] = self._call(s, values, settings, must_copy=True)
+                timings[s.name] = time.perf_counter() - start
+                cache.entries[s.name] = (signature, values[s.name])
+            
+            if outputs is not None:
+                outputs.update((name, values[name]) for name in outputs)
+            return values[self.stages[-1].name], timings
+
+
+class StageCacheRegistry:
+    """Per-tab StageCaches sharing one memory budget
+    
+    When the total exceeds ``max_bytes`` the intermediates of the least
+    recently active tabs are dropped first; the active tab keeps its own.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._caches = OrderedDict()  # owner -> StageCache, least recently active first
+        self._active = None
+        self._lock = threading.Lock()
+        
+    def get(self, owner):
+        """Return the StageCache for ``owner``, creating it if needed"""
+        with self._lock:
+            cache = self._caches.get(owner)
+            if cache is None:
+                cache = self._caches[owner] = StageCache()
+            return cache
+        
+    def set_active(self, owner):
+        """Mark ``owner`` as the visible tab and trim the others to the budget"""
+        with self._lock:
+            self._active = owner
+            if owner in self._caches:
+                self._caches.move_to_end(owner)
+        self.trim()
+        
+    def discard(self, owner):
+        """Forget the intermediates of a closed tab"""
+        with self._lock:
+            self._caches.pop(owner, None)
+        
+    def nbytes(self):
+        """Total memory held by all intermediates"""
+        with self._lock:
+            caches = list(self._caches.values())
+        return sum(cache.nbytes for cache in caches)
+        
+    def trim(self):
+        """Evict intermediates of inactive tabs, oldest first, until under budget"""
+        with self._lock:
+            candidates = [(owner, cache) for owner, cache in self._caches.items() if owner != self._active]
+        
+        total = self.nbytes()
+        for owner, cache in candidates:
+            if total <= self.max_bytes:
+                break
+            # Tabs still preprocessing keep their buffers until the next trim
+            if cache.lock.acquire(blocking=False):
+                try:
+                    total -= cache.nbytes
+                    cache.clear()
+                finally:
+                    cache.lock.release()
+
+
+DEFAULT_STAGES = (
+    stage('grayscale', to_grayscale, [SOURCE]),
+    stage('text_scale', text_scale, ['grayscale'], params=['normalize', 'target_x_height']),
+    stage('normalize', normalize_resolution, ['grayscale', 'text_scale'], params=['normalize'],
+          skip=lambda settings: not settings['normalize']),
+    stage('skew_angle', skew_angle, ['normalize'], params=['deskew']),
+    stage('deskew', deskew, ['normalize', 'skew_angle'], params=['deskew'],
+          skip=lambda settings: not settings['deskew']),
+    stage('contrast_brightness', adjust_contrast_brightness, ['deskew'],
+          params=['contrast', 'brightness'], in_place=True,
+          skip=lambda settings: settings['contrast'] == 1.0 and settings['brightness'] == 1.0),
+    stage('sharpen', sharpen, ['contrast_brightness'], params=['sharpness'], in_place=True,
+          skip=lambda settings: settings['sharpness'] == 1.0),
+    stage('denoise', denoise, ['sharpen'], params=['denoise_sigma'], in_place=True,
+          skip=lambda settings: settings['denoise_sigma'] <= 0),
+)
+
+default_pipeline = PreprocessPipeline(DEFAULT_STAGES)
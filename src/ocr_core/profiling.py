@@ -0,0 +1,237 @@
+"""Lightweight spans timing each pipeline stage, with optional cProfile and tracemalloc capture
+
+Code marks a stage with ``with span('name'):``. The span is timed with
+time.perf_counter_ns and recorded into the Profile active on the current
+thread; with no active profile (the batch CLI, the benchmarks) it costs a
+thread-local lookup. Work handed to another thread keeps recording into
+the same profile when its callable is wrapped with ``bind()``.
+
+``capture()`` runs one job under a profile and can also run it under
+cProfile (the job's own thread only) and tracemalloc (every thread, so the
+peak includes jobs running at the same time).
+
+A Profile exports as JSON or in the Chrome trace event format, which
+chrome://tracing and https://ui.perfetto.dev open directly.
+"""
+import io
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+
+# Spans, and jobs' cProfile/tracemalloc reports, kept per profile; older ones are dropped first
+MAX_SPANS = 5000
+MAX_CAPTURES = 20
+
+# Functions listed in a cProfile report, and allocation sites in a tracemalloc one
+CPROFILE_TOP = 40
+TRACEMALLOC_TOP = 15
+
+# job: ID of the OCR job the span belongs to, or None for GUI work such as loading and drawing
+Span = namedtuple('Span', ['name', 'start_ns', 'duration_ns', 'thread', 'depth', 'job'])
+
+_local = threading.local()
+
+# cProfile can only run one profiler at a time in a process
+_cprofile_lock = threading.Lock()
+
+# Jobs using tracemalloc; it is stopped when the last one finishes
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+
+
+class Profile:
+    """Spans recorded for one tab (or any other unit of work), safe to record into from any thread"""
+    
+    def __init__(self, max_spans=MAX_SPANS):
+        self.origin_ns = time.perf_counter_ns()
+        self.captures = OrderedDict()  # job -> {'cprofile': report text, 'memory': {...}}
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        
+    def record(self, span):
+        """Add a finished span"""
+        with self._lock:
+            self._spans.append(span)
+        
+    def add_capture(self, job, report):
+        """Keep a job's cProfile/tracemalloc report"""
+        with self._lock:
+            self.captures[job] = report
+            while len(self.captures) > MAX_CAPTURES:
+                self.captures.popitem(last=False)
+        
+    def spans(self, job=Ellipsis):
+        """Return the recorded spans in start order, only those of ``job`` if given"""
+        with self._lock:
+            spans = list(self._spans)
+        if job is not Ellipsis:
+            spans = [span for span in spans if span.job == job]
+        return sorted(spans, key=lambda span: (span.start_ns, -span.duration_ns))
+        
+    def to_json(self):
+        """Return the spans and captures as a JSON-serialisable dict, times in ns from the profile's start"""
+        return {
+            'spans': [dict(span._asdict(), start_ns=span.start_ns - self.origin_ns) for span in self.spans()],
+            'captures': {str(job): report for job, report in list(self.captures.items())},
+        }
+        
+    def to_chrome_trace(self):
+        """Return the spans as a Chrome trace event file (a JSON-serialisable dict)"""
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for span in self.spans():
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append({
+                'name': span.name,
+                'cat': 'gui' if span.job is None else 'job',
+                'ph': 'X',
+                'ts': (span.start_ns - self.origin_ns) / 1000,
+                'dur': span.duration_ns / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {} if span.job is None else {'job': span.job},
+            })
+        
+        # Name the rows after the threads
+        for name, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def current_profile():
+    """Return the Profile active on this thread, or None"""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def activate(profile, job=None, depth=0):
+    """Record spans on this thread into ``profile`` (None to record nothing) while the block runs"""
+    previous = (getattr(_local, 'profile', None), getattr(_local, 'job', None), getattr(_local, 'depth', 0))
+    _local.profile, _local.job, _local.depth = profile, job, depth
+    try:
+        yield profile
+    finally:
+        _local.profile, _local.job, _local.depth = previous
+
+
+def _thread_name():
+    """Return a readable name for this thread; threads Python did not start (e.g. Qt's) are all 'Dummy-N'"""
+    thread = threading.current_thread()
+    if thread.name.startswith('Dummy-'):
+        return f"worker {threading.get_native_id()}"
+    return thread.name
+
+
+@contextmanager
+def span(name):
+    """Time the block as a stage called ``name`` in the active profile, if any"""
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        yield
+        return
+    
+    depth = _local.depth
+    _local.depth = depth + 1
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter_ns() - start
+        _local.depth = depth
+        profile.record(Span(name, start, duration, _thread_name(), depth, _local.job))
+
+
+def bind(function):
+    """Wrap ``function`` so it records into this thread's active profile wherever it runs"""
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return function
+    job, depth = _local.job, _local.depth
+    
+    def bound(*args, **kwargs):
+        with activate(profile, job, depth):
+            return function(*args, **kwargs)
+    return bound
+
+
+def _cprofile_report(profiler):
+    """Return the top functions of a cProfile run by cumulative time"""
+    import pstats
+    
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(CPROFILE_TOP)
+    return stream.getvalue()
+
+
+def _start_tracemalloc():
+    """Start tracing allocations (if no other job already has) and return the bytes traced so far"""
+    global _tracemalloc_users
+    import tracemalloc
+    
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+
+def _stop_tracemalloc(baseline):
+    """Summarise allocations since ``baseline`` and stop tracing if no other job still uses it"""
+    global _tracemalloc_users
+    import tracemalloc
+    
+    with _tracemalloc_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:TRACEMALLOC_TOP]
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+    return {
+        'peak_bytes': max(0, peak - baseline),
+        'retained_bytes': current - baseline,
+        'top': [{'where': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'bytes': stat.size, 'blocks': stat.count} for stat in top],
+    }
+
+
+@contextmanager
+def capture(profile, job=None, cprofile=False, memory=False):
+    """Run a job's block with ``profile`` active, as a 'job' span, optionally under cProfile and tracemalloc
+    
+    Reports end up in ``profile.captures[job]``. Only one job at a time can
+    be under cProfile; others note that they were skipped.
+    """
+    report = {}
+    profiler = None
+    if cprofile:
+        if _cprofile_lock.acquire(blocking=False):
+            import cProfile
+            
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another profiler (e.g. a debugger's) is already active
+                _cprofile_lock.release()
+                profiler = None
+                report['cprofile'] = f"Not profiled: {e}"
+        else:
+            report['cprofile'] = "Not profiled: another job was being profiled at the same time"
+    
+    baseline = _start_tracemalloc() if memory else None
+    try:
+        with activate(profile, job), span('job'):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+            report['cprofile'] = _cprofile_report(profiler)
+        if memory:
+            report['memory'] = _stop_tracemalloc(baseline)
+        if report:
+            profile.add_capture(job, report)
@@ -0,0 +1,81 @@
+"""Region-of-interest OCR
+
+Each selected rectangle is recognised on its own, in parallel, with its own
+PSM mode. Regions are zero-copy NumPy slices of the tab's image, and since
+the result cache is keyed by image content and settings, a region that did
+not change is answered from the cache when another one is edited.
+"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .profiling import bind
+from .strategy import CANCEL_POLL_INTERVAL
+
+# Rectangle in image pixels; psm None means "use the tab's PSM mode"
+Region = namedtuple('Region', ['x', 'y', 'width', 'height', 'psm'], defaults=(None,))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_region_executor():
+    """Return the shared thread pool that recognises regions
+    
+    It is separate from the PSM candidate and band pools because each
+    region waits on work it submits there.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                           thread_name_prefix='ocr-region')
+        return _executor
+
+
+def clip_region(region, shape):
+    """Clip a region to an image of the given shape, or return None if nothing is left"""
+    height, width = shape[:2]
+    left, top = max(0, region.x), max(0, region.y)
+    right, bottom = min(width, region.x + region.width), min(height, region.y + region.height)
+    if right <= left or bottom <= top:
+        return None
+    return region._replace(x=left, y=top, width=right - left, height=bottom - top)
+
+
+def region_view(image, region):
+    """Return the part of ``image`` under ``region`` as a view (no pixels are copied)"""
+    return image[region.y:region.y + region.height, region.x:region.x + region.width]
+
+
+def reading_order(regions):
+    """Sort regions top to bottom, then left to right"""
+    return sorted(regions, key=lambda region: (region.y, region.x))
+
+
+def ocr_regions(ocr_function, image, regions, is_cancelled=lambda: False, executor=None):
+    """Recognise every region of ``image`` in parallel and return [(region, result)] in reading order
+    
+    ``ocr_function(view, region)`` recognises one region's view and returns
+    a result, or None if it was cancelled. Returns None if
+    ``is_cancelled()`` becomes true first.
+    """
+    executor = executor or get_region_executor()
+    regions = [clipped for clipped in (clip_region(region, image.shape) for region in reading_order(regions))
+               if clipped is not None]
+    
+    futures = [executor.submit(bind(ocr_function), region_view(image, region), region) for region in regions]
+    try:
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if is_cancelled():
+                return None
+        results = [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+    if any(result is None for result in results):
+        return None
+    return list(zip(regions, results))
@@ -0,0 +1,111 @@
+"""Text size estimation and resolution normalization
+
+Tesseract reads best when lowercase letters are a couple of dozen pixels
+tall. Phone photos are often several times larger than that, which only
+costs time, and screenshots can be so small that letters get misread. The
+dominant x-height is estimated from the heights of connected components
+(most lowercase letters are exactly x-height tall, so the median lands on
+it) on a downscaled copy, and the image is resized once to the target.
+"""
+import threading
+from collections import OrderedDict
+
+# x-height in pixels the image is resized to (about 10 pt text at 300 DPI)
+TARGET_X_HEIGHT = 20
+
+# Text already within this x-height range is left at its size
+ACCEPTED_X_HEIGHTS = (16, 32)
+
+# Bounds of the applied scale factor
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+
+# Longest side of the copy used for estimation
+ESTIMATE_MAX_SIDE = 1600
+
+# Below this median height on the downscaled copy letters are too merged to measure
+MIN_MEASURABLE_HEIGHT = 6
+
+# Fewer letter-like components than this and the image is left alone
+MIN_COMPONENTS = 20
+
+# Estimated x-heights by content hash of the downscaled image
+_height_cache = OrderedDict()
+_height_cache_lock = threading.Lock()
+HEIGHT_CACHE_SIZE = 256
+
+
+def _median_component_height(gray):
+    """Median height of letter-sized connected components, or None if there are too few"""
+    import cv2
+    import numpy as np
+    
+    # Text becomes foreground (non-zero) whether it is dark on light or light on dark
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size / 2:
+        cv2.bitwise_not(binary, dst=binary)
+    
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    
+    # Drop specks, rules, pictures and other shapes that are not letters
+    letters = ((heights >= 2) & (areas >= 4)
+               & (heights < gray.shape[0] / 4)
+               & (widths < heights * 4) & (heights < widths * 6))
+    if np.count_nonzero(letters) < MIN_COMPONENTS:
+        return None
+    return float(np.median(heights[letters]))
+
+
+def estimate_x_height(gray):
+    """Estimate the dominant x-height of a grayscale image in pixels, or None if it has no text
+    
+    Results are cached by the content of the downscaled copy.
+    """
+    import cv2
+    import numpy as np
+    
+    from .cache import hash_bytes
+    
+    height, width = gray.shape[:2]
+    scale = min(1.0, ESTIMATE_MAX_SIDE / max(height, width))
+    small = gray if scale == 1.0 else cv2.resize(gray, (int(width * scale), int(height * scale)),
+                                                 interpolation=cv2.INTER_AREA)
+    
+    key = hash_bytes(f"{small.shape}|{gray.shape}".encode('ascii'), np.ascontiguousarray(small).data)
+    with _height_cache_lock:
+        if key in _height_cache:
+            _height_cache.move_to_end(key)
+            return _height_cache[key]
+    
+    median = _median_component_height(small)
+    if median is not None and median < MIN_MEASURABLE_HEIGHT and scale < 1.0:
+        # Small text on a large page: measure at full resolution instead
+        median, scale = _median_component_height(gray), 1.0
+    x_height = None if median is None else median / scale
+    
+    with _height_cache_lock:
+        _height_cache[key] = x_height
+        while len(_height_cache) > HEIGHT_CACHE_SIZE:
+            _height_cache.popitem(last=False)
+    return x_height
+
+
+def normalization_scale(x_height, target=TARGET_X_HEIGHT):
+    """Return the resize factor that brings ``x_height`` to ``target`` (1.0 if not worth it)"""
+    if not x_height or ACCEPTED_X_HEIGHTS[0] <= x_height <= ACCEPTED_X_HEIGHTS[1]:
+        return 1.0
+    
+    return round(min(MAX_SCALE, max(MIN_SCALE, target / x_height)), 3)
+
+
+def resize_image(image, scale):
+    """Resize an image by ``scale`` with an interpolation suited to the direction"""
+    import cv2
+    
+    height, width = image.shape[:2]
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(image, size, interpolation=interpolation)
@@ -0,0 +1,150 @@
+"""Confidence-driven page segmentation mode selection
+
+Instead of trying PSM modes one after another and accepting the first
+result that is at least a few characters long, the candidate modes are
+recognised in parallel and each result is scored by its Tesseract word
+confidences. As soon as a candidate clears the confidence threshold the
+remaining ones are stopped; otherwise the best-scoring text wins.
+"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .engines import WORD_LEVEL, RecognitionStopped
+from .layout import page_from_data
+from .profiling import bind, span
+
+# Modes tried after the user's selection, most specific first
+FALLBACK_PSM_MODES = (6, 4, 3)
+
+# Modes that never produce text (orientation detection / layout only)
+NON_TEXT_PSM_MODES = (0, 2)
+
+# Mean word confidence (0-100) at which a candidate is accepted immediately
+CONFIDENCE_THRESHOLD = 80.0
+
+# Results shorter than this are penalised, like the old cascade rejected them
+MIN_TEXT_LENGTH = 5
+
+# How often waiting threads check for cancellation, in seconds
+CANCEL_POLL_INTERVAL = 0.1
+
+# Candidates of one selection recognised at once by engines that cannot stop a
+# running recognition, so abandoned ones hold at most this many pool threads
+UNSTOPPABLE_CANDIDATES = 2
+
+# page: the layout.Page the text is derived from
+PSMResult = namedtuple('PSMResult', ['psm', 'text', 'score', 'data', 'cached', 'timings', 'page'],
+                       defaults=(False, None, None))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared thread pool used to recognise candidate modes"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                           thread_name_prefix='psm-candidate')
+        return _executor
+
+
+def candidate_modes(selected_psm, fallbacks=FALLBACK_PSM_MODES):
+    """Return the PSM modes to try, the selected one first and without duplicates"""
+    modes = []
+    for psm in (selected_psm,) + tuple(fallbacks):
+        if psm not in modes and psm not in NON_TEXT_PSM_MODES:
+            modes.append(psm)
+    return modes
+
+
+def score_data(data):
+    """Score a recognition result by its character-weighted mean word confidence"""
+    total_chars = 0
+    weighted_conf = 0.0
+    for level, conf, text in zip(data['level'], data['conf'], data['text']):
+        word = text.strip()
+        if level != WORD_LEVEL or not word or conf < 0:
+            continue
+        total_chars += len(word)
+        weighted_conf += conf * len(word)
+    
+    if not total_chars:
+        return 0.0
+    
+    score = weighted_conf / total_chars
+    if total_chars < MIN_TEXT_LENGTH:
+        score *= total_chars / MIN_TEXT_LENGTH
+    return score
+
+
+def recognize_candidate(engine, image, psm, oem, should_stop=None):
+    """Recognise an image with one PSM mode and score the result
+    
+    Raises RecognitionStopped if ``should_stop()`` becomes true first.
+    """
+    with span(f"tesseract psm {psm}"):
+        data = engine.image_to_data(image, psm=psm, oem=oem, should_stop=should_stop)
+    page = page_from_data(data, image.shape[1], image.shape[0])
+    return PSMResult(psm, page.text, score_data(data), data, page=page)
+
+
+def select_best_psm(engine, image, selected_psm, oem=3, threshold=CONFIDENCE_THRESHOLD,
+                    fallbacks=FALLBACK_PSM_MODES, is_cancelled=lambda: False, executor=None):
+    """Recognise the candidate PSM modes in parallel and return the best PSMResult
+    
+    Returns early with the first candidate whose score reaches ``threshold``.
+    Candidates that have not started yet are cancelled, and ones already
+    running are stopped if the engine ``can_stop``; otherwise they finish in
+    the background, which is why such engines only get
+    UNSTOPPABLE_CANDIDATES at a time. Returns None if ``is_cancelled()``
+    becomes true before a result is chosen.
+    """
+    executor = executor or get_executor()
+    modes = candidate_modes(selected_psm, fallbacks)
+    
+    # Running candidates stop once a result is chosen or the job is cancelled
+    stopped = threading.Event()
+    
+    def should_stop():
+        return stopped.is_set() or is_cancelled()
+    
+    limit = len(modes) if engine.can_stop else UNSTOPPABLE_CANDIDATES
+    queued = list(modes)
+    pending = set()
+    
+    def submit_next():
+        while queued and len(pending) < limit:
+            pending.add(executor.submit(bind(recognize_candidate), engine, image, queued.pop(0), oem, should_stop))
+    
+    best = None
+    submit_next()
+    try:
+        while pending:
+            done, pending_left = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            pending.intersection_update(pending_left)
+            if is_cancelled():
+                return None
+            
+            for future in done:
+                try:
+                    result = future.result()
+                except RecognitionStopped:
+                    # Only stopped here because the job was cancelled
+                    return None
+                # Ties go to the mode listed first, i.e. the user's selection
+                if (best is None or result.score > best.score
+                        or (result.score == best.score and modes.index(result.psm) < modes.index(best.psm))):
+                    best = result
+            
+            if best is not None and best.score >= threshold:
+                return best
+            submit_next()
+        return best
+    finally:
+        stopped.set()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,60 @@
+"""Locate the Tesseract executable
+
+Discovery runs the first time an engine is requested rather than at import
+time, so importing the application or spawning a worker stays cheap.
+"""
+import os
+import shutil
+import threading
+
+# Install locations checked before falling back to the PATH
+COMMON_TESSERACT_PATHS = [
+    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+    r'C:\Tesseract-OCR\tesseract.exe'
+]
+
+_tesseract_cmd = None
+_lock = threading.Lock()
+
+
+def find_tesseract_cmd():
+    """Return the path of the tesseract executable, or None if it cannot be found"""
+    # An explicit override wins
+    env_cmd = os.environ.get('TESSERACT_CMD')
+    if env_cmd and os.path.exists(env_cmd):
+        return env_cmd
+    
+    # Look for Tesseract in common locations
+    for path in COMMON_TESSERACT_PATHS:
+        if os.path.exists(path):
+            return path
+    
+    return shutil.which('tesseract')
+
+
+def configure_tesseract(tesseract_cmd=None):
+    """Point pytesseract at the tesseract executable and return its path
+    
+    Without an explicit ``tesseract_cmd`` the executable is discovered once
+    per process and the result is reused on later calls.
+    """
+    global _tesseract_cmd
+    
+    with _lock:
+        if tesseract_cmd is None and _tesseract_cmd is not None:
+            return _tesseract_cmd
+        
+        cmd = tesseract_cmd or find_tesseract_cmd()
+        if cmd is None:
+            print("Warning: Tesseract OCR not found. Please install it and set the correct path.")
+            cmd = 'tesseract'
+        
+        try:
+            import pytesseract
+            pytesseract.pytesseract.tesseract_cmd = cmd
+        except ImportError:
+            pass
+        
+        _tesseract_cmd = cmd
+        return cmd
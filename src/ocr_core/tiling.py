@@ -0,0 +1,152 @@
+"""Striped OCR for very tall images
+
+Tesseract recognises one page on one core, so a 10k-pixel screenshot or a
+stitched scan is slow however many cores are idle. Tall images are cut into
+horizontal bands, preferably through whitespace found with a row projection
+profile, and the bands are recognised in parallel.
+
+A band whose cut had to go through text overlaps its neighbour so every
+line is complete in at least one band. Each band owns the rows between its
+cuts; a recognised word or line is kept only from the band that owns its
+vertical centre, which drops the duplicates the overlaps produce. The
+merged word data is renumbered so blocks stay in reading order.
+"""
+import os
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .engines import TSV_COLUMNS
+from .layout import page_from_data
+from .profiling import bind
+from .strategy import CANCEL_POLL_INTERVAL, PSMResult, score_data, select_best_psm
+
+# Images taller than this are recognised in bands
+TILE_MIN_HEIGHT = 3000
+
+# Preferred band height; cuts are searched in the lower half of each band
+BAND_HEIGHT = 1500
+
+# Rows added on both sides of a cut that had to go through text
+BAND_OVERLAP = 80
+
+# A row with at most this fraction of ink pixels counts as whitespace
+BLANK_ROW_INK = 0.002
+
+# rows: the slice recognised; core: the rows whose text this band keeps
+Band = namedtuple('Band', ['top', 'bottom', 'core_top', 'core_bottom'])
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_band_executor():
+    """Return the shared thread pool that recognises bands
+    
+    It is separate from the PSM candidate pool because each band waits on
+    its own candidates there.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                           thread_name_prefix='ocr-band')
+        return _executor
+
+
+def blank_rows(gray):
+    """Return a boolean array marking the rows of a grayscale image that contain no text"""
+    import cv2
+    
+    # Ink becomes non-zero whether the text is dark on light or light on dark
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size / 2:
+        binary = 1 - binary
+    
+    ink = cv2.reduce(binary, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    return ink <= max(1, int(gray.shape[1] * BLANK_ROW_INK))
+
+
+def find_bands(gray, band_height=BAND_HEIGHT, overlap=BAND_OVERLAP):
+    """Split a grayscale image into Bands cut along whitespace where possible"""
+    import numpy as np
+    
+    height = gray.shape[0]
+    blank = blank_rows(gray)
+    
+    cuts = [(0, False)]  # (row, went through text)
+    core_top = 0
+    while height - core_top > band_height * 1.25:
+        # Cut in the middle of the longest whitespace run in the lower half of the band
+        low, high = core_top + band_height // 2, core_top + band_height
+        rows = np.flatnonzero(blank[low:high]) + low
+        if rows.size:
+            runs = np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1)
+            longest = max(runs, key=len)
+            cuts.append((int(longest[len(longest) // 2]), False))
+        else:
+            cuts.append((high, True))
+        core_top = cuts[-1][0]
+    cuts.append((height, False))
+    
+    bands = []
+    for (core_top, top_forced), (core_bottom, bottom_forced) in zip(cuts, cuts[1:]):
+        top = max(0, core_top - overlap) if top_forced else core_top
+        bottom = min(height, core_bottom + overlap) if bottom_forced else core_bottom
+        bands.append(Band(top, bottom, core_top, core_bottom))
+    return bands
+
+
+def merge_band_data(bands, datas):
+    """Merge per-band word data into one dict in page coordinates, keeping each row once"""
+    merged = {column: [] for column in TSV_COLUMNS}
+    block_offset = 0
+    for band, data in zip(bands, datas):
+        max_block = 0
+        for i in range(len(data['level'])):
+            centre = band.top + data['top'][i] + data['height'][i] / 2
+            if not band.core_top <= centre < band.core_bottom:
+                continue
+            
+            for column in TSV_COLUMNS:
+                merged[column].append(data[column][i])
+            merged['top'][-1] += band.top
+            merged['page_num'][-1] = 1
+            merged['block_num'][-1] += block_offset
+            max_block = max(max_block, data['block_num'][i])
+        block_offset += max_block
+    return merged
+
+
+def ocr_tiled(engine, gray, selected_psm, oem=3, bands=None, is_cancelled=lambda: False,
+              executor=None, band_executor=None):
+    """Recognise a tall grayscale image band by band and return a merged PSMResult
+    
+    Each band gets its own PSM selection (see select_best_psm, which runs on
+    ``executor``); the merged result reports the mode most bands used.
+    Returns None if ``is_cancelled()`` becomes true first.
+    """
+    bands = bands or find_bands(gray)
+    band_executor = band_executor or get_band_executor()
+    
+    # Bands are row slices of the page, so no pixels are copied
+    futures = [band_executor.submit(bind(select_best_psm), engine, gray[band.top:band.bottom], selected_psm,
+                                    oem=oem, is_cancelled=is_cancelled, executor=executor)
+               for band in bands]
+    try:
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if is_cancelled():
+                return None
+        results = [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+    if any(result is None for result in results):
+        return None
+    
+    data = merge_band_data(bands, [result.data for result in results])
+    psm = Counter(result.psm for result in results).most_common(1)[0][0]
+    page = page_from_data(data, gray.shape[1], gray.shape[0])
+    return PSMResult(psm, page.text, score_data(data), data, page=page)
@@ -0,0 +1,147 @@
+"""Continuous OCR of a changing screen region
+
+Every captured frame first goes through a cheap change test: a 4x
+downscaled grayscale copy is compared with the previous one, and
+unchanged frames cost nothing more. A changed frame is split into text
+blocks along blank rows, and each block is looked up by a hash of its
+pixels, so only blocks that are new (changed, or scrolled into view) are
+OCR'd. The recognised lines are diffed against the previous frame's to
+produce timestamped deltas.
+"""
+import time
+from collections import OrderedDict, namedtuple
+from difflib import SequenceMatcher
+
+from .cache import image_fingerprint
+from .tiling import blank_rows
+
+# Downscale factor of the copy used for change detection
+DIFF_SCALE = 4
+
+# Gray-level difference (0-255) a downscaled pixel must exceed to count as a change
+DIFF_THRESHOLD = 24
+
+# Rows of margin kept around each text block
+BLOCK_PADDING = 2
+
+# Recognised blocks remembered by content hash
+BLOCK_MEMO_SIZE = 1024
+
+# timestamp: seconds since the epoch; added/removed: lines; lines: the full text now;
+# recognised: blocks OCR'd for this frame, out of ``blocks``
+WatchDelta = namedtuple('WatchDelta', ['timestamp', 'added', 'removed', 'lines', 'recognised', 'blocks'])
+
+
+def text_blocks(gray):
+    """Split a grayscale frame into (top, bottom) row ranges holding text
+    
+    Text lines closer together than a typical line height are kept in one
+    block, so a paragraph is recognised as a unit.
+    """
+    import numpy as np
+    
+    ink = ~blank_rows(gray)
+    rows = np.flatnonzero(ink)
+    if not rows.size:
+        return []
+    
+    # Runs of consecutive non-blank rows are text lines
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    line_height = float(np.median(ends - starts))
+    
+    blocks = [[int(starts[0]), int(ends[0])]]
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - blocks[-1][1] < line_height:
+            blocks[-1][1] = int(end)
+        else:
+            blocks.append([int(start), int(end)])
+    
+    height = gray.shape[0]
+    return [(max(0, top - BLOCK_PADDING), min(height, bottom + BLOCK_PADDING)) for top, bottom in blocks]
+
+
+def diff_lines(old, new):
+    """Return (added, removed) lines between two versions of a text"""
+    added, removed = [], []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag in ('replace', 'delete'):
+            removed.extend(old[i1:i2])
+        if tag in ('replace', 'insert'):
+            added.extend(new[j1:j2])
+    return added, removed
+
+
+def format_delta(delta):
+    """Render a WatchDelta as a timestamped block of '+'/'-' lines"""
+    stamp = time.strftime("%H:%M:%S", time.localtime(delta.timestamp))
+    lines = [f"[{stamp}]"]
+    lines += [f"- {line}" for line in delta.removed]
+    lines += [f"+ {line}" for line in delta.added]
+    return "\n".join(lines)
+
+
+class ScreenWatcher:
+    """Turn a stream of frames of one screen region into text deltas
+    
+    ``has_changed`` is cheap and meant to run for every frame; ``update``
+    does the OCR for a frame that changed. The two are not meant to run
+    concurrently: a frame is tested, then updated, before the next test.
+    """
+    
+    def __init__(self):
+        self._previous = None
+        self._blocks = OrderedDict()  # block fingerprint -> recognised text
+        self.lines = []
+        
+    def has_changed(self, frame):
+        """Return True if ``frame`` differs visibly from the last frame that changed"""
+        import cv2
+        
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape
+        small = cv2.resize(gray, (max(1, width // DIFF_SCALE), max(1, height // DIFF_SCALE)),
+                           interpolation=cv2.INTER_AREA)
+        
+        changed = (self._previous is None or self._previous.shape != small.shape
+                   or cv2.absdiff(small, self._previous).max() > DIFF_THRESHOLD)
+        if changed:
+            self._previous = small
+        return changed
+        
+    def reset(self):
+        """Forget the last frame, so the next one counts as changed"""
+        self._previous = None
+        
+    def update(self, frame, ocr_block, timestamp=None):
+        """Recognise a changed frame and return a WatchDelta against the previous text
+        
+        ``ocr_block(gray_view)`` returns the text of one block; it is only
+        called for blocks not seen recently.
+        """
+        import cv2
+        
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        blocks = text_blocks(gray)
+        
+        lines = []
+        recognised = 0
+        for top, bottom in blocks:
+            # Row slices of the frame, so nothing is copied before hashing
+            view = gray[top:bottom]
+            key = image_fingerprint(view)
+            text = self._blocks.get(key)
+            if text is None:
+                text = ocr_block(view)
+                recognised += 1
+                self._blocks[key] = text
+                while len(self._blocks) > BLOCK_MEMO_SIZE:
+                    self._blocks.popitem(last=False)
+            else:
+                self._blocks.move_to_end(key)
+            lines.extend(line for line in text.splitlines() if line.strip())
+        
+        added, removed = diff_lines(self.lines, lines)
+        self.lines = lines
+        return WatchDelta(timestamp or time.time(), added, removed, lines, recognised, len(blocks))
@@ -0,0 +1,105 @@
+import threading
+import traceback
+from contextlib import nullcontext
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+from ocr_core.profiling import capture
+
+
+class OCRCancelled(Exception):
+    """Raised by an OCR function when its job has been cancelled"""
+
+
+class OCRWorkerSignals(QObject):
+    """Signals emitted by an OCR job running on the thread pool"""
+    # tab_id, job_id, once a worker thread picks the job up
+    started = pyqtSignal(int, int)
+    # tab_id, job_id, result returned by the OCR function
+    finished = pyqtSignal(int, int, object)
+    # tab_id, job_id, page index, result for one page of a document
+    page_finished = pyqtSignal(int, int, int, object)
+    # tab_id, job_id, error message
+    error = pyqtSignal(int, int, str)
+    # tab_id, job_id
+    cancelled = pyqtSignal(int, int)
+
+
+class OCRJob(QRunnable):
+    """Run the OCR pipeline for a single tab on a QThreadPool worker
+    
+    The job only receives the tab's image and a snapshot of its settings,
+    never the widgets themselves, so it is safe to run off the GUI thread.
+    Results are delivered back to the GUI thread through queued signals.
+    
+    With a ``profile``, the job's stages are recorded into it as spans, and
+    ``cprofile``/``memory`` also run it under cProfile/tracemalloc.
+    """
+    
+    def __init__(self, tab_id, job_id, ocr_function, image, settings, profile=None, cprofile=False, memory=False):
+        super().__init__()
+        self.tab_id = tab_id
+        self.job_id = job_id
+        self.ocr_function = ocr_function
+        self.image = image
+        self.settings = settings
+        self.profile = profile
+        self.cprofile = cprofile
+        self.memory = memory
+        self.signals = OCRWorkerSignals()
+        self._cancel_event = threading.Event()
+        
+        # The owning window keeps a reference to the job until one of its
+        # signals arrives, so Qt must not delete it behind our back
+        self.setAutoDelete(False)
+        
+    def cancel(self):
+        """Ask the job to stop at the next cancellation point"""
+        self._cancel_event.set()
+        
+    def is_cancelled(self):
+        """Return True if cancel() has been called"""
+        return self._cancel_event.is_set()
+        
+    def execute(self):
+        """Call the OCR function and return its result"""
+        return self.ocr_function(self.image, self.settings, self.is_cancelled)
+        
+    @pyqtSlot()
+    def run(self):
+        """Execute the OCR function and report the result"""
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.tab_id, self.job_id)
+            return
+        
+        self.signals.started.emit(self.tab_id, self.job_id)
+        if self.profile is not None:
+            profiling = capture(self.profile, self.job_id, cprofile=self.cprofile, memory=self.memory)
+        else:
+            profiling = nullcontext()
+        try:
+            with profiling:
+                result = self.execute()
+        except OCRCancelled:
+            self.signals.cancelled.emit(self.tab_id, self.job_id)
+        except Exception as e:
+            traceback.print_exc()  # Print the full traceback for debugging
+            self.signals.error.emit(self.tab_id, self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.tab_id, self.job_id, result)
+
+
+class DocumentJob(OCRJob):
+    """Run the OCR pipeline over every page of a multi-page document
+    
+    ``image`` is the document path. The OCR function is called as
+    ``ocr_function(path, settings, is_cancelled, report_page)`` and calls
+    ``report_page(index, result)`` as each page completes, which is emitted
+    as ``page_finished``; ``finished`` then carries the page count.
+    """
+    
+    def report_page(self, page_index, result):
+        """Send one page's result to the GUI thread"""
+        self.signals.page_finished.emit(self.tab_id, self.job_id, page_index, result)
+        
+    def execute(self):
+        """Call the OCR function with a per-page callback and return the page count"""
+        return self.ocr_function(self.image, self.settings, self.is_cancelled, self.report_page)
@@ -0,0 +1,210 @@
+import json
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QFileDialog, QHBoxLayout, QLabel, QMessageBox, QPlainTextEdit,
+                             QPushButton, QToolButton, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget)
+
+# GUI spans shown next to the job's, most recent of each
+GUI_STAGES = ('load', 'display')
+
+
+def span_tree(spans):
+    """Nest spans (in start order) under the span that contains them, and return the roots
+    
+    Each node is (span, children). A span belongs under the latest span one
+    level shallower that started before it and ended after it, whichever
+    thread that ran on, so work handed to executor threads appears under
+    the stage that handed it off.
+    """
+    roots = []
+    nodes = []
+    for span in spans:
+        node = (span, [])
+        end = span.start_ns + span.duration_ns
+        parent = next((candidate for candidate in reversed(nodes)
+                       if candidate[0].depth == span.depth - 1
+                       and candidate[0].start_ns <= span.start_ns
+                       and candidate[0].start_ns + candidate[0].duration_ns >= end), None)
+        (parent[1] if parent is not None else roots).append(node)
+        nodes.append(node)
+    return roots
+
+
+class PerformancePanel(QWidget):
+    """Collapsible "Performance" section of a tab showing where the last OCR job spent its time
+    
+    Lists the spans of the tab's latest job as a tree of stages, next to the
+    latest image load and preview drawing, and exports the tab's whole
+    profile as JSON or as a Chrome trace. The checkboxes run later jobs
+    under cProfile and tracemalloc; their reports open from "Report".
+    The tree is only rebuilt while the panel is expanded.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profile = None
+        self.job = None
+        self._stale = False
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        # Header with the toggle and a one-line summary
+        header = QHBoxLayout()
+        self.toggle = QToolButton()
+        self.toggle.setText("Performance")
+        self.toggle.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.toggle.setArrowType(Qt.RightArrow)
+        self.toggle.setCheckable(True)
+        self.toggle.setStyleSheet("QToolButton { border: none; }")
+        self.toggle.toggled.connect(self.set_expanded)
+        self.summary_label = QLabel("")
+        header.addWidget(self.toggle)
+        header.addWidget(self.summary_label, 1)
+        layout.addLayout(header)
+        
+        # Body, hidden until expanded
+        self.body = QWidget()
+        body_layout = QVBoxLayout(self.body)
+        body_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Stage", "ms", "Thread"])
+        self.tree.setColumnWidth(0, 220)
+        self.tree.setColumnWidth(1, 70)
+        self.tree.setMinimumHeight(140)
+        body_layout.addWidget(self.tree)
+        
+        # Capture options and exports
+        buttons = QHBoxLayout()
+        self.cprofile_check = QCheckBox("cProfile")
+        self.cprofile_check.setToolTip("Run the next OCR jobs under cProfile (slows them down)")
+        self.memory_check = QCheckBox("tracemalloc")
+        self.memory_check.setToolTip("Trace memory allocations of the next OCR jobs (slows them down)")
+        self.report_btn = QPushButton("Report")
+        self.report_btn.setToolTip("Show the cProfile and tracemalloc report of the last job")
+        self.report_btn.setEnabled(False)
+        self.report_btn.clicked.connect(self.show_report)
+        json_btn = QPushButton("Export JSON")
+        json_btn.clicked.connect(lambda: self.export('json'))
+        trace_btn = QPushButton("Export Chrome Trace")
+        trace_btn.setToolTip("Open in chrome://tracing or ui.perfetto.dev")
+        trace_btn.clicked.connect(lambda: self.export('trace'))
+        buttons.addWidget(self.cprofile_check)
+        buttons.addWidget(self.memory_check)
+        buttons.addStretch()
+        buttons.addWidget(self.report_btn)
+        buttons.addWidget(json_btn)
+        buttons.addWidget(trace_btn)
+        body_layout.addLayout(buttons)
+        
+        self.body.setVisible(False)
+        layout.addWidget(self.body)
+        
+    @property
+    def cprofile_enabled(self):
+        return self.cprofile_check.isChecked()
+        
+    @property
+    def memory_enabled(self):
+        return self.memory_check.isChecked()
+        
+    def set_expanded(self, expanded):
+        """Show or hide the body, catching up on anything recorded while it was hidden"""
+        self.toggle.setArrowType(Qt.DownArrow if expanded else Qt.RightArrow)
+        self.body.setVisible(expanded)
+        if expanded and self._stale:
+            self.refresh()
+        
+    def show_profile(self, profile, job):
+        """Show ``job``'s spans from ``profile``"""
+        self.profile = profile
+        self.job = job
+        if self.toggle.isChecked():
+            self.refresh()
+        else:
+            self._stale = True
+            self.update_summary(profile.spans(job) if profile is not None else [])
+        
+    def update_summary(self, job_spans):
+        """Show the job's total time in the header"""
+        total = sum(span.duration_ns for span in job_spans if span.name == 'job')
+        self.summary_label.setText(f"last job {total / 1e6:.1f} ms" if total else "")
+        
+    def refresh(self):
+        """Rebuild the tree from the profile"""
+        self._stale = False
+        self.tree.clear()
+        if self.profile is None:
+            self.update_summary([])
+            self.report_btn.setEnabled(False)
+            return
+        
+        # The job's stages, then the latest GUI work
+        job_spans = self.profile.spans(self.job) if self.job is not None else []
+        gui_spans = self.profile.spans(None)
+        latest = [next((span for span in reversed(gui_spans) if span.name == name and span.depth == 0), None)
+                  for name in GUI_STAGES]
+        self.add_nodes(self.tree.invisibleRootItem(), span_tree(job_spans))
+        self.add_nodes(self.tree.invisibleRootItem(), [(span, []) for span in latest if span is not None])
+        self.tree.expandAll()
+        
+        self.update_summary(job_spans)
+        self.report_btn.setEnabled(self.job in self.profile.captures)
+        
+    def add_nodes(self, parent, nodes):
+        """Add (span, children) nodes as tree items under ``parent``"""
+        for span, children in nodes:
+            item = QTreeWidgetItem([span.name, f"{span.duration_ns / 1e6:.2f}", span.thread])
+            item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+            parent.addChild(item)
+            self.add_nodes(item, children)
+        
+    def show_report(self):
+        """Show the last job's cProfile and tracemalloc report in a dialog"""
+        report = self.profile.captures.get(self.job) if self.profile is not None else None
+        if not report:
+            return
+        
+        text = ""
+        memory = report.get('memory')
+        if memory:
+            text += (f"Peak traced memory: {memory['peak_bytes'] / (1024 * 1024):.1f} MB, "
+                     f"retained {memory['retained_bytes'] / (1024 * 1024):.1f} MB\n\n")
+            text += "\n".join(f"{entry['bytes'] / 1024:>10.1f} KiB  {entry['blocks']:>7} blocks  {entry['where']}"
+                              for entry in memory['top']) + "\n\n"
+        if report.get('cprofile'):
+            text += report['cprofile']
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Profile of OCR job {self.job}")
+        dialog.resize(900, 600)
+        dialog_layout = QVBoxLayout(dialog)
+        view = QPlainTextEdit(text)
+        view.setReadOnly(True)
+        view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        view.setStyleSheet("font-family: monospace;")
+        dialog_layout.addWidget(view)
+        dialog.exec_()
+        
+    def export(self, kind):
+        """Save the tab's profile as JSON ('json') or as a Chrome trace ('trace')"""
+        if self.profile is None or not self.profile.spans():
+            QMessageBox.warning(self, "Warning", "Nothing has been profiled in this tab yet")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Profile",
+            "profile.json" if kind == 'json' else "trace.json",
+            "JSON Files (*.json)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            data = self.profile.to_json() if kind == 'json' else self.profile.to_chrome_trace()
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export profile: {str(e)}")
@@ -0,0 +1,86 @@
+from PyQt5 import sip
+from PyQt5.QtGui import QImage, QPixmap
+
+# Pyramid levels stop halving once the longer side is this small
+MIN_LEVEL_SIDE = 256
+
+
+def to_qimage(array):
+    """Wrap a BGR or grayscale uint8 array in a QImage without copying or swapping channels
+    
+    Row padding and strided views (such as crops) are passed through
+    bytesPerLine; only arrays whose pixels are not packed within a row are
+    copied. The QImage borrows the array's memory and holds a reference to
+    the array it wraps, including any converted copy made here.
+    """
+    import cv2
+    import numpy as np
+    
+    if array.ndim == 3 and array.shape[2] == 4:
+        array = cv2.cvtColor(array, cv2.COLOR_BGRA2BGR)
+    fmt = QImage.Format_Grayscale8 if array.ndim == 2 else QImage.Format_BGR888
+    
+    # Qt needs packed pixels within each row, but any row stride
+    pixel_bytes = 1 if array.ndim == 2 else 3
+    if array.strides[1] != pixel_bytes or (array.ndim == 3 and array.strides[2] != 1):
+        array = np.ascontiguousarray(array)
+    
+    height, width = array.shape[:2]
+    qimage = QImage(sip.voidptr(array.ctypes.data), width, height, array.strides[0], fmt)
+    
+    # A converted or packed copy would otherwise be freed as soon as this returns
+    qimage._array = array
+    return qimage
+
+
+def fit_size(width, height, max_width, max_height):
+    """Return the size of a width x height image scaled to fit the box, keeping its aspect ratio"""
+    scale = min(max_width / width, max_height / height)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+class PreviewPyramid:
+    """Successively halved copies of an image, for drawing previews at any size
+    
+    Levels are made with cv2.INTER_AREA only as small as they are first
+    needed, each from the one above it. A preview is drawn from the smallest
+    level that still covers the requested size, so redraws on resize never
+    read full-resolution pixels once the levels exist.
+    """
+    
+    def __init__(self, image):
+        self.image = image
+        self.levels = [image]
+        
+    def level_for(self, width, height):
+        """Return the smallest level at least width x height, building it if needed"""
+        import cv2
+        
+        while True:
+            level = self.levels[-1]
+            level_height, level_width = level.shape[:2]
+            half_width, half_height = level_width // 2, level_height // 2
+            if half_width < width or half_height < height or max(half_width, half_height) < MIN_LEVEL_SIDE:
+                break
+            self.levels.append(cv2.resize(level, (half_width, half_height), interpolation=cv2.INTER_AREA))
+        
+        # Earlier levels may already be small enough for a smaller request
+        for level in reversed(self.levels):
+            if level.shape[1] >= width and level.shape[0] >= height:
+                return level
+        return self.levels[0]
+        
+    def render(self, max_width, max_height):
+        """Return a QPixmap of the image scaled to fit max_width x max_height"""
+        import cv2
+        
+        height, width = self.image.shape[:2]
+        target_width, target_height = fit_size(width, height, max_width, max_height)
+        level = self.level_for(target_width, target_height)
+        
+        if level.shape[1] != target_width or level.shape[0] != target_height:
+            interpolation = cv2.INTER_AREA if level.shape[1] > target_width else cv2.INTER_LINEAR
+            level = cv2.resize(level, (target_width, target_height), interpolation=interpolation)
+        
+        # fromImage copies the pixels, so ``level`` may go once the pixmap exists
+        return QPixmap.fromImage(to_qimage(level))
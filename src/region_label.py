@@ -0,0 +1,153 @@
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPen
+from PyQt5.QtWidgets import QAction, QActionGroup, QLabel, QMenu, QRubberBand, QSizePolicy
+
+from ocr_core.regions import Region, reading_order
+
+# Drags smaller than this (in screen pixels) are treated as clicks
+MIN_DRAG_SIZE = 6
+
+
+class RegionSelectLabel(QLabel):
+    """Image preview on which rectangles to OCR can be drawn with the mouse
+    
+    Drag with the left button to add a region; right-click a region to set
+    its PSM mode or remove it. Regions are kept in image pixel coordinates
+    and the preview can be rescaled freely.
+    """
+    # list of Region, emitted whenever a region is added, edited or removed
+    regions_changed = pyqtSignal(list)
+    # Emitted after the label changes size, so the preview can be redrawn to fit
+    resized = pyqtSignal()
+    
+    def __init__(self, text="", psm_names=(), parent=None):
+        super().__init__(text, parent)
+        self.psm_names = list(psm_names)
+        self.regions = []
+        self.image_size = None  # (width, height) of the image behind the pixmap
+        self._rubber_band = QRubberBand(QRubberBand.Rectangle, self)
+        self._drag_origin = None
+        
+        # The preview is drawn to fit the label, so its size must not feed back into the layout
+        self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        
+    def set_image_size(self, width, height):
+        """Tell the label the size of the image its pixmap shows; clears regions if it changed"""
+        if self.image_size != (width, height):
+            self.image_size = (width, height)
+            if self.regions:
+                self.set_regions([])
+        
+    def set_regions(self, regions):
+        """Replace all regions and notify listeners"""
+        self.regions = list(regions)
+        self.update()
+        self.regions_changed.emit(list(self.regions))
+        
+    def _pixmap_rect(self):
+        """Return where the (centred) pixmap is drawn inside the label"""
+        pixmap = self.pixmap()
+        if pixmap is None or pixmap.isNull() or self.image_size is None:
+            return None
+        size = pixmap.size()
+        return QRect(QPoint((self.width() - size.width()) // 2, (self.height() - size.height()) // 2), size)
+        
+    def _to_image(self, rect):
+        """Map a label rectangle to a Region in image pixels"""
+        target = self._pixmap_rect()
+        scale = self.image_size[0] / target.width()
+        rect = rect.intersected(target).translated(-target.topLeft())
+        return Region(int(rect.x() * scale), int(rect.y() * scale),
+                      int(round(rect.width() * scale)), int(round(rect.height() * scale)))
+        
+    def _to_label(self, region):
+        """Map a Region in image pixels to a label rectangle"""
+        target = self._pixmap_rect()
+        scale = target.width() / self.image_size[0]
+        return QRect(target.x() + int(region.x * scale), target.y() + int(region.y * scale),
+                     int(round(region.width * scale)), int(round(region.height * scale)))
+        
+    def _region_at(self, pos):
+        """Return the index of the topmost region under ``pos``, or None"""
+        for index in reversed(range(len(self.regions))):
+            if self._to_label(self.regions[index]).contains(pos):
+                return index
+        return None
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+        
+    def mousePressEvent(self, event):
+        target = self._pixmap_rect()
+        if event.button() == Qt.LeftButton and target is not None and target.contains(event.pos()):
+            self._drag_origin = event.pos()
+            self._rubber_band.setGeometry(QRect(self._drag_origin, QSize()))
+            self._rubber_band.show()
+        else:
+            super().mousePressEvent(event)
+        
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is not None:
+            self._rubber_band.setGeometry(QRect(self._drag_origin, event.pos()).normalized())
+        else:
+            super().mouseMoveEvent(event)
+        
+    def mouseReleaseEvent(self, event):
+        if self._drag_origin is None or event.button() != Qt.LeftButton:
+            super().mouseReleaseEvent(event)
+            return
+        
+        rect = QRect(self._drag_origin, event.pos()).normalized()
+        self._drag_origin = None
+        self._rubber_band.hide()
+        if rect.width() < MIN_DRAG_SIZE or rect.height() < MIN_DRAG_SIZE:
+            return
+        
+        region = self._to_image(rect)
+        if region.width > 0 and region.height > 0:
+            self.set_regions(self.regions + [region])
+        
+    def contextMenuEvent(self, event):
+        index = self._region_at(event.pos())
+        if index is None and not self.regions:
+            return
+        
+        menu = QMenu(self)
+        if index is not None:
+            region = self.regions[index]
+            
+            # Per-region PSM mode; None follows the tab's setting
+            psm_menu = menu.addMenu("PSM Mode")
+            group = QActionGroup(psm_menu)
+            for psm, name in [(None, "Same as tab")] + list(enumerate(self.psm_names)):
+                action = QAction(name, psm_menu, checkable=True)
+                action.setChecked(region.psm == psm)
+                action.triggered.connect(lambda _, psm=psm: self._set_region_psm(index, psm))
+                group.addAction(action)
+                psm_menu.addAction(action)
+            
+            menu.addAction("Remove region", lambda: self.set_regions(self.regions[:index] + self.regions[index + 1:]))
+        menu.addAction("Clear all regions", lambda: self.set_regions([]))
+        menu.exec_(event.globalPos())
+        
+    def _set_region_psm(self, index, psm):
+        """Change the PSM mode of one region"""
+        regions = list(self.regions)
+        regions[index] = regions[index]._replace(psm=psm)
+        self.set_regions(regions)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.regions or self._pixmap_rect() is None:
+            return
+        
+        # Outline each region and number it in reading order, which is the order of the text
+        painter = QPainter(self)
+        painter.setPen(QPen(QColor('#1976d2'), 2))
+        for number, region in enumerate(reading_order(self.regions), 1):
+            rect = self._to_label(region)
+            painter.drawRect(rect)
+            label = str(number) if region.psm is None else f"{number} · PSM {region.psm}"
+            painter.drawText(rect.adjusted(4, 2, 0, 0), Qt.AlignLeft | Qt.AlignTop, label)
+        painter.end()
@@ -0,0 +1,207 @@
+import sys
+
+from PyQt5.QtCore import Qt, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen
+from PyQt5.QtWidgets import QApplication, QWidget
+
+# Longest wait for the window system to report a hidden window before capturing anyway
+HIDE_TIMEOUT_MS = 1000
+
+# 32-bit formats whose bytes are B, G, R, A in memory on little-endian machines
+_BGRA_FORMATS = (QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied)
+
+
+def qimage_to_bgr(image, rect=None):
+    """Convert a QImage (or the part under ``rect``, in image pixels) to a BGR numpy array
+    
+    The pixels are wrapped with np.frombuffer instead of being copied, rows
+    are addressed through bytesPerLine (they may be padded), and only the
+    cropped part is colour-converted into the returned array. Returns None
+    when ``rect`` lies entirely outside the image.
+    """
+    import cv2
+    import numpy as np
+    
+    if image.isNull():
+        raise ValueError("The screen capture returned no image")
+        
+    # Clamp the rectangle to the image before touching any pixels
+    width, height = image.width(), image.height()
+    if rect is not None:
+        rect = rect.intersected(QRect(0, 0, width, height))
+        if rect.isEmpty():
+            return None
+        
+    # Screen grabs are already 32-bit BGRA in memory; anything else is converted once
+    if sys.byteorder == 'little' and image.format() in _BGRA_FORMATS:
+        code = cv2.COLOR_BGRA2BGR
+    else:
+        image = image.convertToFormat(QImage.Format_RGBA8888)
+        code = cv2.COLOR_RGBA2BGR
+    
+    stride = image.bytesPerLine()
+    ptr = image.constBits()
+    ptr.setsize(stride * height)
+    rows = np.frombuffer(ptr, dtype=np.uint8).reshape(height, stride)
+    pixels = rows[:, :width * 4].reshape(height, width, 4)
+    
+    if rect is not None:
+        pixels = pixels[rect.top():rect.bottom() + 1, rect.left():rect.right() + 1]
+    
+    return cv2.cvtColor(pixels, code)
+
+
+def grab_screen(screen, rect=None):
+    """Capture a screen, or the part under ``rect`` (logical pixels relative to the screen), as BGR
+    
+    Only the region itself is grabbed. Returns None when ``rect`` lies
+    entirely outside the screen.
+    """
+    if rect is None:
+        return qimage_to_bgr(screen.grabWindow(0).toImage())
+        
+    # Clamp to the screen first: grabWindow reads a width or height of -1 as "to the edge"
+    geometry = screen.geometry()
+    rect = rect.intersected(QRect(0, 0, geometry.width(), geometry.height()))
+    if rect.isEmpty():
+        return None
+    return qimage_to_bgr(screen.grabWindow(0, rect.x(), rect.y(), rect.width(), rect.height()).toImage())
+
+
+def scale_rect(rect, factor):
+    """Scale a QRect from logical to device pixels"""
+    return QRect(int(rect.x() * factor), int(rect.y() * factor),
+                 int(round(rect.width() * factor)), int(round(rect.height() * factor)))
+
+
+def when_hidden(window, callback, timeout_ms=HIDE_TIMEOUT_MS):
+    """Hide ``window`` and call ``callback`` as soon as the window system reports it hidden"""
+    handle = window.windowHandle()
+    if handle is None or not window.isVisible():
+        QTimer.singleShot(0, callback)
+        return
+    
+    fired = []
+    
+    def fire():
+        if fired:
+            return
+        fired.append(True)
+        handle.visibleChanged.disconnect(on_visible_changed)
+        # One more event loop turn lets the screen repaint the area the window covered
+        QTimer.singleShot(0, callback)
+        
+    def on_visible_changed(visible):
+        if not visible:
+            fire()
+    
+    handle.visibleChanged.connect(on_visible_changed)
+    
+    # Safety net for platforms that never report the change
+    QTimer.singleShot(timeout_ms, fire)
+    window.hide()
+
+
+class RegionSelector(QWidget):
+    """Full-screen overlay showing a frozen capture of one screen, on which a region is dragged
+    
+    Emits ``selected`` with the screen and the region in logical pixels
+    relative to that screen, or ``cancelled`` when Escape is pressed.
+    """
+    selected = pyqtSignal(object, QRect)
+    cancelled = pyqtSignal()
+    
+    def __init__(self, screen, pixmap):
+        super().__init__(None, Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.target_screen = screen
+        self.pixmap = pixmap
+        self.origin = None
+        self.current = None
+        self.setCursor(Qt.CrossCursor)
+        self.setGeometry(screen.geometry())
+        
+    def selection(self):
+        """Return the dragged rectangle, or None"""
+        if self.origin is None or self.current is None:
+            return None
+        return QRect(self.origin, self.current).normalized()
+        
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.origin = self.current = event.pos()
+            self.update()
+        
+    def mouseMoveEvent(self, event):
+        if self.origin is not None:
+            self.current = event.pos()
+            self.update()
+        
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self.origin is None:
+            return
+        self.current = event.pos()
+        rect = self.selection()
+        self.origin = self.current = None
+        if rect.width() > 2 and rect.height() > 2:
+            self.selected.emit(self.target_screen, rect)
+        else:
+            self.update()
+        
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.cancelled.emit()
+        
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(self.rect(), self.pixmap)
+        
+        # Dim everything except the selection
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 90))
+        rect = self.selection()
+        if rect is not None:
+            painter.drawPixmap(rect, self.pixmap, scale_rect(rect, self.pixmap.width() / max(1, self.width())))
+            painter.setPen(QPen(QColor('#1976d2'), 2))
+            painter.drawRect(rect)
+        painter.end()
+
+
+class RegionCapture:
+    """Let the user drag a region on any screen and capture only that region
+    
+    One RegionSelector is shown per screen, each over a frozen capture of
+    that screen, so the pixels converted are exactly what was on screen
+    when the selection started. ``on_captured(image, screen, rect)`` receives
+    the BGR crop; ``on_cancelled()`` is called on Escape.
+    """
+    
+    def __init__(self, on_captured, on_cancelled):
+        self.on_captured = on_captured
+        self.on_cancelled = on_cancelled
+        self.selectors = []
+        
+    def start(self):
+        """Freeze every screen and show the selection overlays"""
+        for screen in QApplication.screens():
+            selector = RegionSelector(screen, screen.grabWindow(0))
+            selector.selected.connect(self._on_selected)
+            selector.cancelled.connect(self._on_cancelled)
+            selector.show()
+            selector.activateWindow()
+            self.selectors.append(selector)
+        
+    def _close(self):
+        """Close every overlay"""
+        for selector in self.selectors:
+            selector.close()
+        self.selectors = []
+        
+    def _on_selected(self, screen, rect):
+        selector = next(selector for selector in self.selectors if selector.target_screen is screen)
+        factor = selector.pixmap.width() / max(1, selector.width())
+        image = qimage_to_bgr(selector.pixmap.toImage(), scale_rect(rect, factor))
+        self._close()
+        self.on_captured(image, screen, rect)
+        
+    def _on_cancelled(self):
+        self._close()
+        self.on_cancelled()
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class TabState:
+    """Everything known about one tab apart from its widgets
+    
+    The full-resolution image is not kept here but in the window's
+    ImageStore, under ``tab_id``.
+    """
+    tab_id: int
+    ocr_text: str = ""
+    contrast_value: float = 1.0
+    brightness_value: float = 1.0
+    sharpness_value: float = 1.0
+    deskew_enabled: bool = True
+    normalize_enabled: bool = True
+    tiling_enabled: bool = True
+    font_index: int = 0
+    psm_mode: int = 3  # Default PSM mode
+    oem_mode: int = 3  # Default to auto-select best engine
+    document_path: Optional[str] = None  # Multi-page file OCR'd page by page instead of the image
+    page_count: int = 1
+    page_scores: list = field(default_factory=list)
+    pages: Any = None  # PageStore with the layout of the last OCR run, for structured export
+    regions: list = field(default_factory=list)  # Rectangles drawn on the preview; empty means the whole image
+    capture_region: Optional[tuple] = None  # (screen name, QRect) of the last region capture
+    preview: Any = None  # PreviewPyramid of the tab's image
+    watcher: Any = None  # ScreenWatcher while the captured region is being watched
+    watch_log: Any = None  # Log file the watched text changes are appended to
+    watch_job_id: Optional[int] = None  # Watch job in flight; ticks are skipped until it reports back
+    tune_job_id: Optional[int] = None  # Auto-tune job in flight
+    jobs_in_flight: set = field(default_factory=set)  # IDs of OCR jobs currently running for this tab
+    latest_job_id: Optional[int] = None  # Only this job's result may reach the text edit
+    profile: Any = None  # Profile the tab's loading, drawing and OCR jobs record their stages into
+
+
+@dataclass(slots=True, eq=False)
+class TabWidgets:
+    """The widgets and timers of one tab"""
+    page: Any  # The tab's page in the QTabWidget
+    badge: Any  # Label on the tab itself showing "Process All" progress
+    image_label: Any
+    text_edit: Any
+    busy_bar: Any
+    ocr_info_label: Any
+    contrast_slider: Any
+    contrast_value_label: Any
+    brightness_slider: Any
+    brightness_value_label: Any
+    sharpness_slider: Any
+    sharpness_value_label: Any
+    deskew_check: Any
+    normalize_check: Any
+    tiling_check: Any
+    font_combo: Any
+    psm_combo: Any
+    oem_combo: Any
+    perf_panel: Any
+    ocr_timer: Any
+    watch_timer: Any
+
+
+@dataclass(slots=True, eq=False)
+class Tab:
+    """A tab's state together with its widgets"""
+    state: TabState
+    ui: TabWidgets
+    
+    @property
+    def tab_id(self):
+        return self.state.tab_id
+
+
+class TabRegistry:
+    """The open tabs, found by ID or by page widget in constant time
+    
+    Tabs can be moved and closed, so a position in the tab bar is only
+    ever turned into a tab through its page widget, never by counting.
+    The trailing "+" tab has no entry.
+    """
+    
+    def __init__(self, tab_widget):
+        self.tab_widget = tab_widget
+        self._by_id = {}
+        self._by_page = {}
+        
+    def add(self, tab):
+        """Register a tab whose page is (or is about to be) in the tab widget"""
+        self._by_id[tab.tab_id] = tab
+        self._by_page[tab.ui.page] = tab
+        
+    def remove(self, tab_id):
+        """Unregister a tab and return it, or None if it was not registered"""
+        tab = self._by_id.pop(tab_id, None)
+        if tab is not None:
+            del self._by_page[tab.ui.page]
+        return tab
+        
+    def get(self, tab_id):
+        """Return the tab with this ID, or None if it was closed"""
+        return self._by_id.get(tab_id)
+        
+    def at(self, index):
+        """Return the tab shown at a tab bar position, or None (e.g. for the "+" tab)"""
+        return self._by_page.get(self.tab_widget.widget(index))
+        
+    def current(self):
+        """Return the visible tab, or None"""
+        return self.at(self.tab_widget.currentIndex())
+        
+    def index_of(self, tab):
+        """Return the tab bar position of a tab"""
+        return self.tab_widget.indexOf(tab.ui.page)
+        
+    def in_tab_order(self):
+        """Return the tabs in the order they appear in the tab bar"""
+        return [tab for tab in (self.at(index) for index in range(self.tab_widget.count())) if tab is not None]
+        
+    def __contains__(self, tab_id):
+        return tab_id in self._by_id
+        
+    def __len__(self):
+        return len(self._by_id)
+        
+    def __iter__(self):
+        return iter(list(self._by_id.values()))